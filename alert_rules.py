@@ -0,0 +1,205 @@
+import json
+import operator
+import threading
+import time
+import numpy as np
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+AGGREGATES = {
+    'last': lambda values: values[-1],
+    'mean': np.mean,
+    'max': np.max,
+    'min': np.min,
+}
+
+# Aggregates only the model's running statistics provide; see SystemMetrics.get_stat
+STAT_AGGREGATES = ('ewma', 'p50', 'p95', 'p99')
+
+# One alert condition, e.g. "mean CPU over the last 30 s > 90". A window of 0
+# tests the latest value.
+# clear_threshold adds hysteresis (the alert resolves only once the value is
+# back past it), for_duration debounces (the condition must hold that long
+# before firing) and cooldown rate-limits repeated notifications.
+class AlertRule:
+
+    def __init__(self, name, metric, threshold, op='>', window=0.0, aggregate='mean',
+                 clear_threshold=None, for_duration=0.0, cooldown=60.0, message=None):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator '{op}' in rule '{name}'")
+        if aggregate not in AGGREGATES and aggregate not in STAT_AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{aggregate}' in rule '{name}'")
+        self.name = name
+        self.metric = metric
+        self.threshold = threshold
+        self.op = op
+        self.window = window
+        self.aggregate = aggregate
+        self.clear_threshold = threshold if clear_threshold is None else clear_threshold
+        self.for_duration = for_duration
+        self.cooldown = cooldown
+        self.message = message or f"{metric} {op} {threshold}: {{value:.1f}}"
+
+    def format_message(self, value):
+        return self.message.format(value=value)
+
+
+class AlertEvent:
+
+    __slots__ = ('rule', 'value', 'firing', 'timestamp')
+
+    def __init__(self, rule, value, firing, timestamp):
+        self.rule = rule
+        self.value = value
+        self.firing = firing
+        self.timestamp = timestamp
+
+    @property
+    def message(self):
+        return self.rule.format_message(self.value)
+
+
+class _RuleState:
+
+    __slots__ = ('active', 'pending_since', 'last_notified', 'value')
+
+    def __init__(self):
+        self.active = False
+        self.pending_since = None
+        self.last_notified = None
+        self.value = None
+
+
+# Evaluates every rule against the model's stored history once per call and
+# hands state changes to notify(event). It never blocks on the callback's UI.
+class AlertEngine:
+
+    def __init__(self, model, rules, notify=None):
+        self.model = model
+        self.rules = list(rules)
+        check_names(self.rules)
+        self.notify = notify
+        self._states = {rule.name: _RuleState() for rule in self.rules}
+        self._lock = threading.Lock()
+
+    def evaluate(self, now=None):
+        now = time.time() if now is None else now
+        events = []
+
+        # The model's running statistics answer most rules without a history read;
+        # rules over the same metric and an untracked window share one read
+        windows = {}
+        for rule in self.rules:
+            value = self.model.get_stat(rule.metric, rule.aggregate, rule.window)
+            if value is None and rule.aggregate in AGGREGATES:
+                key = (rule.metric, rule.window)
+                if key not in windows:
+                    # A window of 0 is the latest sample, not the empty range [now, now)
+                    start = now - rule.window if rule.window else None
+                    windows[key] = self.model.get_metric_window(rule.metric, start)
+                values = windows[key]
+                if len(values):
+                    value = AGGREGATES[rule.aggregate](values)
+            if value is None:
+                continue
+
+            value = float(value)
+            event = self._update_state(rule, value, now)
+            if event is not None:
+                events.append(event)
+
+        if self.notify is not None:
+            for event in events:
+                self.notify(event)
+        return events
+
+    def _update_state(self, rule, value, now):
+        compare = OPERATORS[rule.op]
+        with self._lock:
+            state = self._states[rule.name]
+            state.value = value
+
+            if state.active:
+                # Hysteresis: stay active until the value is back past clear_threshold
+                if not compare(value, rule.clear_threshold):
+                    state.active = False
+                    state.pending_since = None
+                    return AlertEvent(rule, value, False, now)
+                return None
+
+            if not compare(value, rule.threshold):
+                state.pending_since = None
+                return None
+            if state.pending_since is None:
+                state.pending_since = now
+            if now - state.pending_since < rule.for_duration:
+                return None
+
+            state.active = True
+            if state.last_notified is not None and now - state.last_notified < rule.cooldown:
+                return None
+            state.last_notified = now
+            return AlertEvent(rule, value, True, now)
+
+    # Messages for every alert that is currently firing
+    def active_messages(self):
+        with self._lock:
+            return [rule.format_message(self._states[rule.name].value)
+                    for rule in self.rules if self._states[rule.name].active]
+
+
+# Rule names key the engine's state, so no two rules may share one
+def check_names(rules):
+    seen = set()
+    for rule in rules:
+        if rule.name in seen:
+            raise ValueError(f"Duplicate alert rule name '{rule.name}'")
+        seen.add(rule.name)
+
+
+# Messages about rules that can't see what they ask for: unknown metrics, and
+# mean/min/max windows the running statistics don't track that are read from
+# a history the metric doesn't have, or one shorter than the window.
+# intervals maps every metric to the seconds between its samples.
+def rule_warnings(rules, model, intervals):
+    warnings = []
+    for rule in rules:
+        if rule.metric not in model.metric_names:
+            warnings.append(f"Alert rule '{rule.name}': unknown metric '{rule.metric}', it will never fire")
+            continue
+        if not rule.window or rule.aggregate in ('last',) + STAT_AGGREGATES or rule.window in model.stat_windows:
+            continue
+        if model.histories.get(rule.metric) is None:
+            warnings.append(f"Alert rule '{rule.name}': {rule.metric} keeps no history, so its "
+                            f"{rule.window:g} s {rule.aggregate} only sees the latest value")
+            continue
+        covered = model.history_length * intervals[rule.metric]
+        if rule.window > covered:
+            warnings.append(f"Alert rule '{rule.name}': the history holds only {covered:g} s of "
+                            f"{rule.metric}, less than its {rule.window:g} s window")
+    return warnings
+
+
+def default_rules():
+    return [
+        AlertRule('high_cpu', 'cpu', 90, clear_threshold=85, cooldown=60,
+                  message="High CPU Usage: {value:.1f}%"),
+        AlertRule('high_memory', 'memory', 85, clear_threshold=80, cooldown=60,
+                  message="High Memory Usage: {value:.1f}%"),
+        AlertRule('high_disk', 'disk', 80, clear_threshold=78, cooldown=300,
+                  message="High Disk Usage: {value:.1f}%"),
+    ]
+
+
+# Rules from a JSON file holding a list of AlertRule keyword arguments, e.g.
+# [{"name": "cpu_30s", "metric": "cpu", "threshold": 80, "window": 30}]
+def load_rules(path):
+    with open(path) as file:
+        rules = [AlertRule(**config) for config in json.load(file)]
+    check_names(rules)
+    return rules
\ No newline at end of file
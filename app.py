@@ -1,9 +1,144 @@
-from system_monitor_controller import SystemMonitorController
+import argparse
 import sys
 
+def parse_interval(value):
+    name, _, seconds = value.partition('=')
+    try:
+        interval = float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=SECONDS, got '{value}'")
+    if interval <= 0:
+        raise argparse.ArgumentTypeError(f"interval for '{name}' must be positive")
+    return name, interval
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='SysGauge - System Monitor')
+    parser.add_argument('--history', type=int, default=10,
+                        help='number of samples kept in memory per metric')
+    parser.add_argument('--compress-history', action='store_true',
+                        help='keep the in-memory metric histories compressed (several times smaller, '
+                             'for long --history values on small hosts; per-core and cgroup histories stay raw)')
+    parser.add_argument('--store', metavar='DIR',
+                        help='persist every sample to an on-disk store in DIR')
+    parser.add_argument('--retention-days', type=float, default=7,
+                        help='delete stored samples older than this (default: 7)')
+    parser.add_argument('--alert-rules', metavar='FILE',
+                        help='JSON file of alert rules replacing the built-in CPU/memory/disk rules')
+    parser.add_argument('--metric-interval', metavar='NAME=SECONDS', action='append', default=[],
+                        type=parse_interval,
+                        help='dashboard sampling interval of one collector (cpu, memory, disk, '
+                             'disk_io, network, processes, cgroups, exporter); may be repeated, e.g. --metric-interval disk=30')
+    parser.add_argument('--backend', choices=['auto', 'psutil', 'proc'], default='psutil',
+                        help="where readings come from: psutil (portable, default), proc "
+                             "(Linux /proc, faster) or auto")
+    parser.add_argument('--charts', choices=['matplotlib', 'qt'], default='matplotlib',
+                        help='chart engine: matplotlib (default) or qt, which draws with QPainter '
+                             'and never imports matplotlib')
+    parser.add_argument('--profile', action='store_true',
+                        help='record latency histograms of the monitor itself (see View → Diagnostics)')
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help='write the profile as JSON to FILE on exit (implies --profile)')
+    parser.add_argument('--stat-windows', metavar='SECONDS', type=float, nargs='+', default=[60, 300],
+                        help='rolling windows for the running mean/min/max of every metric '
+                             '(default: 60 300); the first is shown under each gauge')
+    parser.add_argument('--publish', metavar='NAME', nargs='?', const='sysgauge',
+                        help="share every sample in shared memory segment NAME (default 'sysgauge') "
+                             'for other SysGauge instances on this host to --attach to')
+    parser.add_argument('--attach', metavar='NAME', nargs='?', const='sysgauge',
+                        help='show the samples another instance publishes instead of sampling again')
+    parser.add_argument('--hosts', metavar='ADDRESS', nargs='+', default=[],
+                        help='also show the hosts whose agents (see --agent) listen on these addresses: '
+                             'HOST[:PORT] or unix:PATH')
+    parser.add_argument('--hosts-file', metavar='FILE',
+                        help='file of further agent addresses, one per line')
+    parser.add_argument('--metrics', metavar='HOST:PORT', nargs='?', const='127.0.0.1:9151',
+                        help='serve the newest sample at http://HOST:PORT/metrics in the OpenMetrics '
+                             'format (default 127.0.0.1:9151; also in headless mode)')
+    parser.add_argument('--cgroups', metavar='ROOT', nargs='?', const='/sys/fs/cgroup',
+                        help='sample CPU, memory, I/O and pressure of every cgroup under the cgroup v2 '
+                             'hierarchy at ROOT (default /sys/fs/cgroup) into a sortable Cgroups tab '
+                             'and --metrics')
+    parser.add_argument('--record', metavar='FILE',
+                        help='record every sample to a session file (also in headless mode)')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='show a recorded session instead of live readings')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='replay speed as a multiple of real time (default: 1)')
+    parser.add_argument('--replay-start', type=float, default=0.0, metavar='SECONDS',
+                        help='start the replay this many seconds into the recording')
+
+    # Headless collection: no Qt or matplotlib is imported in this mode
+    parser.add_argument('--headless', action='store_true',
+                        help='stream samples without a GUI instead of opening the dashboard')
+    parser.add_argument('--interval', type=float, default=0.25,
+                        help='seconds between headless samples (default: 0.25)')
+    parser.add_argument('--output', default='-',
+                        help="headless output file, or '-' for stdout (default)")
+    parser.add_argument('--format', choices=['jsonl', 'binary'], default='jsonl',
+                        help='headless output format (default: jsonl)')
+    parser.add_argument('--count', type=int,
+                        help='stop after this many headless samples')
+    parser.add_argument('--stats', action='store_true',
+                        help='add running statistics of every metric to each jsonl record')
+
+    # Agent mode: serve this host's samples to dashboards started with --hosts
+    parser.add_argument('--agent', metavar='ADDRESS', nargs='?', const='127.0.0.1:9150',
+                        help='run as a headless agent listening on ADDRESS (HOST:PORT or unix:PATH, '
+                             'default 127.0.0.1:9150; use 0.0.0.0:9150 to serve other machines), '
+                             'sampling every --interval seconds')
+    parser.add_argument('--batch-interval', type=float, default=1.0,
+                        help='seconds between the batches of samples an agent sends (default: 1)')
+
+    # Leave Qt's own command line options to QApplication
+    args, _ = parser.parse_known_args()
+    # The dashboard charts the in-memory history (headless mode can do without one)
+    if args.history < 1 and not (args.headless or args.agent):
+        parser.error("--history must be at least 1 for the dashboard")
+    # A replay feeds old samples into the model, which must not reach anything kept
+    if args.replay:
+        for option, value in (('--store', args.store), ('--record', args.record), ('--publish', args.publish)):
+            if value:
+                parser.error(f"{option} cannot be combined with --replay")
+    return args
+
 if __name__ == '__main__':
+    args = parse_args()
+
+    if args.agent:
+        from remote_agent import run_agent
+        sys.exit(run_agent(args))
+
+    if args.headless:
+        from headless_collector import run_headless
+        sys.exit(run_headless(args))
+
+    from system_monitor_controller import SystemMonitorController
+
+    store = None
+    if args.store:
+        from metric_store import MetricStore
+        store = MetricStore(args.store, retention=args.retention_days * 24 * 3600)
+
+    hosts = list(args.hosts)
+    if args.hosts_file:
+        with open(args.hosts_file) as file:
+            hosts.extend(line.strip() for line in file if line.strip() and not line.startswith('#'))
+
+    alert_rules = None
+    if args.alert_rules:
+        from alert_rules import load_rules
+        alert_rules = load_rules(args.alert_rules)
+
     # Create the controller
-    controller = SystemMonitorController()
+    controller = SystemMonitorController(history_length=args.history, store=store,
+                                         intervals=dict(args.metric_interval), alert_rules=alert_rules,
+                                         backend=args.backend, chart_backend=args.charts,
+                                         profile=args.profile, profile_output=args.profile_output,
+                                         record=args.record, replay=args.replay, replay_speed=args.replay_speed,
+                                         replay_start=args.replay_start, stat_windows=args.stat_windows,
+                                         compress_history=args.compress_history, publish=args.publish,
+                                         attach=args.attach, hosts=hosts, metrics=args.metrics,
+                                         cgroups=args.cgroups)
 
     # Show the view
     controller.view.show()
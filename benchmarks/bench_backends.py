@@ -0,0 +1,86 @@
+# Sampling throughput and allocations of the psutil and /proc collector backends,
+# plus a check that both report the same values.
+#
+#   python benchmarks/bench_backends.py --samples 5000
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from collector_backends import PsutilBackend, ProcBackend
+
+
+# One full sample: the same four reads SystemMetrics.read_sample() makes
+def sample(backend):
+    backend.cpu_percent()
+    backend.memory_percent()
+    backend.disk_percent('/')
+    backend.net_io()
+
+
+def throughput(backend, samples):
+    sample(backend)
+    start = time.perf_counter()
+    for _ in range(samples):
+        sample(backend)
+    return samples / (time.perf_counter() - start)
+
+
+# Peak Python memory allocated while sampling, as seen by tracemalloc;
+# psutil builds namedtuples and reopens files on every call
+def peak_allocated(backend, samples):
+    sample(backend)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    for _ in range(samples):
+        sample(backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - start
+
+
+def compare(psutil_backend, proc_backend, interval=0.5):
+    psutil_backend.cpu_percent()
+    proc_backend.cpu_percent()
+    time.sleep(interval)
+    readings = {
+        'cpu': (psutil_backend.cpu_percent(), proc_backend.cpu_percent()),
+        'memory': (psutil_backend.memory_percent(), proc_backend.memory_percent()),
+        'disk': (psutil_backend.disk_percent('/'), proc_backend.disk_percent('/')),
+    }
+    psutil_net = psutil_backend.net_io()
+    proc_net = proc_backend.net_io()
+    readings['net_sent'] = (psutil_net[0], proc_net[0])
+    readings['net_recv'] = (psutil_net[1], proc_net[1])
+    return readings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=5000)
+    args = parser.parse_args()
+
+    backends = [PsutilBackend(), ProcBackend()]
+
+    print(f"{'backend':>8} {'samples/s':>10} {'peak allocated':>15}")
+    for backend in backends:
+        rate = throughput(backend, args.samples)
+        peak = peak_allocated(backend, args.samples)
+        print(f"{backend.name:>8} {rate:>10.0f} {peak / 1024:>11.1f} KiB")
+
+    print()
+    print(f"{'metric':>8} {'psutil':>14} {'proc':>14}")
+    for name, (expected, actual) in compare(*backends).items():
+        print(f"{name:>8} {expected:>14} {actual:>14}")
+
+    for backend in backends:
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Frame time, startup time and memory of the matplotlib and QPainter chart engines.
+# Each engine runs in its own subprocess so import cost and RSS are measured from
+# a clean interpreter.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_charts.py --frames 200
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+
+# Runs in the child: build the view with one engine, time frames, report as JSON
+def run_engine(engine, frames, history_length, cores):
+    start = time.perf_counter()
+    from PyQt5.QtWidgets import QApplication
+    from bench_render import SyntheticMetrics
+    from system_monitor_view import SystemMonitorView
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    model = SyntheticMetrics(history_length, cores=cores)
+    for _ in range(history_length):
+        model.update_data()
+    view = SystemMonitorView(model, chart_backend=engine)
+    view.show()
+    view.update_plot()
+    app.processEvents()
+    startup = (time.perf_counter() - start) * 1000
+
+    # Warm up so the first full draw is not counted
+    for _ in range(5):
+        model.update_data()
+        view.update_plot()
+        app.processEvents()
+
+    samples = []
+    for _ in range(frames):
+        model.update_data()
+        start = time.perf_counter()
+        view.update_plot()
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    view.close()
+
+    print(json.dumps({
+        'startup_ms': startup,
+        'samples': samples,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'matplotlib': any(name.startswith('matplotlib') for name in sys.modules),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--history', type=int, default=60)
+    parser.add_argument('--cores', type=int, default=16)
+    parser.add_argument('--engine', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        run_engine(args.engine, args.frames, args.history, args.cores)
+        return
+
+    for engine in ('matplotlib', 'qt'):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--engine', engine, '--frames', str(args.frames),
+             '--history', str(args.history), '--cores', str(args.cores)],
+            check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples = sorted(result['samples'])
+        print(f"{engine:>10}: median {statistics.median(samples):7.2f} ms  "
+              f"p95 {samples[int(len(samples) * 0.95) - 1]:7.2f} ms  "
+              f"startup {result['startup_ms']:6.0f} ms  "
+              f"max RSS {result['max_rss_mb']:6.1f} MB  "
+              f"matplotlib imported: {result['matplotlib']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# Compressed against raw in-memory history: bytes per sample, append cost and
+# decode throughput for full reads, window queries and chart points, and how
+# long an append that closes a block holds the lock it runs under in
+# SystemMetrics.record (the block is encoded after the lock is released). Signals
+# mimic the dashboard's metrics, sampled every 0.25 s with scheduler jitter.
+# Reads also fill a cache of up to CACHE_BLOCKS decoded blocks (64 KiB) per history.
+#
+#   python benchmarks/bench_compressed_history.py --history 86400 --jitter-ms 0.5
+
+import argparse
+import math
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compressed_history import CompressedHistory, encode_block, encode_pending
+from metric_history import MetricHistory
+
+
+def make_signals(count, seed):
+    rng = random.Random(seed)
+    walk, memory = 30.0, 45.0
+    signals = {'idle (constant)': [], 'memory (slow, 0.1%)': [], 'cpu (noisy, 0.1%)': [], 'rate (full precision)': []}
+    for index in range(count):
+        walk = min(max(walk + rng.gauss(0, 3), 0.0), 100.0)
+        memory = min(max(memory + rng.gauss(0, 0.02), 0.0), 100.0)
+        signals['idle (constant)'].append(0.0)
+        signals['memory (slow, 0.1%)'].append(round(memory, 1))
+        signals['cpu (noisy, 0.1%)'].append(round(walk, 1))
+        signals['rate (full precision)'].append(rng.expovariate(1.0) * (1 + math.sin(index / 500)))
+    return signals
+
+
+def history_bytes(history):
+    # Raw buffer plus the pyramid levels both histories keep for plotting
+    pyramid = sum(buckets.nbytes for _, buckets in history.summary.levels)
+    return (history.nbytes if isinstance(history, CompressedHistory) else history.samples.nbytes) + pyramid
+
+
+# Appends the way SystemMetrics.record makes them; returns the mean µs per sample
+# (encoding included) and the mean µs the lock was held by appends closing a block
+def fill(history, timestamps, values):
+    lock = threading.Lock()
+    compressed = isinstance(history, CompressedHistory)
+    closing = []
+    start = time.perf_counter()
+    for timestamp, value in zip(timestamps, values):
+        with lock:
+            acquired = time.perf_counter()
+            history.append(timestamp, value)
+            pending = history.take_pending() if compressed else None
+            if pending:
+                closing.append(time.perf_counter() - acquired)
+        if pending:
+            encode_pending(pending, lock)
+    held = sum(closing) / len(closing) * 1e6 if closing else 0.0
+    return (time.perf_counter() - start) / len(values) * 1e6, held
+
+
+def time_call(call, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = call()
+    return (time.perf_counter() - start) / repeats, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--history', type=int, default=86400, help='samples kept (86400 = 6 h at 4 Hz)')
+    parser.add_argument('--jitter-ms', type=float, default=0.5, help='scheduler jitter of each timestamp')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    timestamps = [1.7e9 + index * 0.25 + rng.uniform(-args.jitter_ms, args.jitter_ms) / 1000
+                  for index in range(args.history)]
+    query = (timestamps[len(timestamps) // 2], timestamps[len(timestamps) // 2 + len(timestamps) // 10])
+
+    for name, values in make_signals(args.history, args.seed).items():
+        raw = MetricHistory(args.history)
+        compressed = CompressedHistory(args.history)
+        raw_append, _ = fill(raw, timestamps, values)
+        compressed_append, held = fill(compressed, timestamps, values)
+        block = compressed.blocks[-1]
+        encode, _ = time_call(lambda: encode_block(*compressed.decode(block)), args.repeats)
+        # Before any read, so the bounded cache of decoded blocks is not counted
+        raw_bytes, compressed_bytes = history_bytes(raw), history_bytes(compressed)
+
+        full, decoded = time_call(compressed.values, 1)
+        assert decoded.tolist() == values
+        raw_window, _ = time_call(lambda: raw.window(*query), args.repeats)
+        compressed.cache.clear()
+        window, _ = time_call(lambda: compressed.window(*query), 1)
+        plot, _ = time_call(lambda: compressed.plot_points(1000), args.repeats)
+
+        print(f"{name:>22}: {raw_bytes / args.history:5.1f} -> {compressed_bytes / args.history:5.2f} bytes/sample "
+              f"({raw_bytes / compressed_bytes:4.1f}x smaller)  append {raw_append:4.1f} -> {compressed_append:4.1f} µs")
+        print(f"{'':>22}  closing a block holds the lock {held:5.1f} µs; "
+              f"encoding it takes {encode * 1e6:5.0f} µs outside the lock")
+        print(f"{'':>22}  decode all {args.history / full / 1e6:5.2f} M samples/s ({full * 1000:6.1f} ms)  "
+              f"10% window {window * 1000:6.1f} ms (raw {raw_window * 1000:.3f} ms)  "
+              f"chart points {plot * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+# Frame time of the per-core CPU heatmap (one image updated in place) against
+# one line per core, as the number of synthetic cores grows. Both are blitted
+# on an Agg canvas so only the per-frame artist cost is measured.
+#
+#   python benchmarks/bench_core_heatmap.py --cores 8 64 256
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from ring_buffer import RingBuffer
+from history_decimation import bucket_max
+
+
+# Per-core history filled with random load; one core is saturated in bursts
+def synthetic_history(cores, history_length, seed=0):
+    rng = np.random.default_rng(seed)
+    history = RingBuffer(history_length, dtype='float32', shape=(cores,))
+    for tick in range(history_length):
+        row = rng.uniform(0, 40, cores)
+        row[cores // 3] = 100 if tick % 40 < 20 else 10
+        history.append(float(tick), row)
+    return history, rng
+
+
+class Heatmap:
+
+    def __init__(self, ax, cores, columns):
+        self.pixels = np.zeros((cores, columns), dtype=np.float32)
+        self.image = ax.imshow(self.pixels, aspect='auto', origin='lower', interpolation='nearest',
+                               vmin=0, vmax=100, animated=True)
+        self.artists = [self.image]
+
+    def update(self, history, columns):
+        data = bucket_max(history.values(), columns)
+        self.pixels[:, :len(data)] = data.T
+        self.image.set_data(self.pixels)
+
+
+class CoreLines:
+
+    def __init__(self, ax, cores, columns):
+        self.artists = [ax.plot([], [], linewidth=1, animated=True)[0] for _ in range(cores)]
+        ax.set_xlim(0, columns)
+        ax.set_ylim(0, 100)
+
+    def update(self, history, columns):
+        data = bucket_max(history.values(), columns)
+        x = np.arange(len(data))
+        for core, line in enumerate(self.artists):
+            line.set_data(x, data[:, core])
+
+
+def time_frames(chart_class, cores, frames, history_length, columns):
+    history, rng = synthetic_history(cores, history_length)
+    fig = Figure(figsize=(6, 4), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    chart = chart_class(ax, cores, columns)
+    canvas.draw()
+    background = canvas.copy_from_bbox(ax.bbox)
+
+    times = []
+    for frame in range(frames):
+        history.append(float(history_length + frame), rng.uniform(0, 40, cores))
+        start = time.perf_counter()
+        chart.update(history, columns)
+        canvas.restore_region(background)
+        for artist in chart.artists:
+            fig.draw_artist(artist)
+        canvas.blit(ax.bbox)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cores', type=int, nargs='+', default=[8, 64, 256])
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--history', type=int, default=2400)
+    parser.add_argument('--columns', type=int, default=480)
+    args = parser.parse_args()
+
+    print(f"{'cores':>5} {'heatmap':>10} {'line per core':>14}")
+    for cores in args.cores:
+        heatmap_ms = time_frames(Heatmap, cores, args.frames, args.history, args.columns)
+        lines_ms = time_frames(CoreLines, cores, args.frames, args.history, args.columns)
+        print(f"{cores:>5} {heatmap_ms:>7.2f} ms {lines_ms:>11.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Aggregator cost when following many hosts: CPU used by the dashboard's
+# HostAggregator (decoding every sample into a model per host) for 100 and 200
+# agents on localhost. Agents sample the deterministic SyntheticBackend and are
+# spread over a few processes; only the aggregator's process is measured.
+#
+#   python benchmarks/bench_host_aggregator.py --hosts 100 200 --interval 0.25 --seconds 10
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from synthetic_backend import SyntheticBackend
+from host_aggregator import HostAggregator
+from metric_sampler import MetricScheduler
+from remote_agent import RemoteAgent
+from system_metrics import SystemMetrics
+
+FIRST_PORT = 19400
+
+
+# Runs count agents on consecutive ports from one scheduler thread until killed
+def run_agents(first_port, count, interval, batch_interval, cores):
+    scheduler = MetricScheduler()
+    for index in range(count):
+        model = SystemMetrics(history_length=0, backend=SyntheticBackend(cores=cores, seed=first_port + index),
+                              stat_windows=())
+        agent = RemoteAgent(model, f'127.0.0.1:{first_port + index}', interval, batch_interval)
+        scheduler.add_collector(f'sample {index}', agent.collect, interval)
+        scheduler.add_collector(f'send {index}', agent.send, batch_interval)
+    scheduler.start()
+    print('ready', flush=True)
+    sys.stdin.read()  # Until the parent closes it
+
+
+def measure(hosts, args):
+    per_process = -(-hosts // args.processes)
+    children = []
+    for first in range(0, hosts, per_process):
+        count = min(per_process, hosts - first)
+        child = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', str(FIRST_PORT + first),
+                                  str(count), str(args.interval), str(args.batch_interval), str(args.cores)],
+                                 stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        child.stdout.readline()
+        children.append(child)
+
+    aggregator = HostAggregator([f'127.0.0.1:{FIRST_PORT + index}' for index in range(hosts)],
+                                lambda: SystemMetrics(args.history, backend=SyntheticBackend(cores=0)))
+    aggregator.start()
+    time.sleep(2 * args.batch_interval + 1)  # Connected and past the first batches
+
+    samples, received = sum(host.samples for host in aggregator.hosts), sum(host.bytes for host in aggregator.hosts)
+    cpu_start, start = time.process_time(), time.perf_counter()
+    time.sleep(args.seconds)
+    cpu, elapsed = time.process_time() - cpu_start, time.perf_counter() - start
+    samples = sum(host.samples for host in aggregator.hosts) - samples
+    received = sum(host.bytes for host in aggregator.hosts) - received
+    now = time.time()
+    lag = max(now - host.last_seen for host in aggregator.hosts if host.last_seen is not None)
+    connected = aggregator.connected_count()
+
+    aggregator.stop()
+    for child in children:
+        child.stdin.close()
+        child.wait()
+    return connected, samples / elapsed, received / elapsed, cpu / elapsed, cpu / max(samples, 1), lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hosts', type=int, nargs='+', default=[100, 200])
+    parser.add_argument('--processes', type=int, default=4, help='processes the agents are spread over')
+    parser.add_argument('--interval', type=float, default=0.25, help='seconds between samples of each agent')
+    parser.add_argument('--batch-interval', type=float, default=1.0)
+    parser.add_argument('--cores', type=int, default=16, help='per-core readings in each sample')
+    parser.add_argument('--history', type=int, default=600, help='samples kept per host and metric')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--child', nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        first_port, count, interval, batch_interval, cores = args.child
+        run_agents(int(first_port), int(count), float(interval), float(batch_interval), int(cores))
+        return
+
+    for hosts in args.hosts:
+        connected, rate, received, cpu, per_sample, lag = measure(hosts, args)
+        print(f"{hosts:>4} hosts ({connected} connected): {rate:7.0f} samples/s, {received / 1024:6.1f} KiB/s, "
+              f"aggregator CPU {cpu * 100:5.1f}% of a core ({per_sample * 1e6:5.1f} µs per sample), "
+              f"oldest batch {lag:.2f} s ago")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# RateEngine update cost against a per-device Python loop as the number of
+# NICs/disks grows; every tick also wraps a 32-bit counter and hot-plugs a device.
+#
+#   python benchmarks/bench_io_rates.py --devices 4 64 256
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from collector_backends import NET_COUNTER_FIELDS
+from io_rates import RateEngine, COUNTER_32_WRAP
+
+
+# Per-NIC counter dicts as the backends return them, one per tick
+def synthetic_ticks(count, ticks, seed=0):
+    rng = random.Random(seed)
+    counters = {f'eth{i}': [rng.randint(0, COUNTER_32_WRAP - 1) for _ in NET_COUNTER_FIELDS]
+                for i in range(count)}
+    next_device = count
+    frames = []
+    for tick in range(ticks):
+        for values in counters.values():
+            for field in range(len(values)):
+                values[field] = (values[field] + rng.randint(0, 10 ** 6)) % COUNTER_32_WRAP
+        # Unplug one device and plug in a new one
+        if tick % 10 == 9:
+            del counters[rng.choice(sorted(counters))]
+            counters[f'eth{next_device}'] = [0] * len(NET_COUNTER_FIELDS)
+            next_device += 1
+        frames.append({name: tuple(values) for name, values in counters.items()})
+    return frames
+
+
+# Baseline: dict of previous counters and a delta per device and field
+class LoopRateEngine:
+
+    def __init__(self):
+        self.previous = {}
+        self.time = None
+
+    def update(self, counters, now):
+        rates = {}
+        for device, values in counters.items():
+            previous = self.previous.get(device)
+            if previous is None or self.time is None:
+                rates[device] = [0.0] * len(values)
+                continue
+            row = []
+            for value, old in zip(values, previous):
+                delta = value - old
+                if delta < 0:
+                    delta = delta + COUNTER_32_WRAP if old < COUNTER_32_WRAP else value
+                row.append(delta / (now - self.time))
+            rates[device] = row
+        self.previous = counters
+        self.time = now
+        return rates
+
+
+def run(engine, frames):
+    start = time.perf_counter()
+    for tick, counters in enumerate(frames):
+        engine.update(counters, float(tick + 1))
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--devices', type=int, nargs='+', default=[4, 16, 64, 256])
+    parser.add_argument('--ticks', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'devices':>7} {'RateEngine':>12} {'per-device loop':>16}")
+    for count in args.devices:
+        frames = synthetic_ticks(count, args.ticks)
+        vector_us = run(RateEngine(NET_COUNTER_FIELDS), frames)
+        loop_us = run(LoopRateEngine(), frames)
+        print(f"{count:>7} {vector_us:>9.1f} us {loop_us:>13.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# Load test of the /metrics endpoint: scrape throughput and latency with 1, 4
+# and 16 concurrent keep-alive scrapers, while the model keeps sampling the
+# deterministic SyntheticBackend 4 times a second and a synthetic process table
+# once a second. Also shows how many scrapes each rendered body served and
+# whether scraping delays the sampler.
+#
+#   python benchmarks/bench_metrics_endpoint.py --clients 1 4 16 --seconds 5 --gzip
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from synthetic_backend import SyntheticBackend
+from bench_process_monitor import synthetic_ticks
+from metric_sampler import MetricScheduler
+from metrics_exporter import MetricsExporter, render_openmetrics
+from process_monitor import ProcessMonitor
+from system_metrics import SystemMetrics
+
+
+# Runs in each scraper process: scrape as fast as possible for seconds
+def run_scraper(port, seconds, compressed):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Accept-Encoding': 'gzip'} if compressed else {}
+    latencies = []
+    received = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        connection.request('GET', '/metrics', headers=headers)
+        response = connection.getresponse()
+        received += len(response.read())
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    print(json.dumps({'scrapes': len(latencies), 'bytes': received,
+                      'p50_ms': latencies[len(latencies) // 2] * 1000,
+                      'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000}))
+
+
+def start_sampling(args):
+    model = SystemMetrics(args.history, backend=SyntheticBackend(cores=args.cores))
+    frames = synthetic_ticks(args.processes, 8)
+    ticks = iter(range(10 ** 9))
+    process_monitor = ProcessMonitor(source=lambda: frames[next(ticks) % len(frames)])
+    scheduler = MetricScheduler()
+    scheduler.add_collector('sample', model.update_data, 0.25)
+    scheduler.add_collector('processes', process_monitor.update, 1.0)
+    scheduler.start()
+    return model, process_monitor, scheduler
+
+
+def measure(clients, exporter, scheduler, args):
+    scrapes, renders = exporter.scrapes, exporter.renders
+    before = scheduler.get_stats()['sample']
+    processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', str(exporter.port),
+                                   str(args.seconds), str(int(args.gzip))], stdout=subprocess.PIPE, text=True)
+                 for _ in range(clients)]
+    results = [json.loads(process.communicate()[0]) for process in processes]
+    after = scheduler.get_stats()['sample']
+    runs = after['runs'] - before['runs']
+    sample_ms = (after['mean_ms'] * after['runs'] - before['mean_ms'] * before['runs']) / max(runs, 1)
+    total = sum(result['scrapes'] for result in results)
+    return (total / args.seconds, statistics.mean(result['p50_ms'] for result in results),
+            max(result['p99_ms'] for result in results), sum(result['bytes'] for result in results) / total,
+            (exporter.scrapes - scrapes) / max(exporter.renders - renders, 1), sample_ms, after['max_ms'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--gzip', action='store_true', help='scrape with Accept-Encoding: gzip')
+    parser.add_argument('--cores', type=int, default=64)
+    parser.add_argument('--processes', type=int, default=2000, help='synthetic processes (top 15 exported)')
+    parser.add_argument('--history', type=int, default=600)
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_scraper(int(args.child[0]), float(args.child[1]), args.child[2] == '1')
+        return
+
+    model, process_monitor, scheduler = start_sampling(args)
+    exporter = MetricsExporter(model, '127.0.0.1:0', process_monitor)
+    scheduler.add_collector('exporter', exporter.refresh, 0.25)
+    exporter.start()
+    time.sleep(1.5)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        render_openmetrics(model, process_monitor)
+    print(f"Rendering one body: {(time.perf_counter() - start) * 10:.2f} ms "
+          f"(what every scrape would cost without the cache)")
+
+    for clients in args.clients:
+        rate, p50, p99, size, reuse, sample_ms, sample_max = measure(clients, exporter, scheduler, args)
+        print(f"{clients:>3} scrapers: {rate:7.0f} scrapes/s, latency p50 {p50:5.2f} ms p99 {p99:6.2f} ms, "
+              f"{size / 1024:5.1f} KiB each, {reuse:6.0f} scrapes per render; "
+              f"sampler update_data {sample_ms:.2f} ms (max {sample_max:.1f} ms)")
+
+    exporter.close()
+    scheduler.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# ProcessMonitor cost per tick on a synthetic process table with churn.
+#
+#   python benchmarks/bench_process_monitor.py --processes 5000 10000
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from process_monitor import ProcessMonitor
+
+
+# Pre-built process_iter-style dicts for each tick; about 2% of processes exit
+# and are replaced by new ones between ticks
+def synthetic_ticks(count, ticks, churn=0.02, seed=0):
+    rng = random.Random(seed)
+    next_pid = 1
+    live = {}
+    for _ in range(count):
+        live[next_pid] = [0.0, rng.randint(1, 500) * 1024 ** 2, 0]
+        next_pid += 1
+
+    frames = []
+    for tick in range(ticks):
+        for pid in rng.sample(sorted(live), int(count * churn)):
+            del live[pid]
+            live[next_pid] = [0.0, rng.randint(1, 500) * 1024 ** 2, 0]
+            next_pid += 1
+        frame = []
+        for pid, state in live.items():
+            state[0] += rng.random() * 0.1
+            state[2] += rng.randint(0, 4096)
+            frame.append({
+                'pid': pid,
+                'name': f'proc-{pid}',
+                'create_time': float(pid),
+                'cpu_times': (state[0], state[0] / 4),
+                'memory_info': (state[1], state[1] * 2),
+                'io_counters': (0, 0, state[2], state[2] // 2),
+                'num_threads': 1 + pid % 8,
+            })
+        frames.append(frame)
+    return frames
+
+
+# Baseline: same bookkeeping, but top-N by sorting the whole table
+class SortingProcessMonitor(ProcessMonitor):
+
+    def update(self, now=None):
+        super().update(now)
+        processes = list(self.processes.values())
+        self._top_cpu = sorted(processes, key=lambda p: p.cpu_percent, reverse=True)[:self.top_n]
+        self._top_memory = sorted(processes, key=lambda p: p.rss, reverse=True)[:self.top_n]
+
+
+def run(monitor_class, frames):
+    frame_iter = iter(frames)
+    monitor = monitor_class(source=lambda: next(frame_iter))
+    monitor.update(now=0.0)
+    start = time.perf_counter()
+    for tick in range(1, len(frames)):
+        monitor.update(now=float(tick))
+    return (time.perf_counter() - start) / (len(frames) - 1) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--ticks', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'processes':>9} {'heap top-N':>12} {'heap + full sort':>17}")
+    for count in args.processes:
+        frames = synthetic_ticks(count, args.ticks)
+        heap_ms = run(ProcessMonitor, frames)
+        sort_ms = run(SortingProcessMonitor, frames)
+        print(f"{count:>9} {heap_ms:>9.2f} ms {sort_ms:>14.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# Per-call cost of a profiler stage, disabled and enabled, against an
+# uninstrumented call.
+#
+#   python benchmarks/bench_profiler.py --calls 1000000
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from profiler import Profiler
+
+
+def work():
+    pass
+
+
+def time_bare(calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        work()
+    return time.perf_counter() - start
+
+
+def time_stage(profiler, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        with profiler.stage('work'):
+            work()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--calls', type=int, default=1000000)
+    args = parser.parse_args()
+
+    bare = time_bare(args.calls)
+    disabled = time_stage(Profiler(enabled=False), args.calls)
+    enabled = time_stage(Profiler(enabled=True), args.calls)
+    for name, seconds in (('bare call', bare), ('stage, disabled', disabled), ('stage, enabled', enabled)):
+        print(f"{name:>16}: {seconds / args.calls * 1e9:7.0f} ns/call  "
+              f"(+{(seconds - bare) / args.calls * 1e9:5.0f} ns)")
+
+
+if __name__ == '__main__':
+    main()
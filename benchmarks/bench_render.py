@@ -0,0 +1,98 @@
+# Frame-time comparison of the blitted and clear-and-redraw render paths.
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_render.py --frames 200
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PyQt5.QtWidgets import QApplication
+from system_metrics import SystemMetrics
+from system_monitor_view import SystemMonitorView
+
+
+# Model fed with deterministic pseudo-random samples instead of psutil
+class SyntheticMetrics(SystemMetrics):
+
+    def __init__(self, history_length=10, seed=0, cores=8):
+        super().__init__(history_length)
+        self.rng = random.Random(seed)
+        self.cores = cores
+        self.sent = 0.0
+        self.received = 0.0
+        self.now = 0.0
+
+    def read_sample(self):
+        self.sent += self.rng.uniform(0, 1)
+        self.received += self.rng.uniform(0, 2)
+        return {
+            'cpu': self.rng.uniform(0, 100),
+            'memory': self.rng.uniform(30, 70),
+            'disk': self.rng.uniform(40, 60),
+            'net_sent_mb': self.sent,
+            'net_recv_mb': self.received,
+            'net_sent_mb_s': self.rng.uniform(0, 4),
+            'net_recv_mb_s': self.rng.uniform(0, 8),
+            'disk_read_mb_s': self.rng.uniform(0, 50),
+            'disk_write_mb_s': self.rng.uniform(0, 20),
+        }
+
+    def update_data(self):
+        self.now += 0.25
+        sample = self.read_sample()
+        self.record(self.now, sample)
+        self.record_cores(self.now, [self.rng.uniform(0, 100) for _ in range(self.cores)])
+        return self.now, sample
+
+
+def time_frames(app, render_mode, frames, history_length):
+    model = SyntheticMetrics(history_length)
+    for _ in range(history_length):
+        model.update_data()
+    view = SystemMonitorView(model, render_mode=render_mode)
+    view.show()
+    app.processEvents()
+
+    # Warm up so the first full draw is not counted
+    for _ in range(5):
+        model.update_data()
+        view.update_plot()
+        app.processEvents()
+
+    samples = []
+    for _ in range(frames):
+        model.update_data()
+        start = time.perf_counter()
+        view.update_plot()
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    view.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--history', type=int, default=10)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    for mode in ('redraw', 'blit'):
+        samples = time_frames(app, mode, args.frames, args.history)
+        results[mode] = samples
+        print(f"{mode:>7}: mean {statistics.mean(samples):7.2f} ms  "
+              f"median {statistics.median(samples):7.2f} ms  "
+              f"p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:7.2f} ms")
+
+    speedup = statistics.mean(results['redraw']) / statistics.mean(results['blit'])
+    print(f"blit is {speedup:.1f}x faster per frame")
+
+
+if __name__ == '__main__':
+    main()
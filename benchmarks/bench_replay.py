@@ -0,0 +1,115 @@
+# Session recording and replay costs: bytes per sample, load time and the cost
+# of one replay step at 1x to 1000x, and of a seek to the middle along with the
+# longest the model's lock is held meanwhile. The session is written the way the live
+# collectors write it (one partial sample per collector, plus per-core usage),
+# from the deterministic SyntheticBackend.
+#
+#   python benchmarks/bench_replay.py --duration 3600 --cores 64 --history 600
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from synthetic_backend import SyntheticBackend
+from session_recorder import SessionRecorder
+from session_replay import SessionReader, ReplayPlayer
+from system_metrics import SystemMetrics
+from system_monitor_controller import DEFAULT_INTERVALS, REPLAY_INTERVAL
+
+SPEEDS = (1, 10, 100, 1000)
+
+
+def write_session(path, duration, cores, seed):
+    backend = SyntheticBackend(cores=cores, seed=seed)
+    recorder = SessionRecorder(path)
+    step = DEFAULT_INTERVALS['cpu']
+    timestamp = 1.7e9
+    due = {'disk': 0.0, 'disk_io': 0.0}
+    for tick in range(int(duration / step)):
+        timestamp += step
+        recorder.append_sample(timestamp, {'cpu': backend.cpu_percent()})
+        recorder.append_cores(timestamp, backend.cpu_percent_per_core())
+        recorder.append_sample(timestamp, {'memory': backend.memory_percent()})
+        sent, recv = backend.net_io()
+        recorder.append_sample(timestamp, {'net_sent_mb': sent / 2 ** 20, 'net_recv_mb': recv / 2 ** 20,
+                                           'net_sent_mb_s': 1.0, 'net_recv_mb_s': 1.0})
+        for name, sample in (('disk', lambda: {'disk': backend.disk_percent()}),
+                             ('disk_io', lambda: {'disk_read_mb_s': 1.0, 'disk_write_mb_s': 1.0})):
+            if tick * step >= due[name]:
+                due[name] += DEFAULT_INTERVALS[name]
+                recorder.append_sample(timestamp, sample())
+    recorder.close()
+    return recorder.samples
+
+
+# The model's lock, keeping the longest it was held
+class TimedLock:
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.longest = 0.0
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.acquired = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.longest = max(self.longest, time.perf_counter() - self.acquired)
+        self.lock.release()
+
+
+# Replay steps as the scheduler would run them, with the clock moved by hand
+def time_steps(reader, history_length, speed, steps):
+    model = SystemMetrics(history_length, backend=SyntheticBackend(cores=0))
+    player = ReplayPlayer(model, reader, speed)
+    player.set_paused(True)
+    times = []
+    for _ in range(steps):
+        player.position = min(player.position + REPLAY_INTERVAL * speed, reader.end)
+        start = time.perf_counter()
+        player.advance()
+        times.append((time.perf_counter() - start) * 1000)
+    # The slider sets the target; the next step refills the model
+    model.lock = TimedLock(model.lock)
+    start = time.perf_counter()
+    player.seek(reader.duration / 2)
+    player.advance()
+    seek_ms = (time.perf_counter() - start) * 1000
+    return statistics.mean(times), max(times), seek_ms, model.lock.longest * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--duration', type=float, default=3600, help='seconds of recorded session')
+    parser.add_argument('--cores', type=int, default=16)
+    parser.add_argument('--history', type=int, default=600)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'session.rec')
+        samples = write_session(path, args.duration, args.cores, args.seed)
+        size = os.path.getsize(path)
+        print(f"{samples} samples over {args.duration:.0f} s, {args.cores} cores: {size / 2 ** 20:.2f} MiB "
+              f"({size / samples:.1f} bytes/sample, {size / args.duration / 1024:.1f} KiB/s recorded)")
+
+        start = time.perf_counter()
+        reader = SessionReader(path)
+        print(f"load: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for speed in SPEEDS:
+        mean_ms, max_ms, seek_ms, lock_ms = time_steps(reader, args.history, speed, args.steps)
+        print(f"{speed:>5}x: step mean {mean_ms:6.2f} ms  max {max_ms:6.2f} ms  "
+              f"(budget {REPLAY_INTERVAL * 1000:.0f} ms)  seek {seek_ms:6.1f} ms "
+              f"(lock held {lock_ms:5.2f} ms at most)")
+
+
+if __name__ == '__main__':
+    main()
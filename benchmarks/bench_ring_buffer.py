@@ -0,0 +1,64 @@
+# Memory and throughput of the NumPy RingBuffer against the deque it replaced.
+#
+#   python benchmarks/bench_ring_buffer.py
+
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ring_buffer import RingBuffer
+
+
+# The old storage: one deque of values plus one of timestamps
+class DequeHistory:
+
+    def __init__(self, capacity):
+        self.timestamps = deque(maxlen=capacity)
+        self.values = deque(maxlen=capacity)
+
+    def append(self, timestamp, value):
+        self.timestamps.append(timestamp)
+        self.values.append(value)
+
+    def read(self):
+        return list(self.values)
+
+
+def measure(factory, read, size, appends, reads):
+    tracemalloc.start()
+    history = factory(size)
+    for i in range(size):
+        history.append(float(i), i * 0.5)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(appends):
+        history.append(float(i), i * 0.5)
+    append_rate = appends / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(reads):
+        read(history)
+    read_time = (time.perf_counter() - start) / reads
+    return memory, append_rate, read_time
+
+
+def main():
+    print(f"{'samples':>9} {'storage':>8} {'memory':>12} {'appends/s':>12} {'full read':>12}")
+    for size in (10, 10_000, 1_000_000):
+        reads = 1000 if size < 1_000_000 else 20
+        for name, factory, read in (
+                ('deque', DequeHistory, DequeHistory.read),
+                ('ring', RingBuffer, RingBuffer.values)):
+            memory, append_rate, read_time = measure(factory, read, size, 200_000, reads)
+            print(f"{size:>9} {name:>8} {memory / 1024:>9.1f} KiB {append_rate:>12,.0f} "
+                  f"{read_time * 1e6:>9.2f} us")
+
+
+if __name__ == '__main__':
+    main()
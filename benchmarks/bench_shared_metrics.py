@@ -0,0 +1,97 @@
+# One publisher, many viewers: the publisher's sampling and publishing cost
+# with 0, 1 and 10 attached readers, and what each reader pays per poll. The
+# publisher samples the deterministic SyntheticBackend much faster than the
+# dashboard does, to make its costs measurable; readers poll every 10 ms.
+#
+#   python benchmarks/bench_shared_metrics.py --readers 0 1 10 --seconds 5
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+from synthetic_backend import SyntheticBackend
+from shared_metrics import SharedMetricsPublisher, SharedMetricsSubscriber
+from system_metrics import SystemMetrics
+
+SEGMENT = 'sysgauge-bench'
+
+
+# Runs in each reader process until the publisher closes the segment
+def run_reader(history_length, poll_interval):
+    model = SystemMetrics(history_length, backend=SyntheticBackend(cores=0))
+    subscriber = SharedMetricsSubscriber(SEGMENT, model)
+    poll_times = []
+    cpu_start = time.process_time()
+    while not subscriber.publisher_closed():
+        start = time.perf_counter()
+        subscriber.poll()
+        poll_times.append((time.perf_counter() - start) * 1e6)
+        time.sleep(poll_interval)
+    print(json.dumps({'polls': subscriber.polls, 'retries': subscriber.retries,
+                      'poll_us': statistics.mean(poll_times), 'samples': model.get_sample_count(),
+                      'cpu_s': time.process_time() - cpu_start}))
+    subscriber.close()
+
+
+def run_publisher(readers, history_length, cores, rate, seconds, poll_interval):
+    model = SystemMetrics(history_length, backend=SyntheticBackend(cores=cores))
+    publisher = SharedMetricsPublisher(SEGMENT, model.metric_names, history_length, max_cores=cores)
+    model.add_sink(publisher)
+    processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', str(history_length),
+                                   str(poll_interval)], stdout=subprocess.PIPE, text=True)
+                 for _ in range(readers)]
+    time.sleep(0.5)  # Let the readers attach
+
+    update_times = []
+    cpu_start = time.process_time()
+    deadline = time.perf_counter() + seconds
+    next_due = time.perf_counter()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        model.update_data()
+        update_times.append((time.perf_counter() - start) * 1e6)
+        next_due += 1 / rate
+        time.sleep(max(next_due - time.perf_counter(), 0))
+    cpu = time.process_time() - cpu_start
+    publisher.close()
+    results = [json.loads(process.communicate()[0]) for process in processes]
+    return statistics.mean(update_times), cpu / seconds, len(update_times), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, nargs='+', default=[0, 1, 10])
+    parser.add_argument('--history', type=int, default=600)
+    parser.add_argument('--cores', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=200, help='publisher samples per second')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--poll-interval', type=float, default=0.01)
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_reader(int(args.child[0]), float(args.child[1]))
+        return
+
+    for readers in args.readers:
+        update_us, cpu, samples, results = run_publisher(readers, args.history, args.cores, args.rate,
+                                                         args.seconds, args.poll_interval)
+        line = (f"{readers:>3} readers: publisher update_data {update_us:6.1f} µs, "
+                f"CPU {cpu * 100:5.1f}% at {args.rate:g} samples/s")
+        if results:
+            line += (f"  | per reader: poll {statistics.mean(r['poll_us'] for r in results):6.1f} µs, "
+                     f"CPU {statistics.mean(r['cpu_s'] for r in results) / args.seconds * 100:4.1f}%, "
+                     f"retries {sum(r['retries'] for r in results)}/{sum(r['polls'] for r in results)} polls, "
+                     f"{min(r['samples'] for r in results)} samples received")
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Running statistics against recomputing them from the history. MetricStats pays
+# a fixed cost per sample; a rescan pays for the whole history on every read.
+# Also reports how far the P² quantile estimates are from the exact quantiles.
+#
+#   python benchmarks/bench_streaming_stats.py --history 600 3600 36000
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from streaming_stats import MetricStats, QUANTILES, quantile_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--history', type=int, nargs='+', default=[600, 3600, 36000])
+    parser.add_argument('--reads', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for history_length in args.history:
+        # CPU-like signal: a slow random walk with bursts, one sample every 0.25 s
+        values = []
+        level = 30.0
+        for _ in range(history_length):
+            level = min(max(level + rng.gauss(0, 2), 0.0), 100.0)
+            values.append(min(level + (rng.expovariate(0.1) if rng.random() < 0.05 else 0.0), 100.0))
+        timestamps = [index * 0.25 for index in range(history_length)]
+
+        stats = MetricStats()
+        start = time.perf_counter()
+        for timestamp, value in zip(timestamps, values):
+            stats.add(timestamp, value)
+        add_us = (time.perf_counter() - start) / history_length * 1e6
+
+        start = time.perf_counter()
+        for _ in range(args.reads):
+            stats.as_dict()
+        read_us = (time.perf_counter() - start) / args.reads * 1e6
+
+        # What a reader without running statistics does on every tick
+        history = np.array(values)
+        start = time.perf_counter()
+        for _ in range(args.reads):
+            history[-240:].mean(), history[-240:].max(), np.quantile(history, QUANTILES)
+        rescan_us = (time.perf_counter() - start) / args.reads * 1e6
+
+        errors = '  '.join(f"{quantile_name(q)} {stats.get(quantile_name(q)) - exact:+.2f}"
+                           for q, exact in zip(QUANTILES, np.quantile(history, QUANTILES)))
+        print(f"history {history_length:>6}: add {add_us:5.1f} µs/sample  read {read_us:5.1f} µs  "
+              f"rescan {rescan_us:7.1f} µs/read  quantile error (points): {errors}")
+
+
+if __name__ == '__main__':
+    main()
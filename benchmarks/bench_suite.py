@@ -0,0 +1,200 @@
+# Reproducible end-to-end benchmark of the dashboard. For every combination of
+# history length, core count and chart engine a fresh process builds the real
+# SystemMonitorController on a deterministic SyntheticBackend, drives
+# update_model_and_view() tick by tick on the offscreen Qt platform and reports:
+#
+#   - tick latency (sample + alerts + draw, including Qt's paint pass), on the
+#     Overview tab and again on the CPU Cores tab
+#   - time per stage and per chart panel (render, plus paint for the QPainter
+#     engine), from the built-in Profiler
+#   - RSS growth and traced Python allocations over the measured ticks
+#
+# Results are written as JSON; --compare prints the change against an earlier run.
+#
+#   python benchmarks/bench_suite.py --history 10 600 3600 --cores 4 64 --output before.json
+#   python benchmarks/bench_suite.py --history 10 600 3600 --cores 4 64 --compare before.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..')
+sys.path.insert(0, ROOT)
+
+# Runs on a headless box without any setup
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'mean_ms': statistics.mean(ordered),
+        'p50_ms': statistics.median(ordered),
+        'p95_ms': ordered[max(int(len(ordered) * 0.95) - 1, 0)],
+        'max_ms': ordered[-1],
+    }
+
+
+def rss_kb():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+# Tick latency and profiler stages over the given number of ticks
+def time_ticks(controller, ticks):
+    controller.profiler.reset()
+    tick_times = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        controller.update_model_and_view()
+        controller.app.processEvents()
+        tick_times.append((time.perf_counter() - start) * 1000)
+    stages = {name: {key: value for key, value in stats.items() if key != 'buckets'}
+              for name, stats in controller.profiler.snapshot()['stages'].items()}
+    return {'tick': summarize(tick_times), 'stages': stages}
+
+
+# Runs in the child: one configuration, printed as a JSON line
+def run_config(history_length, cores, devices, charts, ticks, seed):
+    from synthetic_backend import SyntheticBackend
+    from system_monitor_controller import SystemMonitorController
+
+    backend = SyntheticBackend(cores=cores, nics=devices, disks=devices, seed=seed)
+    controller = SystemMonitorController(history_length=history_length, backend=backend,
+                                         chart_backend=charts, profile=True)
+    # Ticks are driven by hand: no sampler thread, no render timer
+    controller.scheduler.stop()
+    controller.timer.stop()
+    app, model, view = controller.app, controller.model, controller.view
+    view.show()
+    app.processEvents()
+
+    # Fill the history so charts draw at full length, then warm up
+    for _ in range(history_length):
+        model.update_data()
+    for _ in range(10):
+        controller.update_model_and_view()
+        app.processEvents()
+
+    rss_before = rss_kb()
+    overview = time_ticks(controller, ticks)
+    rss_after = rss_kb()
+
+    # Allocation pass apart from the timed one, since tracing slows every allocation
+    tracemalloc.start()
+    traced_before = tracemalloc.get_traced_memory()[0]
+    for _ in range(ticks):
+        controller.update_model_and_view()
+        app.processEvents()
+    traced_after, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Only visible charts are drawn, so the heatmap is timed on its own tab
+    view.tabs.setCurrentIndex(1)
+    app.processEvents()
+    cores_tab = time_ticks(controller, ticks)
+
+    controller.shutdown()
+    print(json.dumps({
+        **overview,
+        'cores_tab': cores_tab,
+        'rss_kb': rss_after,
+        'rss_growth_kb': rss_after - rss_before,
+        'alloc_growth_kb': (traced_after - traced_before) / 1024,
+        'alloc_peak_kb': (traced_peak - traced_before) / 1024,
+    }))
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def config_key(config):
+    return (config['history'], config['cores'], config['devices'], config['charts'])
+
+
+def print_run(run, previous=None):
+    config, tick = run['config'], run['tick']
+    line = (f"history {config['history']:>6}  cores {config['cores']:>4}  devices {config['devices']:>3}  "
+            f"{config['charts']:>10}: tick p50 {tick['p50_ms']:7.2f} ms  p95 {tick['p95_ms']:7.2f} ms  "
+            f"cores tab p50 {run['cores_tab']['tick']['p50_ms']:7.2f} ms  "
+            f"RSS +{run['rss_growth_kb']:6d} KiB  allocs +{run['alloc_growth_kb']:8.1f} KiB")
+    if previous is not None:
+        line += f"  ({tick['p50_ms'] / previous['tick']['p50_ms']:.2f}x tick p50 vs baseline)"
+    print(line)
+    # The QPainter engine paints after render() returns; its cost is in the paint stage
+    panels = {}
+    for name, stats in list(run['stages'].items()) + list(run['cores_tab']['stages'].items()):
+        kind, _, panel = name.partition(' ')
+        if kind in ('render', 'paint'):
+            panels[panel] = panels.get(panel, 0.0) + stats['mean_ms']
+    print('    ' + '  '.join(f"{name} {ms:.2f}" for name, ms in panels.items()) + '  (ms per draw)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--history', type=int, nargs='+', default=[10, 600, 3600])
+    parser.add_argument('--cores', type=int, nargs='+', default=[4, 64])
+    parser.add_argument('--devices', type=int, default=4, help='synthetic NICs and disks each')
+    parser.add_argument('--charts', nargs='+', default=['matplotlib', 'qt'], choices=['matplotlib', 'qt'])
+    parser.add_argument('--ticks', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--compare', metavar='FILE', help='earlier results to compare against')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        history_length, cores, devices, charts = args.child
+        run_config(int(history_length), int(cores), int(devices), charts, args.ticks, args.seed)
+        return
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = {config_key(run['config']): run for run in json.load(file)['runs']}
+
+    runs = []
+    for charts in args.charts:
+        for history_length in args.history:
+            for cores in args.cores:
+                config = {'history': history_length, 'cores': cores, 'devices': args.devices, 'charts': charts}
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--ticks', str(args.ticks), '--seed', str(args.seed),
+                     '--child', str(history_length), str(cores), str(args.devices), charts],
+                    check=True, capture_output=True, text=True).stdout
+                run = {'config': config, **json.loads(output.strip().splitlines()[-1])}
+                runs.append(run)
+                print_run(run, baseline.get(config_key(config)))
+
+    results = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(),
+            'ticks': args.ticks,
+            'seed': args.seed,
+        },
+        'runs': runs,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+# Fake cgroup v2 hierarchy in an ordinary directory, for CgroupMonitor benchmarks
+# and for trying the Cgroups tab on hosts without cgroup v2. Groups are laid out
+# as slices of services with cpu.stat, memory.current, io.stat and pressure files
+# whose counters advance as a seeded random walk; cgroup.stat at the root keeps
+# nr_descendants up to date as groups are added and removed. Unlike the kernel's,
+# these files stay readable through open handles after their group is removed,
+# so only a change of nr_descendants makes a monitor notice.
+#
+#   python benchmarks/fake_cgroups.py /tmp/cgroups --groups 300
+#   python app.py --cgroups /tmp/cgroups
+
+import argparse
+import os
+import random
+import shutil
+import time
+
+SERVICES_PER_SLICE = 20
+
+
+class FakeCgroupTree:
+
+    def __init__(self, root, groups=200, devices=2, seed=0):
+        self.root = root
+        self.devices = devices
+        self.rng = random.Random(seed)
+        self.counters = {}  # Relative path -> [usage_usec, throttled_usec, memory, rbytes, wbytes]
+        os.makedirs(root, exist_ok=True)
+        write(os.path.join(root, 'cgroup.controllers'), 'cpuset cpu io memory pids\n')
+        self.next_service = 0
+        for _ in range(groups):
+            self.add_group()
+        self.write_stat()
+
+    def slice_for(self, service):
+        return f'slice{service // SERVICES_PER_SLICE}.slice'
+
+    # A service group, and its slice the first time one is needed
+    def add_group(self):
+        service = self.next_service
+        self.next_service += 1
+        parent = self.slice_for(service)
+        if parent not in self.counters:
+            self.create(parent)
+        path = f'{parent}/service{service}.service'
+        self.create(path)
+        return path
+
+    def create(self, path):
+        os.mkdir(os.path.join(self.root, path))
+        self.counters[path] = [0, 0, self.rng.randint(1, 512) * 1024 ** 2, 0, 0]
+        self.write_group(path)
+
+    # Removes a service group (slices stay, like systemd's)
+    def remove_group(self, path):
+        shutil.rmtree(os.path.join(self.root, path))
+        del self.counters[path]
+
+    def services(self):
+        return [path for path in self.counters if '/' in path]
+
+    def write_stat(self):
+        write(os.path.join(self.root, 'cgroup.stat'), f'nr_descendants {len(self.counters)}\nnr_dying_descendants 0\n')
+
+    # Move every counter on by seconds of synthetic activity
+    def advance(self, seconds=1.0):
+        for path, counters in self.counters.items():
+            counters[0] += int(self.rng.uniform(0, 0.5) * seconds * 1e6)
+            if self.rng.random() < 0.1:
+                counters[1] += int(self.rng.uniform(0, 0.2) * seconds * 1e6)
+            counters[2] = max(counters[2] + self.rng.randint(-4, 4) * 1024 ** 2, 1024 ** 2)
+            counters[3] += self.rng.randint(0, 256) * 1024
+            counters[4] += self.rng.randint(0, 512) * 1024
+            self.write_group(path)
+
+    # Rewritten in place, so handles held by a monitor see the new contents
+    def write_group(self, path):
+        usage, throttled, memory, read_bytes, write_bytes = self.counters[path]
+        directory = os.path.join(self.root, path)
+        write(os.path.join(directory, 'cpu.stat'),
+              f'usage_usec {usage}\nuser_usec {usage * 2 // 3}\nsystem_usec {usage // 3}\n'
+              f'nr_periods 0\nnr_throttled 0\nthrottled_usec {throttled}\n')
+        write(os.path.join(directory, 'memory.current'), f'{memory}\n')
+        write(os.path.join(directory, 'io.stat'), ''.join(
+            f'{8 * device}:0 rbytes={read_bytes // self.devices} wbytes={write_bytes // self.devices} '
+            f'rios=0 wios=0 dbytes=0 dios=0\n' for device in range(self.devices)))
+        for resource in ('cpu', 'memory', 'io'):
+            some = self.rng.uniform(0, 5)
+            write(os.path.join(directory, f'{resource}.pressure'),
+                  f'some avg10={some:.2f} avg60={some:.2f} avg300={some:.2f} total={usage}\n'
+                  f'full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n')
+
+
+def write(path, text):
+    with open(path, 'w') as file:
+        file.write(text)
+
+
+# Keeps a fake tree changing, with groups coming and going, until interrupted
+def main():
+    parser = argparse.ArgumentParser(description='Maintain a changing fake cgroup v2 tree')
+    parser.add_argument('root')
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=1.0)
+    args = parser.parse_args()
+
+    tree = FakeCgroupTree(args.root, args.groups)
+    print(f"{len(tree.counters)} cgroups under {args.root}; try: python app.py --cgroups {args.root}", flush=True)
+    tick = 0
+    try:
+        while True:
+            time.sleep(args.interval)
+            tree.advance(args.interval)
+            tick += 1
+            if tick % 10 == 5:
+                tree.remove_group(tree.rng.choice(tree.services()))
+                tree.write_stat()
+            elif tick % 10 == 0:
+                tree.add_group()
+                tree.write_stat()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
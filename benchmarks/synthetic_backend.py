@@ -0,0 +1,66 @@
+# Deterministic stand-in for the psutil backend. Every reading is a seeded random
+# walk, so benchmark runs see the same values on every machine, with any number
+# of cores, NICs and disks. Values stay under the default alert thresholds.
+
+import random
+
+# (low, high) bounds of each walk
+CPU_RANGE = (5.0, 70.0)
+MEMORY_RANGE = (30.0, 60.0)
+DISK_RANGE = (40.0, 60.0)
+
+
+class SyntheticBackend:
+
+    name = 'synthetic'
+
+    def __init__(self, cores=8, nics=2, disks=2, seed=0):
+        self.rng = random.Random(seed)
+        self.cores = [self.rng.uniform(*CPU_RANGE) for _ in range(cores)]
+        self.memory = self.rng.uniform(*MEMORY_RANGE)
+        self.disk = self.rng.uniform(*DISK_RANGE)
+        self.nics = {f'eth{i}': [0, 0, 0, 0] for i in range(nics)}
+        self.disks = {f'disk{i}': [0, 0, 0, 0] for i in range(disks)}
+
+    def step(self, value, low, high, scale):
+        return min(max(value + self.rng.uniform(-scale, scale), low), high)
+
+    # Each cpu_percent() call moves the cores; cpu_percent_per_core() reports them,
+    # matching the order SystemMetrics reads them in
+    def cpu_percent(self):
+        self.cores = [self.step(core, *CPU_RANGE, 10.0) for core in self.cores]
+        return sum(self.cores) / len(self.cores) if self.cores else 0.0
+
+    def cpu_percent_per_core(self):
+        return list(self.cores)
+
+    def memory_percent(self):
+        self.memory = self.step(self.memory, *MEMORY_RANGE, 1.0)
+        return self.memory
+
+    def disk_percent(self, path='/'):
+        self.disk = self.step(self.disk, *DISK_RANGE, 0.1)
+        return self.disk
+
+    # Counters only ever grow; increments are bytes then packets/operations
+    def advance(self, counters, byte_scale, count_scale):
+        for values in counters.values():
+            values[0] += self.rng.randint(0, byte_scale)
+            values[1] += self.rng.randint(0, byte_scale)
+            values[2] += self.rng.randint(0, count_scale)
+            values[3] += self.rng.randint(0, count_scale)
+        return {device: tuple(values) for device, values in counters.items()}
+
+    def net_io(self):
+        counters = self.advance(self.nics, 2 ** 20, 1000)
+        return (sum(values[0] for values in counters.values()),
+                sum(values[1] for values in counters.values()))
+
+    def net_io_per_nic(self):
+        return self.advance(self.nics, 2 ** 20, 1000)
+
+    def disk_io_per_disk(self):
+        return self.advance(self.disks, 2 ** 22, 200)
+
+    def close(self):
+        pass
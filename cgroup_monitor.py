@@ -0,0 +1,248 @@
+import errno
+import os
+import re
+import time
+
+# Where the unified (v2) hierarchy is mounted on current distributions
+DEFAULT_CGROUP_ROOT = '/sys/fs/cgroup'
+
+# Figures reported for every cgroup, in this order
+CGROUP_FIELDS = ('cpu_percent', 'throttled_percent', 'memory', 'read_rate', 'write_rate',
+                 'cpu_pressure', 'memory_pressure', 'io_pressure')
+
+# Interface files read on every update. Each only exists while its controller is
+# enabled for the group (cpu.stat and the pressure files are always there).
+CGROUP_FILES = ('cpu.stat', 'memory.current', 'io.stat', 'cpu.pressure', 'memory.pressure', 'io.pressure')
+
+# rbytes and wbytes of each device line of io.stat
+IO_BYTES = re.compile(rb'rbytes=(\d+) wbytes=(\d+)')
+
+# Share of the soft open-file limit that may be spent on held handles
+HANDLE_SHARE = 0.5
+
+# Latest figures for one cgroup, reused across updates while the group lives
+class CgroupInfo:
+
+    __slots__ = ('path', 'directory', 'inode', 'fds', 'usage_usec', 'throttled_usec', 'read_bytes',
+                 'write_bytes', 'values')
+
+    def __init__(self, path, directory, inode):
+        self.path = path  # Relative to the root, e.g. 'system.slice/sshd.service'
+        self.directory = directory
+        self.inode = inode  # A group removed and created again under the same name gets a new one
+        self.fds = None  # One handle (or None for a missing file) per CGROUP_FILES entry, if held
+        self.usage_usec = None
+        self.throttled_usec = None
+        self.read_bytes = None
+        self.write_bytes = None
+        self.values = (0.0,) * len(CGROUP_FIELDS)
+
+
+# Samples CPU, memory, I/O and pressure of every cgroup under a v2 root. The
+# hierarchy is only walked again when the root's cgroup.stat reports a different
+# number of descendants, or when a held handle fails because its group is gone;
+# otherwise every update is one pread per interface file on handles kept open.
+# Groups beyond the handle budget are read by path instead.
+class CgroupMonitor:
+
+    def __init__(self, root=DEFAULT_CGROUP_ROOT, max_handles=None):
+        if not os.path.exists(os.path.join(root, 'cgroup.controllers')):
+            raise ValueError(f"{root} is not a cgroup v2 hierarchy")
+        self.root = root
+        if max_handles is None:
+            import resource
+            max_handles = int(resource.getrlimit(resource.RLIMIT_NOFILE)[0] * HANDLE_SHARE)
+        self.max_handles = max_handles
+        self.handles = 0
+        self.cgroups = {}  # Relative path -> CgroupInfo
+        self.generation = 0  # Bumped after every completed update
+        self.scans = 0
+        self._stat_fd = os.open(os.path.join(root, 'cgroup.stat'), os.O_RDONLY)
+        self._descendants = None  # nr_descendants at the last scan; None forces a scan
+        self._read_size = 4096
+        self._last_update = None
+
+    def _read(self, fd):
+        while True:
+            data = os.pread(fd, self._read_size, 0)
+            if len(data) < self._read_size:
+                return data
+            # io.stat grows by a line per device
+            self._read_size *= 2
+
+    # Contents of every interface file of a group, None for the missing or
+    # unreadable ones (the pressure files fail with EOPNOTSUPP when PSI is
+    # disabled). Raises OSError once the group has been removed.
+    def _read_files(self, cgroup):
+        if cgroup.fds is not None:
+            contents = []
+            for fd in cgroup.fds:
+                try:
+                    contents.append(self._read(fd) if fd is not None else None)
+                except OSError as error:
+                    if error.errno == errno.ENODEV:  # The group is gone
+                        raise
+                    contents.append(None)
+            return contents
+        contents = []
+        for name in CGROUP_FILES:
+            try:
+                with open(os.path.join(cgroup.directory, name), 'rb') as file:
+                    contents.append(file.read())
+            except OSError as error:
+                if error.errno == errno.ENODEV or not os.path.isdir(cgroup.directory):
+                    raise
+                contents.append(None)
+        return contents
+
+    def _descendant_count(self):
+        return stat_field(self._read(self._stat_fd), b'nr_descendants')
+
+    # Walk the hierarchy, keeping the CgroupInfo (and handles) of groups still there
+    def rescan(self):
+        previous = self.cgroups
+        current = {}
+        replaced = []
+        for path, directory, inode in walk_cgroups(self.root):
+            cgroup = previous.pop(path, None)
+            if cgroup is not None and cgroup.inode != inode:
+                replaced.append(cgroup)
+                cgroup = None
+            if cgroup is None:
+                cgroup = CgroupInfo(path, directory, inode)
+            current[path] = cgroup
+        for cgroup in replaced + list(previous.values()):
+            self._close(cgroup)
+        for cgroup in current.values():
+            if cgroup.fds is None and self.handles + len(CGROUP_FILES) <= self.max_handles:
+                self._open(cgroup)
+        self.cgroups = current
+        self.scans += 1
+
+    def _open(self, cgroup):
+        fds = []
+        for name in CGROUP_FILES:
+            try:
+                fds.append(os.open(os.path.join(cgroup.directory, name), os.O_RDONLY))
+            except OSError:
+                fds.append(None)
+        cgroup.fds = fds
+        self.handles += sum(fd is not None for fd in fds)
+
+    def _close(self, cgroup):
+        if cgroup.fds is None:
+            return
+        for fd in cgroup.fds:
+            if fd is not None:
+                os.close(fd)
+                self.handles -= 1
+        cgroup.fds = None
+
+    # Sample every group; returns (timestamp, {path: values in CGROUP_FIELDS order})
+    def update(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._last_update if self._last_update is not None else None
+        self._last_update = now
+
+        descendants = self._descendant_count()
+        if descendants != self._descendants:
+            self.rescan()
+            self._descendants = descendants
+
+        rows = {}
+        for path, cgroup in self.cgroups.items():
+            try:
+                contents = self._read_files(cgroup)
+            except OSError:
+                # Removed (ENODEV, or its directory gone) since the last scan, perhaps
+                # with another created in its place, leaving the count unchanged:
+                # walk again next update
+                self._descendants = None
+                continue
+            self._update_cgroup(cgroup, contents, elapsed)
+            rows[path] = cgroup.values
+
+        self.generation += 1
+        return time.time(), rows
+
+    def _update_cgroup(self, cgroup, contents, elapsed):
+        cpu_stat, memory, io_stat, cpu_pressure, memory_pressure, io_pressure = contents
+        cpu_percent = throttled_percent = read_rate = write_rate = 0.0
+
+        if cpu_stat is not None:
+            usage = stat_field(cpu_stat, b'usage_usec')
+            throttled = stat_field(cpu_stat, b'throttled_usec')  # Only with the cpu controller
+            if elapsed:
+                if usage is not None and cgroup.usage_usec is not None:
+                    cpu_percent = max(usage - cgroup.usage_usec, 0) / elapsed / 1e4
+                if throttled is not None and cgroup.throttled_usec is not None:
+                    throttled_percent = max(throttled - cgroup.throttled_usec, 0) / elapsed / 1e4
+            cgroup.usage_usec = usage
+            cgroup.throttled_usec = throttled
+
+        if io_stat is not None:
+            read_bytes, write_bytes = io_totals(io_stat)
+            if elapsed and cgroup.read_bytes is not None:
+                read_rate = max(read_bytes - cgroup.read_bytes, 0) / elapsed
+                write_rate = max(write_bytes - cgroup.write_bytes, 0) / elapsed
+            cgroup.read_bytes = read_bytes
+            cgroup.write_bytes = write_bytes
+
+        cgroup.values = (cpu_percent, throttled_percent, int(memory) if memory is not None else 0, read_rate,
+                         write_rate, pressure(cpu_pressure), pressure(memory_pressure), pressure(io_pressure))
+
+    def close(self):
+        for cgroup in self.cgroups.values():
+            self._close(cgroup)
+        self.cgroups = {}
+        os.close(self._stat_fd)
+
+
+# (relative path, directory, inode) of every group below root, root excluded
+def walk_cgroups(root):
+    pending = [('', root)]
+    while pending:
+        prefix, directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue  # Removed while walking
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                path = prefix + entry.name
+                yield path, entry.path, entry.inode()
+                pending.append((path + '/', entry.path))
+
+
+# Integer value of a "key value" line, as in cpu.stat and cgroup.stat
+def stat_field(data, key):
+    key += b' '
+    if data.startswith(key):
+        start = len(key)
+    else:
+        start = data.find(b'\n' + key)
+        if start < 0:
+            return None
+        start += len(key) + 1
+    end = data.find(b'\n', start)
+    return int(data[start:end if end >= 0 else len(data)])
+
+
+# (read, written) bytes summed over the devices of an io.stat
+def io_totals(data):
+    read_bytes = write_bytes = 0
+    for read, written in IO_BYTES.findall(data):
+        read_bytes += int(read)
+        write_bytes += int(written)
+    return read_bytes, write_bytes
+
+
+# Share of the last 10 s in which some tasks stalled ("some avg10"), in percent
+def pressure(data):
+    if data is None:
+        return 0.0
+    start = data.find(b'avg10=')
+    if start < 0:
+        return 0.0
+    start += 6
+    return float(data[start:data.find(b' ', start)])
\ No newline at end of file
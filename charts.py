@@ -0,0 +1,67 @@
+import math
+
+# Chart engines the view can draw with. Each engine is imported only when it is
+# chosen, so the 'qt' engine runs without matplotlib installed or loaded.
+CHART_BACKENDS = ('matplotlib', 'qt')
+
+# Colours shared by every engine. 'cores' lists evenly spaced colour map stops
+# (inferno and YlOrRd) so no engine needs matplotlib's colour maps.
+CHART_THEMES = {
+    'dark': {
+        'face': '#353535',
+        'text': 'white',
+        'grid': '#555555',
+        'colors': {
+            'cpu': '#3daee9',
+            'memory': '#ff5555',
+            'network_up': '#50fa7b',
+            'network_down': '#bd93f9',
+            'disk_used': '#ff79c6',
+            'disk_free': '#44475a',
+            'disk_read': '#ffb86c',
+            'disk_write': '#8be9fd',
+            'cores': ['#000004', '#210c4a', '#57106e', '#8a226a', '#bc3754',
+                      '#e45a31', '#f98e09', '#f9cb35', '#fcffa4'],
+        },
+    },
+    'light': {
+        'face': '#ffffff',
+        'text': 'black',
+        'grid': '#cccccc',
+        'colors': {
+            'cpu': '#0078d4',
+            'memory': '#d83b01',
+            'network_up': '#107c10',
+            'network_down': '#5c2d91',
+            'disk_used': '#008272',
+            'disk_free': '#e6e6e6',
+            'disk_read': '#ca5010',
+            'disk_write': '#038387',
+            'cores': ['#ffffcc', '#ffeda0', '#fed976', '#feb24c', '#fd8c3c',
+                      '#fc4d2a', '#e2191c', '#bb0026', '#800026'],
+        },
+    },
+}
+
+
+# render_mode only applies to matplotlib: 'blit' or 'redraw' (clear and redraw every frame)
+def make_chart_backend(name='matplotlib', render_mode='blit'):
+    if name == 'matplotlib':
+        from mpl_charts import MplChartBackend
+        return MplChartBackend(render_mode)
+    if name == 'qt':
+        from qt_charts import QtChartBackend
+        return QtChartBackend()
+    raise ValueError(f"Unknown chart backend '{name}' (expected one of: {', '.join(CHART_BACKENDS)})")
+
+
+# Round y limit (1, 2 or 5 x 10^k) above the visible peak of an autoscaled chart.
+# It only shrinks once the peak falls well below the current limit, so the scale
+# doesn't flap.
+def nice_limit(peak, current=0):
+    target = max(peak * 1.1, 0.1)
+    magnitude = 10.0 ** math.floor(math.log10(target))
+    limit = next(step * magnitude for step in (1, 2, 5, 10) if step * magnitude >= target)
+    if limit > current or limit * 4 <= current:
+        return limit
+    return current
\ No newline at end of file
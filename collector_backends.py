@@ -0,0 +1,212 @@
+import os
+import sys
+
+# Field order of the per-device counters returned by every backend
+NET_COUNTER_FIELDS = ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv')
+DISK_COUNTER_FIELDS = ('read_bytes', 'write_bytes', 'read_count', 'write_count')
+
+# /proc/diskstats counts 512-byte sectors whatever the device's block size
+SECTOR_SIZE = 512
+
+_whole_disks = {}
+
+# True for whole block devices (sda, nvme0n1), false for partitions, whose
+# traffic is already included in their disk's counters
+def is_whole_disk(name):
+    whole = _whole_disks.get(name)
+    if whole is None:
+        whole = _whole_disks[name] = os.path.exists('/sys/block/' + name.replace('/', '!'))
+    return whole
+
+# Portable readings through psutil
+class PsutilBackend:
+
+    name = 'psutil'
+
+    def __init__(self):
+        # Imported here so the /proc backend can run without loading psutil at all
+        import psutil
+        self._psutil = psutil
+
+    def cpu_percent(self):
+        return self._psutil.cpu_percent()
+
+    def cpu_percent_per_core(self):
+        return self._psutil.cpu_percent(percpu=True)
+
+    def memory_percent(self):
+        return self._psutil.virtual_memory().percent
+
+    def disk_percent(self, path='/'):
+        return self._psutil.disk_usage(path).percent
+
+    # Cumulative (bytes_sent, bytes_recv) over all interfaces
+    def net_io(self):
+        counters = self._psutil.net_io_counters()
+        return counters.bytes_sent, counters.bytes_recv
+
+    # Raw per-device counters; wraparound is left to the rate engine
+    def net_io_per_nic(self):
+        counters = self._psutil.net_io_counters(pernic=True, nowrap=False)
+        return {nic: tuple(values[:4]) for nic, values in counters.items()}
+
+    def disk_io_per_disk(self):
+        counters = self._psutil.disk_io_counters(perdisk=True, nowrap=False) or {}
+        return {
+            disk: (values.read_bytes, values.write_bytes, values.read_count, values.write_count)
+            for disk, values in counters.items() if is_whole_disk(disk)
+        }
+
+    def close(self):
+        pass
+
+
+# Linux readings straight from /proc. The files stay open and are re-read with
+# preadv into one reused buffer; only the fields SysGauge needs are parsed.
+# Results follow psutil's definitions so both backends report the same values.
+class ProcBackend:
+
+    name = 'proc'
+
+    def __init__(self, proc_root='/proc', disk_path='/'):
+        self._stat_fd = os.open(os.path.join(proc_root, 'stat'), os.O_RDONLY)
+        self._meminfo_fd = os.open(os.path.join(proc_root, 'meminfo'), os.O_RDONLY)
+        self._net_dev_fd = os.open(os.path.join(proc_root, 'net', 'dev'), os.O_RDONLY)
+        diskstats = os.path.join(proc_root, 'diskstats')
+        self._diskstats_fd = os.open(diskstats, os.O_RDONLY) if os.path.exists(diskstats) else None
+        self._disk_fd = os.open(disk_path, os.O_RDONLY)
+        self._disk_path = disk_path
+        self._buffer = bytearray(16384)
+        cpu_times = self._read_cpu_times(per_core=True)
+        self._last_cpu = cpu_times[0]
+        self._last_cores = cpu_times[1:]
+
+    def _read(self, fd):
+        while True:
+            size = os.preadv(fd, [self._buffer], 0)
+            if size < len(self._buffer):
+                return size
+            # The file outgrew the buffer (many interfaces, for example)
+            self._buffer = bytearray(2 * len(self._buffer))
+
+    # (total, busy) jiffies from the aggregate "cpu" line of /proc/stat and, with
+    # per_core, from each "cpuN" line after it. As in psutil, guest time is
+    # already part of user time and is not counted twice.
+    def _read_cpu_times(self, per_core=False):
+        size = self._read(self._stat_fd)
+        buffer = self._buffer
+        cpu_times = []
+        position = 0
+        while buffer.startswith(b'cpu', position):
+            end = buffer.find(b'\n', position, size)
+            times = [int(field) for field in buffer[position:end].split()[1:9]]  # user .. steal
+            total = sum(times)
+            cpu_times.append((total, total - times[3] - times[4]))  # minus idle and iowait
+            if not per_core:
+                break
+            position = end + 1
+        return cpu_times
+
+    def cpu_percent(self):
+        cpu_times = self._read_cpu_times()[0]
+        percent = busy_percent(cpu_times, self._last_cpu)
+        self._last_cpu = cpu_times
+        return percent
+
+    def cpu_percent_per_core(self):
+        cores = self._read_cpu_times(per_core=True)[1:]
+        if len(cores) != len(self._last_cores):
+            # CPUs went on- or offline: this reading becomes the new baseline, since
+            # a zero one would report every core's average since boot
+            self._last_cores = cores
+            return [0.0] * len(cores)
+        percents = [busy_percent(times, last) for times, last in zip(cores, self._last_cores)]
+        self._last_cores = cores
+        return percents
+
+    def memory_percent(self):
+        size = self._read(self._meminfo_fd)
+        total = self._meminfo_field(size, b'MemTotal:')
+        available = self._meminfo_field(size, b'MemAvailable:')
+        return round((total - available) / total * 100, 1)
+
+    def _meminfo_field(self, size, key):
+        buffer = self._buffer
+        start = buffer.find(key, 0, size) + len(key)
+        return int(buffer[start:buffer.find(b'kB', start, size)])
+
+    # Same arithmetic as psutil.disk_usage: space reserved for root is neither used nor free
+    def disk_percent(self, path='/'):
+        stat = os.fstatvfs(self._disk_fd) if path == self._disk_path else os.statvfs(path)
+        used = (stat.f_blocks - stat.f_bfree) * stat.f_frsize
+        total_user = used + stat.f_bavail * stat.f_frsize
+        return round(used / total_user * 100, 1) if total_user else 0.0
+
+    def net_io(self):
+        sent = recv = 0
+        for _, fields in self._net_dev_rows():
+            recv += int(fields[0])
+            sent += int(fields[8])
+        return sent, recv
+
+    def net_io_per_nic(self):
+        return {
+            nic.decode(): (int(fields[8]), int(fields[0]), int(fields[9]), int(fields[1]))
+            for nic, fields in self._net_dev_rows()
+        }
+
+    # (interface, counters) rows of /proc/net/dev: two header lines, then
+    # "iface: rx_bytes rx_packets ... (8 rx fields) tx_bytes tx_packets ..."
+    def _net_dev_rows(self):
+        size = self._read(self._net_dev_fd)
+        buffer = self._buffer
+        position = buffer.find(b'\n', buffer.find(b'\n', 0, size) + 1, size) + 1
+        while position < size:
+            end = buffer.find(b'\n', position, size)
+            if end < 0:
+                end = size
+            colon = buffer.find(b':', position, end)
+            yield buffer[position:colon].strip(), buffer[colon + 1:end].split()
+            position = end + 1
+
+    # "major minor name reads merged sectors_read ms writes merged sectors_written ..."
+    def disk_io_per_disk(self):
+        if self._diskstats_fd is None:
+            return {}
+        size = self._read(self._diskstats_fd)
+        counters = {}
+        for line in self._buffer[:size].splitlines():
+            fields = line.split()
+            name = fields[2].decode()
+            if len(fields) >= 14 and is_whole_disk(name):
+                counters[name] = (int(fields[5]) * SECTOR_SIZE, int(fields[9]) * SECTOR_SIZE,
+                                  int(fields[3]), int(fields[7]))
+        return counters
+
+    def close(self):
+        for fd in (self._stat_fd, self._meminfo_fd, self._net_dev_fd, self._diskstats_fd, self._disk_fd):
+            if fd is not None:
+                os.close(fd)
+
+
+# Busy share of the jiffies elapsed between two (total, busy) readings, as psutil rounds it
+def busy_percent(cpu_times, last_cpu_times):
+    total_delta = cpu_times[0] - last_cpu_times[0]
+    if total_delta <= 0:
+        return 0.0
+    percent = (cpu_times[1] - last_cpu_times[1]) / total_delta * 100
+    return round(min(max(percent, 0.0), 100.0), 1)
+
+
+BACKENDS = {'psutil': PsutilBackend, 'proc': ProcBackend}
+
+
+# 'auto' prefers /proc on Linux and falls back to psutil elsewhere
+def make_backend(name='psutil'):
+    if name == 'auto':
+        name = 'proc' if sys.platform.startswith('linux') and os.path.exists('/proc/stat') else 'psutil'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}' (expected one of: auto, {', '.join(BACKENDS)})")
+    if name == 'proc' and not sys.platform.startswith('linux'):
+        raise ValueError("The proc backend is only available on Linux")
+    return BACKENDS[name]()
\ No newline at end of file
@@ -0,0 +1,334 @@
+from collections import OrderedDict
+import numpy as np
+from history_decimation import MinMaxPyramid, plot_points
+
+# Samples per block; only the newest, still filling, block is kept uncompressed
+BLOCK_SIZE = 256
+
+# Decoded blocks kept for repeated reads: enough for a few screens of raw samples
+CACHE_BLOCKS = 16
+
+# Pyramid levels with more buckets than this would only suit charts over 2000 px wide
+PYRAMID_MAX_BUCKETS = 1024
+
+# Delta-of-delta timestamp classes: (prefix, bits of the signed value). A zero
+# delta-of-delta is a single '0' bit; anything wider than 32 bits takes '11111' + 64.
+DOD_CLASSES = (('10', 7), ('110', 12), ('1110', 20), ('11110', 32))
+DOD_ESCAPE = '11111'
+
+# The same as arrays indexed by code (0 for a zero delta-of-delta, then
+# DOD_CLASSES, then the escape), for the vectorised timestamp codec: prefix bits
+# left-aligned in 5 columns, prefix length and payload width
+DOD_CODES = ('0',) + tuple(prefix for prefix, _ in DOD_CLASSES) + (DOD_ESCAPE,)
+DOD_PREFIX_BITS = np.array([[int(bit) for bit in prefix.ljust(5, '0')] for prefix in DOD_CODES], dtype=np.uint8)
+DOD_PREFIX_LENGTHS = np.array([len(prefix) for prefix in DOD_CODES])
+DOD_WIDTHS = np.array([0] + [width for _, width in DOD_CLASSES] + [64])
+DOD_CODE_LENGTHS = tuple((DOD_PREFIX_LENGTHS + DOD_WIDTHS).tolist())
+# Payload bits of each code at the bottom of a 64-bit word, and the shift that
+# sign-extends them
+DOD_MASKS = np.array([(1 << width) - 1 for width in DOD_WIDTHS.tolist()], dtype=np.uint64)
+DOD_SHIFTS = np.array([64 - width if width else 0 for width in DOD_WIDTHS.tolist()], dtype=np.int64)
+
+# Code of the delta-of-delta starting with each 5-bit string
+DOD_CODE_OF = {format(bits, '05b'): next(code for code, prefix in enumerate(DOD_CODES)
+                                         if format(bits, '05b').startswith(prefix))
+               for bits in range(32)}
+
+# Gorilla-style block encoding (Pelkonen et al., VLDB 2015), as a bit string:
+#
+#   timestamps   first one in 64 bits (integer microseconds), then the
+#                delta-of-delta of each following one in a DOD_CLASSES bucket
+#   values       first one as its 64 raw bits, then each XORed with the one before:
+#                '0' if equal, '10' + the meaningful bits if they fit the previous
+#                leading/trailing zero window, else '11' + 5 bits of leading zeros
+#                + 6 bits of length - 1 + the meaningful bits
+#
+# Regular sampling makes most timestamps 1-2 bytes, and slowly changing values
+# a few bits each. Values round-trip exactly; timestamps to the microsecond.
+def encode_block(timestamps, values):
+    bits = [encode_timestamps(timestamps)]
+
+    words = np.asarray(values, dtype=np.float64).view(np.uint64).tolist()
+    bits.append(format(words[0], '064b'))
+    previous = words[0]
+    leading, trailing = 65, 65  # No window yet
+    for word in words[1:]:
+        xor = word ^ previous
+        previous = word
+        if xor == 0:
+            bits.append('0')
+            continue
+        zeros_before = min(64 - xor.bit_length(), 31)
+        zeros_after = (xor & -xor).bit_length() - 1
+        if zeros_before >= leading and zeros_after >= trailing:
+            width = 64 - leading - trailing
+            bits.append('10' + format(xor >> trailing, f'0{width}b'))
+        else:
+            leading, trailing = zeros_before, zeros_after
+            width = 64 - leading - trailing
+            bits.append('11' + format(leading, '05b') + format(width - 1, '06b') + format(xor >> trailing, f'0{width}b'))
+
+    stream = ''.join(bits)
+    stream += '0' * (-len(stream) % 8)
+    return int(stream, 2).to_bytes(len(stream) // 8, 'big')
+
+
+# Bit string of the timestamp part of a block. Every delta-of-delta is written
+# as a row of 5 prefix and 64 payload columns, and a mask keeps the prefix and
+# the low payload bits of each row, in order.
+def encode_timestamps(timestamps):
+    micros = np.round(np.asarray(timestamps, dtype=np.float64) * 1e6).astype(np.int64)
+    dods = np.diff(np.diff(micros, prepend=micros[:1]))
+    codes = np.full(len(dods), len(DOD_CODES) - 1)
+    for code in range(len(DOD_CLASSES), 0, -1):  # Narrowest fitting class wins
+        half = 1 << (DOD_WIDTHS[code] - 1)
+        codes[(dods >= -half) & (dods < half)] = code
+    codes[dods == 0] = 0
+
+    rows = np.concatenate([DOD_PREFIX_BITS[codes], big_endian_bits(dods)], axis=1)
+    columns = np.arange(rows.shape[1])
+    keep = ((columns < DOD_PREFIX_LENGTHS[codes][:, None])
+            | (columns >= rows.shape[1] - DOD_WIDTHS[codes][:, None]))
+    bits = np.concatenate([big_endian_bits(micros[:1]).ravel(), rows[keep]])
+    return (bits + ord('0')).tobytes().decode('ascii')
+
+
+# (samples x 64) bits of int64 values, most significant first (two's complement)
+def big_endian_bits(values):
+    return np.unpackbits(values.astype('>i8').view(np.uint8).reshape(-1, 8), axis=1)
+
+
+# (timestamps, values) float64 arrays of a block of count samples
+def decode_block(data, count):
+    stream = format(int.from_bytes(data, 'big'), f'0{len(data) * 8}b')
+    micros, position = decode_timestamps(data, stream, count)
+
+    word = int(stream[position:position + 64], 2)
+    position += 64
+    words = [word]
+    trailing = width = 0
+    for _ in range(count - 1):
+        if stream[position] == '0':
+            position += 1
+        else:
+            if stream[position + 1] == '1':
+                leading = int(stream[position + 2:position + 7], 2)
+                width = int(stream[position + 7:position + 13], 2) + 1
+                trailing = 64 - leading - width
+                position += 13
+            else:
+                position += 2
+            word ^= int(stream[position:position + width], 2) << trailing
+            position += width
+        words.append(word)
+
+    return micros / 1e6, np.array(words, dtype=np.uint64).view(np.float64)
+
+
+# (int64 microseconds, position of the values in stream) from the timestamp
+# part of a block. Only finding where each delta-of-delta ends is sequential;
+# the 64 bits up to each end are then gathered at once, cut to the payload
+# width, sign-extended and summed up twice.
+def decode_timestamps(data, stream, count):
+    code_of, lengths = DOD_CODE_OF, DOD_CODE_LENGTHS
+    codes = []
+    position = 64
+    for _ in range(count - 1):
+        code = code_of[stream[position:position + 5]]  # The values follow, so 5 bits are always there
+        codes.append(code)
+        position += lengths[code]
+
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    first = int(stream[:64], 2)
+    if not codes:
+        return np.array([first], dtype=np.int64), position
+    codes = np.array(codes)
+    ends = 64 + np.cumsum(DOD_PREFIX_LENGTHS[codes] + DOD_WIDTHS[codes])
+    words = np.packbits(bits[ends[:, None] + np.arange(-64, 0)], axis=1).view('>u8').ravel()
+    dods = (words & DOD_MASKS[codes]).astype(np.int64)
+    shifts = DOD_SHIFTS[codes]
+    dods = (dods << shifts) >> shifts
+    micros = first + np.concatenate([[0], np.cumsum(np.cumsum(dods))])
+    return micros, position
+
+
+class _Block:
+
+    __slots__ = ('id', 'first', 'last', 'count', 'data', 'raw')
+
+    def __init__(self, block_id, first, last, count, raw):
+        self.id = block_id
+        self.first = first
+        self.last = last
+        self.count = count
+        self.data = None  # Encoded bytes, once encode_pending() has run
+        self.raw = raw  # (timestamps, values) until then
+
+
+# Encode the blocks closed since the last call (see take_pending) without
+# holding lock, which guards the histories, and take it only to swap the bytes
+# in: a block takes far longer to encode than a sample to append.
+def encode_pending(blocks, lock):
+    encoded = [encode_block(*block.raw) for block in blocks]
+    with lock:
+        for block, data in zip(blocks, encoded):
+            block.data = data
+            block.raw = None
+
+
+# Drop-in alternative to MetricHistory that keeps closed blocks of BLOCK_SIZE
+# samples Gorilla-compressed and only the newest block as raw arrays. Reads
+# decode block by block (recently used blocks are cached), and charts of long
+# histories are drawn from the min/max pyramid without decoding anything.
+# Unlike MetricHistory, reads return fresh arrays rather than views.
+# A block is not encoded when it closes: append() leaves it raw for its owner
+# to pass to encode_pending() outside its lock (SystemMetrics.record does).
+# Until then reads use the raw arrays.
+class CompressedHistory:
+
+    def __init__(self, capacity, block_size=BLOCK_SIZE, cache_blocks=CACHE_BLOCKS):
+        self.capacity = capacity
+        self.block_size = min(block_size, capacity)
+        self.cache_blocks = cache_blocks
+        self.blocks = []  # Closed _Blocks, oldest first
+        self.skip = 0  # Samples at the start of the oldest block that have expired
+        self.open_timestamps = np.zeros(self.block_size)
+        self.open_values = np.zeros(self.block_size)
+        self.open_count = 0
+        self.length = 0
+        self.next_block = 0
+        self.cache = OrderedDict()  # block id -> (timestamps, values)
+        self.pending = []  # Closed blocks not yet handed to encode_pending()
+        self.generation = 0
+        self.summary = MinMaxPyramid(capacity, max_fine_buckets=PYRAMID_MAX_BUCKETS)
+
+    def __len__(self):
+        return self.length
+
+    # Bytes held for the samples: compressed blocks, the open block and the cache
+    @property
+    def nbytes(self):
+        cached = sum(timestamps.nbytes + values.nbytes for timestamps, values in self.cache.values())
+        return (sum(len(block.data) if block.data is not None else block.raw[0].nbytes + block.raw[1].nbytes
+                    for block in self.blocks) + self.open_timestamps.nbytes
+                + self.open_values.nbytes + cached)
+
+    def append(self, timestamp, value):
+        timestamp = round(timestamp * 1e6) / 1e6  # What the block will decode to
+        self.open_timestamps[self.open_count] = timestamp
+        self.open_values[self.open_count] = value
+        self.open_count += 1
+        self.length += 1
+        self.summary.append(timestamp, value)
+        self.generation += 1
+
+        if self.open_count == self.block_size:
+            self.close_block()
+        if self.length > self.capacity:
+            # The open block never exceeds capacity, so the excess is in closed blocks
+            self.skip += self.length - self.capacity
+            self.length = self.capacity
+            while self.blocks and self.skip >= self.blocks[0].count:
+                block = self.blocks.pop(0)
+                self.skip -= block.count
+                self.cache.pop(block.id, None)
+
+    def close_block(self):
+        count = self.open_count
+        timestamps = self.open_timestamps[:count].copy()
+        values = self.open_values[:count].copy()
+        timestamps.flags.writeable = False
+        values.flags.writeable = False
+        block = _Block(self.next_block, float(timestamps[0]), float(timestamps[-1]), count, (timestamps, values))
+        self.next_block += 1
+        self.blocks.append(block)
+        self.pending.append(block)
+        self.open_count = 0
+
+    # Blocks closed since the last call, for encode_pending()
+    def take_pending(self):
+        pending, self.pending = self.pending, []
+        return pending
+
+    def clear(self):
+        self.blocks = []
+        self.pending = []
+        self.skip = 0
+        self.open_count = 0
+        self.length = 0
+        self.cache.clear()
+        self.summary = MinMaxPyramid(self.capacity, max_fine_buckets=PYRAMID_MAX_BUCKETS)
+        self.generation += 1
+
+    def cache_block(self, block_id, timestamps, values):
+        timestamps.flags.writeable = False
+        values.flags.writeable = False
+        self.cache[block_id] = (timestamps, values)
+        while len(self.cache) > self.cache_blocks:
+            self.cache.popitem(last=False)
+
+    def decode(self, block):
+        if block.data is None:
+            return block.raw
+        decoded = self.cache.get(block.id)
+        if decoded is None:
+            decoded = decode_block(block.data, block.count)
+            self.cache_block(block.id, *decoded)
+        else:
+            self.cache.move_to_end(block.id)
+        return decoded
+
+    # (timestamps, values) of every retained block, oldest first, expired samples cut
+    def segments(self, blocks=None):
+        for block in self.blocks if blocks is None else blocks:
+            timestamps, values = self.decode(block)
+            if block is self.blocks[0] and self.skip:
+                timestamps, values = timestamps[self.skip:], values[self.skip:]
+            yield timestamps, values
+        if self.open_count:
+            yield self.open_timestamps[:self.open_count], self.open_values[:self.open_count]
+
+    # Newest n samples (all by default), decoding only the blocks they span
+    def newest(self, n=None):
+        n = self.length if n is None or n > self.length else n
+        if n == 0:
+            return np.zeros(0), np.zeros(0)
+        needed = n - self.open_count
+        first = len(self.blocks)
+        while needed > 0:
+            first -= 1
+            needed -= self.blocks[first].count - (self.skip if first == 0 else 0)
+        parts = list(self.segments(self.blocks[first:]))
+        timestamps = np.concatenate([timestamps for timestamps, _ in parts])
+        values = np.concatenate([values for _, values in parts])
+        return timestamps[-n:], values[-n:]
+
+    def values(self, n=None):
+        return self.newest(n)[1]
+
+    def timestamps(self, n=None):
+        return self.newest(n)[0]
+
+    # Samples with start <= timestamp < end; only blocks overlapping the range are decoded
+    def window(self, start, end=None):
+        blocks = [block for block in self.blocks
+                  if block.last >= start and (end is None or block.first < end)]
+        parts = [(timestamps, values) for timestamps, values in self.segments(blocks)
+                 if len(timestamps) and timestamps[-1] >= start and (end is None or timestamps[0] < end)]
+        if not parts:
+            return np.zeros(0), np.zeros(0)
+        timestamps = np.concatenate([timestamps for timestamps, _ in parts])
+        values = np.concatenate([values for _, values in parts])
+        first = np.searchsorted(timestamps, start, side='left')
+        last = len(timestamps) if end is None else np.searchsorted(timestamps, end, side='left')
+        return timestamps[first:last], values[first:last]
+
+    def last(self):
+        if self.length == 0:
+            raise IndexError("last() on an empty CompressedHistory")
+        if self.open_count:
+            return self.open_values[self.open_count - 1]
+        return self.decode(self.blocks[-1])[1][-1]
+
+    def plot_points(self, max_points):
+        return plot_points(self, self.summary, max_points)
\ No newline at end of file
@@ -0,0 +1,113 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox,
+                             QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView, QFileDialog)
+from PyQt5.QtCore import QTimer
+
+STAGE_COLUMNS = ['Stage', 'Count', 'Mean (ms)', 'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'Max (ms)']
+TIMER_COLUMNS = ['Timer', 'Ticks', 'Dropped', 'Interval (ms)', 'Jitter p50 (ms)', 'Jitter p99 (ms)', 'Jitter max (ms)']
+
+# Non-modal window showing the profiler's stage latencies, timer jitter and
+# collector costs, refreshed once a second while it is open
+class DiagnosticsDialog(QDialog):
+
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setWindowTitle('Diagnostics')
+        self.resize(900, 560)
+
+        layout = QVBoxLayout()
+        controls = QHBoxLayout()
+        self.enabled_box = QCheckBox('Profiling enabled')
+        self.enabled_box.setChecked(profiler.enabled)
+        self.enabled_box.toggled.connect(self.set_enabled)
+        controls.addWidget(self.enabled_box)
+        controls.addStretch(1)
+        reset_button = QPushButton('Reset')
+        reset_button.clicked.connect(self.reset)
+        controls.addWidget(reset_button)
+        save_button = QPushButton('Save...')
+        save_button.clicked.connect(self.save)
+        controls.addWidget(save_button)
+        layout.addLayout(controls)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.stage_table = self.create_table(STAGE_COLUMNS)
+        layout.addWidget(self.stage_table, stretch=2)
+        self.timer_table = self.create_table(TIMER_COLUMNS)
+        layout.addWidget(self.timer_table, stretch=1)
+        self.setLayout(layout)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def create_table(self, columns):
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.verticalHeader().setVisible(False)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.Stretch)
+        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        return table
+
+    # Only refresh while the dialog is open
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start(1000)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def set_enabled(self, enabled):
+        self.profiler.set_enabled(enabled)
+        self.refresh()
+
+    def reset(self):
+        self.profiler.reset()
+        self.refresh()
+
+    def save(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Save Diagnostics', 'sysgauge-profile.json', 'JSON (*.json)')
+        if not path:
+            return
+        try:
+            self.profiler.dump(path)
+        except OSError as error:
+            self.status_label.setText(f"Save failed: {error}")
+
+    def refresh(self):
+        snapshot = self.profiler.snapshot()
+        if not snapshot['enabled']:
+            self.status_label.setText('Profiling is off; enable it to start recording.')
+        else:
+            self.status_label.setText(f"Recording for {snapshot['taken'] - snapshot['started']:.0f} s")
+
+        # The scheduler's own counters cover the collectors even while profiling is off
+        rows = [(name, stats['count'], stats['mean_ms'], stats['p50_ms'], stats['p90_ms'],
+                 stats['p99_ms'], stats['max_ms']) for name, stats in snapshot['stages'].items()]
+        rows += [(f"collector {name} (scheduler)", stats['runs'], stats['mean_ms'], None, None, None,
+                  stats['max_ms']) for name, stats in snapshot.get('collectors', {}).items()]
+        self.fill_table(self.stage_table, rows)
+
+        rows = [(name, stats['ticks'], stats['dropped'], stats['interval_ms'], stats['jitter']['p50_ms'],
+                 stats['jitter']['p99_ms'], stats['jitter']['max_ms']) for name, stats in snapshot['timers'].items()]
+        self.fill_table(self.timer_table, rows)
+
+    def fill_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                if value is None:
+                    text = ''
+                elif isinstance(value, float):
+                    text = f"{value:.3f}"
+                else:
+                    text = str(value)
+                item = table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    table.setItem(row, column, item)
+                item.setText(text)
\ No newline at end of file
@@ -0,0 +1,160 @@
+import json
+import os
+import struct
+import sys
+import threading
+from metric_sampler import MetricSampler
+
+# Binary stream layout: magic, a length-prefixed JSON list of metric names,
+# then one little-endian float64 record (timestamp, *values) per sample
+BINARY_MAGIC = b'SYSGAUGE1\n'
+
+# Seconds between cgroup readings with --cgroups
+CGROUP_INTERVAL = 1.0
+
+# Streams timestamped samples from a SystemMetrics model without any GUI.
+# Only the collector backend and the standard library are imported on this path.
+class HeadlessCollector:
+
+    def __init__(self, model, output, interval=0.25, output_format='jsonl', count=None, stats=False, source=None):
+        self.model = model
+        # Optional SharedMetricsSubscriber that feeds the model instead of sampling;
+        # a record is then written whenever new samples have arrived
+        self.source = source
+        self.stats = stats  # jsonl only: add the model's running statistics to each record
+        self.output = output
+        self.output_format = output_format
+        self.count = count
+        self.written = 0
+        self.names = None
+        self.record = None
+        self.done = threading.Event()
+        self.error = None  # OSError that ended the run: output closed (e.g. a broken pipe) or disk full
+        self.sampler = MetricSampler(self.collect, interval)
+
+    def collect(self):
+        if self.done.is_set():
+            return
+        if self.source is not None:
+            timestamp = self.source.poll()
+            if timestamp is None or not self.model.is_ready():
+                return
+            sample = self.model.get_latest()
+        else:
+            timestamp, sample = self.model.update_data()
+        try:
+            if self.output_format == 'binary':
+                self.write_binary(timestamp, sample)
+            else:
+                record = {'timestamp': round(timestamp, 3), **sample}
+                if self.stats:
+                    record['stats'] = self.model.get_all_stats()
+                self.output.write(json.dumps(record) + '\n')
+            self.output.flush()
+        except OSError as error:
+            # Nothing more can be written; stop instead of failing on every tick
+            self.error = error
+            self.done.set()
+            return
+
+        self.written += 1
+        if self.count is not None and self.written >= self.count:
+            self.done.set()
+
+    def write_binary(self, timestamp, sample):
+        if self.names is None:
+            self.names = list(sample)
+            self.record = struct.Struct(f'<{len(self.names) + 1}d')
+            header = json.dumps(self.names).encode()
+            self.output.write(BINARY_MAGIC + struct.pack('<I', len(header)) + header)
+        self.output.write(self.record.pack(timestamp, *(sample[name] for name in self.names)))
+
+    # Returns the exit status: 0, or 1 if the output failed
+    def run(self):
+        self.sampler.start()
+        try:
+            while not self.done.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.sampler.stop()
+        return 1 if self.error is not None else 0
+
+
+def run_headless(args):
+    from system_metrics import SystemMetrics
+
+    store = None
+    if args.store:
+        from metric_store import MetricStore
+        store = MetricStore(args.store, retention=args.retention_days * 24 * 3600)
+    model = SystemMetrics(history_length=0, store=store, backend=args.backend, stat_windows=args.stat_windows)
+    recorder = None
+    if args.record:
+        from session_recorder import SessionRecorder
+        recorder = SessionRecorder(args.record)
+        model.add_sink(recorder)
+    publisher = None
+    if args.publish:
+        from shared_metrics import SharedMetricsPublisher
+        publisher = SharedMetricsPublisher(args.publish, model.metric_names, args.history)
+        model.add_sink(publisher)
+    source = None
+    if args.attach:
+        from shared_metrics import SharedMetricsSubscriber
+        source = SharedMetricsSubscriber(args.attach, model)
+
+    binary = args.format == 'binary'
+    if args.output == '-':
+        output = sys.stdout.buffer if binary else sys.stdout
+    else:
+        output = open(args.output, 'ab' if binary else 'a')
+
+    collector = HeadlessCollector(model, output, args.interval, args.format, args.count, args.stats, source)
+
+    # Per-cgroup figures only reach the /metrics endpoint; samples stay host-wide
+    cgroup_monitor = None
+    if args.cgroups and source is None:
+        from cgroup_monitor import CgroupMonitor
+        cgroup_monitor = CgroupMonitor(args.cgroups)
+        collector.sampler.add_collector(
+            'cgroups', lambda: model.record_cgroups(*cgroup_monitor.update()), CGROUP_INTERVAL)
+    exporter = None
+    if args.metrics:
+        from metrics_exporter import MetricsExporter
+        exporter = MetricsExporter(model, args.metrics)
+        # Re-rendered at least once per sampling interval, never by a scrape
+        collector.sampler.add_collector('exporter', exporter.refresh, min(args.interval, CGROUP_INTERVAL))
+        exporter.start()
+    status = 1
+    try:
+        status = collector.run()
+    finally:
+        model.backend.close()
+        if output not in (sys.stdout, sys.stdout.buffer):
+            try:
+                output.close()
+            except OSError as error:
+                collector.error = collector.error or error
+                status = 1
+        if store is not None:
+            store.close()
+        if recorder is not None:
+            recorder.close()
+        if publisher is not None:
+            publisher.close()
+        if source is not None:
+            source.close()
+        if exporter is not None:
+            exporter.close()
+        if cgroup_monitor is not None:
+            cgroup_monitor.close()
+    if collector.error is not None:
+        if isinstance(collector.error, BrokenPipeError) and output in (sys.stdout, sys.stdout.buffer):
+            # The reader went away (e.g. `| head`); keep the interpreter's final
+            # flush of stdout from failing again on exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        else:
+            print(f"Headless output failed: {collector.error}", file=sys.stderr)
+    return status
\ No newline at end of file
@@ -0,0 +1,143 @@
+import math
+import numpy as np
+from ring_buffer import RingBuffer
+
+# Min/max/mean summaries of one metric at several resolutions. Level k holds
+# buckets of factor**k raw samples; buckets cascade upwards as they fill, so
+# appends are O(1) amortized and no level is ever rebuilt from raw history.
+# Levels with more than max_fine_buckets buckets (finer than any chart could
+# use) can be left out to save memory.
+class MinMaxPyramid:
+
+    def __init__(self, capacity, factor=4, max_coarse_buckets=32, max_fine_buckets=None):
+        self.factor = factor
+        self.total = 0  # Raw samples appended so far
+        self.levels = []
+        self._pending = []  # Per level: [count, min, max, sum, first raw index]
+
+        size = factor
+        while math.ceil(capacity / (size // factor)) > max_coarse_buckets:
+            if max_fine_buckets is not None and math.ceil(capacity / size) > max_fine_buckets:
+                size *= factor
+                continue
+            buckets = RingBuffer(math.ceil(capacity / size) + 1, fields=('min', 'max', 'mean'))
+            self.levels.append((size, buckets))
+            self._pending.append(None)
+            size *= factor
+
+    def append(self, timestamp, value):
+        index = self.total
+        self.total += 1
+        summary = (value, value, value, 1, index)
+        for level, (size, buckets) in enumerate(self.levels):
+            summary = self._accumulate(level, summary)
+            if summary is None:
+                break
+            low, high, total, count, first = summary
+            buckets.append(first, low, high, total / count)
+
+    def _accumulate(self, level, summary):
+        low, high, total, count, first = summary
+        pending = self._pending[level]
+        if pending is None:
+            pending = self._pending[level] = [0, low, high, 0.0, first]
+        pending[0] += count
+        pending[1] = min(pending[1], low)
+        pending[2] = max(pending[2], high)
+        pending[3] += total
+        if pending[0] < self.levels[level][0]:
+            return None
+        # Bucket complete: hand it to the next level up
+        self._pending[level] = None
+        return (pending[1], pending[2], pending[3], pending[0], pending[4])
+
+    # Min and max of raw samples not yet in a completed bucket of this level
+    def _tail(self, level):
+        parts = [pending for pending in self._pending[:level + 1] if pending is not None]
+        if not parts:
+            return None
+        first = min(pending[4] for pending in parts)
+        return (first, min(pending[1] for pending in parts), max(pending[2] for pending in parts))
+
+    # Interleaved (x, min), (x, max) points, or None without any levels.
+    # x is the bucket centre as a sample index relative to the oldest retained sample.
+    def min_max_points(self, retained, max_points):
+        if not self.levels:
+            return None
+        # Finest level that fits, falling back to the coarsest one
+        level = next((level for level, (size, buckets) in enumerate(self.levels)
+                      if 2 * (len(buckets) + 1) <= max_points), len(self.levels) - 1)
+        size, buckets = self.levels[level]
+
+        oldest = self.total - retained
+        starts = buckets.timestamps()
+        keep = starts + size > oldest
+        starts = starts[keep]
+        lows = buckets.values(field='min')[keep]
+        highs = buckets.values(field='max')[keep]
+
+        tail = self._tail(level)
+        if tail is not None:
+            starts = np.append(starts, tail[0])
+            lows = np.append(lows, tail[1])
+            highs = np.append(highs, tail[2])
+
+        centres = np.clip(starts - oldest + (size - 1) / 2, 0, retained - 1)
+        return np.repeat(centres, 2), np.column_stack((lows, highs)).ravel()
+
+
+# Largest-Triangle-Three-Buckets: per bucket, keep the point forming the largest
+# triangle with its neighbours. The neighbours are the adjacent bucket means
+# rather than the previously selected point, so every bucket is solved at once.
+def lttb(x, y, max_points):
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return x, y
+
+    # The first and last points are always kept; the rest split into buckets
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    counts = np.diff(edges)
+    inner_x = x[1:n - 1]
+    inner_y = y[1:n - 1]
+    mean_x = np.add.reduceat(inner_x, edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(inner_y, edges[:-1] - 1) / counts
+
+    bucket = np.repeat(np.arange(len(counts)), counts)
+    prev_x = np.r_[x[0], mean_x[:-1]][bucket]
+    prev_y = np.r_[y[0], mean_y[:-1]][bucket]
+    next_x = np.r_[mean_x[1:], x[-1]][bucket]
+    next_y = np.r_[mean_y[1:], y[-1]][bucket]
+    areas = np.abs((prev_x - next_x) * (inner_y - prev_y) - (prev_x - inner_x) * (next_y - prev_y))
+
+    # Sort by bucket, then by area descending; the first entry of each bucket wins
+    order = np.lexsort((-areas, bucket))
+    best = order[np.r_[0, np.cumsum(counts)[:-1]]]
+    selected = np.r_[0, best + 1, n - 1]
+    return x[selected], y[selected]
+
+
+# Rows of a (samples x columns) array reduced to at most buckets rows, each the
+# per-column maximum of equally sized runs of consecutive samples. The few
+# oldest samples that don't fill a run are dropped. Short histories are returned as is.
+def bucket_max(values, buckets):
+    retained = len(values)
+    if retained <= buckets:
+        return values
+    step = -(-retained // buckets)
+    used = retained // step * step
+    return values[retained - used:].reshape(-1, step, *values.shape[1:]).max(axis=1)
+
+
+# Points to plot for a history drawn max_points pixels wide: the raw samples if
+# they fit, LTTB over a few screens' worth of raw samples, otherwise the min/max
+# pyramid so short spikes survive. Cost depends on max_points, not retention;
+# the pyramid path never reads the raw samples.
+def plot_points(history, pyramid, max_points, lttb_factor=4):
+    retained = len(history)
+    if retained <= max_points:
+        return np.arange(retained), history.values()
+    if retained > lttb_factor * max_points:
+        points = pyramid.min_max_points(retained, max_points)
+        if points is not None:
+            return points
+    return lttb(np.arange(retained, dtype=np.float64), history.values(), max_points)
\ No newline at end of file
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from remote_agent import AGENT_MAGIC, parse_address
+from session_recorder import LAYOUT_HEADER, SAMPLE_HEADER
+
+# Seconds before reconnecting to an agent: the first delay, doubled after every
+# failed attempt up to the second
+RECONNECT_DELAYS = (0.5, 30.0)
+
+# Seconds to wait for a connection, and for data on an open one before the
+# agent is considered gone
+CONNECT_TIMEOUT = 5.0
+STALE_TIMEOUT = 10.0
+
+# Bytes taken from a connection per read
+READ_SIZE = 1 << 16
+
+
+# Decodes an agent stream (see remote_agent.py) into a SystemMetrics model
+# through record() and record_cores(), as bytes arrive in arbitrary pieces
+class AgentStreamDecoder:
+
+    def __init__(self, model):
+        self.model = model
+        self.buffer = bytearray()
+        self.started = False  # The magic has been checked
+        self.hello = None
+        self.layouts = {}  # id -> (names or None for cores, struct of the values)
+
+    # Decode every complete frame received so far; returns the number of samples
+    def feed(self, data):
+        buffer = self.buffer
+        buffer += data
+        if not self.started:
+            if len(buffer) < len(AGENT_MAGIC):
+                return 0
+            if not buffer.startswith(AGENT_MAGIC):
+                raise ValueError("Not a SysGauge agent")
+            del buffer[:len(AGENT_MAGIC)]
+            self.started = True
+
+        offset = 0
+        samples = 0
+        size = len(buffer)
+        model = self.model
+        while offset + LAYOUT_HEADER.size <= size:
+            kind = buffer[offset:offset + 1]
+            if kind == b'S':
+                if offset + SAMPLE_HEADER.size > size:
+                    break
+                _, layout_id, timestamp = SAMPLE_HEADER.unpack_from(buffer, offset)
+                names, values_struct = self.layouts[layout_id]
+                end = offset + SAMPLE_HEADER.size + values_struct.size
+                if end > size:
+                    break
+                values = values_struct.unpack_from(buffer, offset + SAMPLE_HEADER.size)
+                if names is not None:
+                    model.record(timestamp, dict(zip(names, values)))
+                    samples += 1
+                elif model.per_core:
+                    model.record_cores(timestamp, values)
+                offset = end
+            elif kind in (b'L', b'H'):
+                _, layout_id, length = LAYOUT_HEADER.unpack_from(buffer, offset)
+                end = offset + LAYOUT_HEADER.size + length
+                if end > size:
+                    break
+                description = json.loads(bytes(buffer[offset + LAYOUT_HEADER.size:end]))
+                if kind == b'H':
+                    self.hello = description
+                elif 'names' in description:
+                    names = description['names']
+                    self.layouts[layout_id] = (names, struct.Struct(f"<{len(names)}d"))
+                else:
+                    self.layouts[layout_id] = (None, struct.Struct(f"<{description['cores']}f"))
+                offset = end
+            else:
+                raise ValueError(f"Corrupt agent stream: frame type {bytes(kind)!r}")
+        del buffer[:offset]
+        return samples
+
+
+# One monitored host: its model, and the state of the connection to its agent
+class RemoteHost:
+
+    def __init__(self, address, model):
+        self.address = address
+        self.model = model
+        self.name = address  # The agent's host name once it has said hello
+        self.info = {}  # The agent's hello: system, release, machine, processor
+        self.state = 'connecting'  # 'connecting', 'connected' or 'disconnected'
+        self.error = None  # Why the last connection ended or failed
+        self.ready = False  # Its model has a value for every metric the agent sends
+        self.connections = 0
+        self.samples = 0
+        self.bytes = 0
+        self.last_seen = None
+
+    def label(self):
+        return self.name if self.name == self.address else f"{self.name} ({self.address})"
+
+
+# Follows any number of agents from one asyncio event loop on a background
+# thread, each feeding a model of its own made by make_model(). Connections
+# that fail, close or go quiet for STALE_TIMEOUT are retried with a jittered
+# exponential backoff; a host keeps its history across reconnects. Each
+# connection is read as data arrives and decoded straight away, so unread data
+# never piles up here: a slow aggregator stops reading, TCP flow control pushes
+# back, and the agent drops samples rather than queueing them.
+class HostAggregator:
+
+    def __init__(self, addresses, make_model):
+        for address in addresses:
+            parse_address(address)  # Reject bad addresses before anything starts
+        self.hosts = [RemoteHost(address, make_model()) for address in addresses]
+        self.generation = 0  # Changes whenever a host's state or name does
+        self.loop = None
+        self.task = None
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        self.task = self.loop.create_task(self.follow_all())
+        self.thread = threading.Thread(target=self.run, name='HostAggregator', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+
+    def stop(self, timeout=2.0):
+        if self.thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.task.cancel)
+        self.thread.join(timeout)
+        self.thread = None
+
+    async def follow_all(self):
+        await asyncio.gather(*(self.follow(host) for host in self.hosts))
+
+    async def follow(self, host):
+        family, address = parse_address(host.address)
+        delay = RECONNECT_DELAYS[0]
+        while True:
+            self.set_state(host, 'connecting')
+            try:
+                if family == socket.AF_UNIX:
+                    connect = asyncio.open_unix_connection(address, limit=READ_SIZE)
+                else:
+                    connect = asyncio.open_connection(*address, limit=READ_SIZE)
+                reader, writer = await asyncio.wait_for(connect, CONNECT_TIMEOUT)
+            except (OSError, asyncio.TimeoutError) as error:
+                host.error = str(error) or 'connection timed out'
+            else:
+                host.connections += 1
+                try:
+                    host.error = await self.receive(host, reader)
+                except (OSError, ValueError, KeyError, asyncio.TimeoutError) as error:
+                    host.error = str(error) or f"no data for {STALE_TIMEOUT:g} s"
+                finally:
+                    writer.close()
+                if host.state == 'connected':
+                    delay = RECONNECT_DELAYS[0]
+            self.set_state(host, 'disconnected')
+            # Jitter keeps a rack of agents that went down together from reconnecting in step
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, RECONNECT_DELAYS[1])
+
+    # Decode the connection until the agent closes it
+    async def receive(self, host, reader):
+        decoder = AgentStreamDecoder(host.model)
+        while True:
+            data = await asyncio.wait_for(reader.read(READ_SIZE), STALE_TIMEOUT)
+            if not data:
+                return 'connection closed by the agent'
+            host.bytes += len(data)
+            host.samples += decoder.feed(data)
+            host.last_seen = time.time()
+            if host.state != 'connected' and decoder.hello is not None:
+                self.greet(host, decoder.hello)
+            if not host.ready and host.model.is_ready():
+                host.ready = True
+                self.generation += 1
+
+    def greet(self, host, hello):
+        host.name = hello.get('host') or host.address
+        host.info = hello
+        # The model is ready once the metrics the agent sends have arrived
+        published = set(hello.get('names', ()))
+        host.model.metric_names = tuple(name for name in host.model.metric_names if name in published)
+        host.error = None
+        self.set_state(host, 'connected')
+
+    def set_state(self, host, state):
+        if host.state != state:
+            host.state = state
+            self.generation += 1
+
+    def connected_count(self):
+        return sum(host.state == 'connected' for host in self.hosts)
\ No newline at end of file
@@ -0,0 +1,80 @@
+import time
+from itertools import chain
+import numpy as np
+
+# Counters exported as 32-bit values by some drivers wrap around at this value
+COUNTER_32_WRAP = 2 ** 32
+
+# Per-second rates of cumulative per-device counters (per NIC, per disk, ...).
+# Each update turns the counters of every device into one (devices x fields)
+# array and takes a single array delta against the previous snapshot, so the
+# cost barely grows with the number of devices.
+class RateEngine:
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.devices = ()
+        self._counters = None
+        self._time = None
+
+        # Replaced as a whole on every update so readers on other threads always
+        # see devices and rates that belong together
+        self.snapshot = ((), np.zeros((0, len(self.fields))), np.zeros(len(self.fields)))
+
+    # counters maps a device name to its cumulative values, one per field.
+    # Returns the (devices x fields) rates, rows in the order of counters.
+    def update(self, counters, now=None):
+        now = time.monotonic() if now is None else now
+        devices = tuple(counters)
+        current = np.fromiter(chain.from_iterable(counters.values()), dtype=np.float64,
+                              count=len(devices) * len(self.fields)).reshape(len(devices), len(self.fields))
+
+        previous = self._counters
+        if previous is not None and devices != self.devices:
+            previous = self._align(devices)
+
+        if previous is None or now <= self._time:
+            rates = np.zeros_like(current)
+        else:
+            delta = current - previous
+            backwards = delta < 0
+            if backwards.any():
+                # Only a counter that was close to 2**32 wrapped. Any other step back
+                # is a reset (driver reload, interface re-created), which has no
+                # meaningful rate for this interval and reports 0.
+                wrapped = backwards & (previous > COUNTER_32_WRAP * 3 // 4) & (previous < COUNTER_32_WRAP)
+                delta = np.where(wrapped, delta + COUNTER_32_WRAP, delta)
+                delta = np.where(delta < 0, 0, delta)
+            # Devices plugged in since the last update have no rate yet
+            delta[np.isnan(delta)] = 0
+            rates = delta / (now - self._time)
+
+        self.devices = devices
+        self._counters = current
+        self._time = now
+        self.snapshot = (devices, rates, current.sum(axis=0))
+        return rates
+
+    # Previous counters reordered to match devices; NaN for devices not seen before.
+    # Only needed when a device appears, disappears or the order changes.
+    def _align(self, devices):
+        previous = np.full((len(devices), len(self.fields)), np.nan)
+        rows = {device: row for row, device in enumerate(self.devices)}
+        for row, device in enumerate(devices):
+            old_row = rows.get(device)
+            if old_row is not None:
+                previous[row] = self._counters[old_row]
+        return previous
+
+    # Rates of all devices added together, one per field
+    def total_rates(self):
+        return self.snapshot[1].sum(axis=0)
+
+    # Cumulative counters of all devices added together, one per field
+    def total_counters(self):
+        return self.snapshot[2]
+
+    # {device: {field: rate}}
+    def device_rates(self):
+        devices, rates, _ = self.snapshot
+        return {device: dict(zip(self.fields, row)) for device, row in zip(devices, rates.tolist())}
\ No newline at end of file
@@ -0,0 +1,40 @@
+from ring_buffer import RingBuffer
+from history_decimation import MinMaxPyramid, plot_points
+
+# Raw history of one metric plus the min/max pyramid used to plot it
+class MetricHistory:
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.samples = RingBuffer(capacity)
+        self.summary = MinMaxPyramid(capacity)
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def generation(self):
+        return self.samples.generation
+
+    def append(self, timestamp, value):
+        self.samples.append(timestamp, value)
+        self.summary.append(timestamp, value)
+
+    def clear(self):
+        self.samples.clear()
+        self.summary = MinMaxPyramid(self.capacity)
+
+    def values(self, n=None):
+        return self.samples.values(n)
+
+    def timestamps(self, n=None):
+        return self.samples.timestamps(n)
+
+    def window(self, start, end=None):
+        return self.samples.window(start, end)
+
+    def last(self):
+        return self.samples.last()
+
+    def plot_points(self, max_points):
+        return plot_points(self.samples, self.summary, max_points)
\ No newline at end of file
@@ -0,0 +1,158 @@
+import threading
+import time
+import traceback
+
+# Running cost of one collector
+class CollectorStats:
+
+    __slots__ = ('runs', 'total_time', 'last_time', 'max_time', 'missed', 'errors')
+
+    def __init__(self):
+        self.runs = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.max_time = 0.0
+        self.missed = 0
+        self.errors = 0
+
+    def as_dict(self):
+        return {
+            'runs': self.runs,
+            'mean_ms': self.total_time / self.runs * 1000 if self.runs else 0.0,
+            'last_ms': self.last_time * 1000,
+            'max_ms': self.max_time * 1000,
+            'missed': self.missed,
+            'errors': self.errors,
+        }
+
+
+class _Collector:
+
+    __slots__ = ('name', 'collect', 'interval', 'next_due', 'stats')
+
+    def __init__(self, name, collect, interval, next_due):
+        self.name = name
+        self.collect = collect
+        self.interval = interval
+        self.next_due = next_due
+        self.stats = CollectorStats()
+
+
+# Runs collectors, each on its own interval, from one background thread.
+# Every collector stays on a fixed grid of its interval; collectors falling
+# due within coalesce_window of each other share a single wakeup.
+class MetricScheduler:
+
+    def __init__(self, coalesce_window=0.005):
+        self.coalesce_window = coalesce_window
+        self.wakeups = 0
+        self.profiler = None  # Optional Profiler that also receives collector timings
+        self._collectors = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def add_collector(self, name, collect, interval):
+        with self._lock:
+            self._collectors[name] = _Collector(name, collect, interval, time.monotonic())
+        self._wakeup.set()
+
+    def remove_collector(self, name):
+        with self._lock:
+            self._collectors.pop(name, None)
+        self._wakeup.set()
+
+    def set_interval(self, name, interval):
+        with self._lock:
+            collector = self._collectors[name]
+            collector.next_due += interval - collector.interval
+            collector.interval = interval
+        self._wakeup.set()
+
+    def get_intervals(self):
+        with self._lock:
+            return {name: collector.interval for name, collector in self._collectors.items()}
+
+    # Per-collector run counts and timings in milliseconds
+    def get_stats(self):
+        with self._lock:
+            return {name: dict(collector.stats.as_dict(), interval=collector.interval)
+                    for name, collector in self._collectors.items()}
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='MetricScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stopping:
+            now = time.monotonic()
+            with self._lock:
+                due = [collector for collector in self._collectors.values()
+                       if collector.next_due <= now + self.coalesce_window]
+
+            if due:
+                self.wakeups += 1
+                profiler = self.profiler
+                if profiler is not None and profiler.enabled:
+                    # How late this wakeup is relative to the earliest collector it serves
+                    profiler.record('scheduler wakeup lateness', max(now - min(c.next_due for c in due), 0.0))
+                for collector in due:
+                    self._run_collector(collector)
+
+            with self._lock:
+                next_due = min((collector.next_due for collector in self._collectors.values()), default=None)
+            timeout = None if next_due is None else max(next_due - time.monotonic(), 0.0)
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+
+    def _run_collector(self, collector):
+        stats = collector.stats
+        start = time.perf_counter()
+        try:
+            collector.collect()
+        except Exception:
+            stats.errors += 1
+            traceback.print_exc()
+        elapsed = time.perf_counter() - start
+
+        stats.runs += 1
+        stats.total_time += elapsed
+        stats.last_time = elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+        profiler = self.profiler
+        if profiler is not None and profiler.enabled:
+            profiler.record('collect ' + collector.name, elapsed)
+
+        # Stay on the interval grid; overruns skip the missed slots instead of bursting
+        collector.next_due += collector.interval
+        now = time.monotonic()
+        if now > collector.next_due:
+            missed = int((now - collector.next_due) // collector.interval) + 1
+            stats.missed += missed
+            collector.next_due += missed * collector.interval
+
+
+# Calls a single sampling function on a fixed schedule from a background thread
+class MetricSampler(MetricScheduler):
+
+    def __init__(self, sample, interval=0.25):
+        super().__init__()
+        self.add_collector('sample', sample, interval)
+
+    @property
+    def missed_ticks(self):
+        return self._collectors['sample'].stats.missed
\ No newline at end of file
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+import traceback
+import numpy as np
+
+# One fixed-size record per sample; packed so segments are plain arrays on disk
+RECORD_DTYPE = np.dtype([('timestamp', '<f8'), ('metric', '<u4'), ('value', '<f8')])
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.bin'
+METRICS_FILE = 'metrics.json'
+
+# Append-only on-disk store of timestamped samples, split into time segments.
+# Appends only queue records in memory; a writer thread flushes them in batches,
+# rotates segments every segment_duration seconds and deletes segments older
+# than retention. Reads memory-map the segments and never load a whole file.
+class MetricStore:
+
+    def __init__(self, directory, segment_duration=3600, retention=7 * 24 * 3600, flush_interval=1.0):
+        self.directory = directory
+        self.segment_duration = segment_duration
+        self.retention = retention
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._metric_ids = self._load_metric_ids()
+        self._metric_ids_dirty = False
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='MetricStoreWriter', daemon=True)
+        self._thread.start()
+
+    #
+    # -- Writing --
+    #
+
+    # Queue every metric of one tick; called on the sampling path, so no I/O here
+    def append_sample(self, timestamp, values):
+        with self._lock:
+            for name, value in values.items():
+                self._pending.append((timestamp, self._metric_id(name), value))
+
+    def append(self, name, timestamp, value):
+        self.append_sample(timestamp, {name: value})
+
+    # The batch is taken under _flush_lock, so concurrent flushes (the writer
+    # thread and close()) write batches in the order they were taken
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                metric_ids = dict(self._metric_ids) if self._metric_ids_dirty else None
+                self._metric_ids_dirty = False
+
+            if metric_ids is not None:
+                self._save_metric_ids(metric_ids)
+            if not pending:
+                return
+
+            records = np.array(pending, dtype=RECORD_DTYPE)
+            starts = (records['timestamp'] // self.segment_duration).astype(np.int64) * self.segment_duration
+            # Records arrive in time order, so each segment is one contiguous run
+            boundaries = np.flatnonzero(np.diff(starts)) + 1
+            for run in np.split(np.arange(len(records)), boundaries):
+                with open(self._segment_path(int(starts[run[0]])), 'ab') as segment:
+                    segment.write(records[run[0]:run[-1] + 1].tobytes())
+
+    # Delete segments that ended more than retention seconds ago
+    def expire(self, now=None):
+        cutoff = (now if now is not None else time.time()) - self.retention
+        with self._flush_lock:
+            for start, path in self.segments():
+                if start + self.segment_duration <= cutoff:
+                    os.remove(path)
+
+    def close(self):
+        self._stop_event.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.expire()
+            except Exception:
+                traceback.print_exc()
+
+    #
+    # -- Reading --
+    #
+
+    def segments(self):
+        segments = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith(SEGMENT_PREFIX) and filename.endswith(SEGMENT_SUFFIX):
+                start = int(filename[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                segments.append((start, os.path.join(self.directory, filename)))
+        return sorted(segments)
+
+    def metric_names(self):
+        with self._lock:
+            return sorted(self._metric_ids, key=self._metric_ids.get)
+
+    # Yield record arrays for start <= timestamp < end, at most chunk_size at a time.
+    # Arrays are slices of read-only memory maps, so nothing is read until used.
+    def query(self, start=None, end=None, metrics=None, chunk_size=65536):
+        with self._lock:
+            wanted = None if metrics is None else [self._metric_ids[name] for name in metrics if name in self._metric_ids]
+
+        for segment_start, path in self.segments():
+            if end is not None and segment_start >= end:
+                break
+            if start is not None and segment_start + self.segment_duration <= start:
+                continue
+
+            count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+            if count == 0:
+                continue
+            records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(count,))
+            timestamps = records['timestamp']
+            first = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+            last = count if end is None else np.searchsorted(timestamps, end, side='left')
+
+            for offset in range(first, last, chunk_size):
+                chunk = records[offset:min(offset + chunk_size, last)]
+                if wanted is not None:
+                    chunk = chunk[np.isin(chunk['metric'], wanted)]
+                if len(chunk):
+                    yield chunk
+
+    # Stream a time range to an open text file as CSV
+    def export_csv(self, file, start=None, end=None, metrics=None):
+        names = np.array(self.metric_names(), dtype=object)
+        file.write('timestamp,metric,value\n')
+        for chunk in self.query(start, end, metrics):
+            file.writelines(f'{timestamp:.3f},{name},{value}\n' for timestamp, name, value in zip(
+                chunk['timestamp'].tolist(), names[chunk['metric']].tolist(), chunk['value'].tolist()))
+
+    # Stream a time range to an open text file as JSON lines
+    def export_jsonl(self, file, start=None, end=None, metrics=None):
+        names = np.array(self.metric_names(), dtype=object)
+        for chunk in self.query(start, end, metrics):
+            file.writelines(json.dumps({'timestamp': timestamp, 'metric': name, 'value': value}) + '\n'
+                            for timestamp, name, value in zip(
+                chunk['timestamp'].tolist(), names[chunk['metric']].tolist(), chunk['value'].tolist()))
+
+    #
+    # -- Metric Names --
+    #
+
+    def _metric_id(self, name):
+        metric_id = self._metric_ids.get(name)
+        if metric_id is None:
+            metric_id = self._metric_ids[name] = len(self._metric_ids)
+            self._metric_ids_dirty = True
+        return metric_id
+
+    def _load_metric_ids(self):
+        path = os.path.join(self.directory, METRICS_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as file:
+            return json.load(file)
+
+    def _save_metric_ids(self, metric_ids):
+        path = os.path.join(self.directory, METRICS_FILE)
+        with open(path + '.tmp', 'w') as file:
+            json.dump(metric_ids, file)
+        os.replace(path + '.tmp', path)
+
+    def _segment_path(self, start):
+        return os.path.join(self.directory, f'{SEGMENT_PREFIX}{start}{SEGMENT_SUFFIX}')
\ No newline at end of file
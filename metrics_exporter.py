@@ -0,0 +1,210 @@
+import gzip
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collector_backends import NET_COUNTER_FIELDS, DISK_COUNTER_FIELDS
+
+# Address served when --metrics is given without one
+DEFAULT_METRICS_ADDRESS = '127.0.0.1:9151'
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Model metric -> (metric family, type, unit, help, scale to the unit)
+METRIC_FAMILIES = {
+    'cpu': ('sysgauge_cpu_usage_percent', 'gauge', 'percent', 'CPU usage over all cores', 1),
+    'memory': ('sysgauge_memory_usage_percent', 'gauge', 'percent', 'Memory in use', 1),
+    'disk': ('sysgauge_disk_usage_percent', 'gauge', 'percent', 'Space used on the root filesystem', 1),
+    'net_sent_mb': ('sysgauge_network_sent_bytes', 'counter', 'bytes', 'Bytes sent over all interfaces',
+                    1024 ** 2),
+    'net_recv_mb': ('sysgauge_network_received_bytes', 'counter', 'bytes', 'Bytes received over all interfaces',
+                    1024 ** 2),
+    'net_sent_mb_s': ('sysgauge_network_sent_bytes_per_second', 'gauge', None, 'Upload throughput', 1024 ** 2),
+    'net_recv_mb_s': ('sysgauge_network_received_bytes_per_second', 'gauge', None, 'Download throughput',
+                      1024 ** 2),
+    'disk_read_mb_s': ('sysgauge_disk_read_bytes_per_second', 'gauge', None, 'Disk read throughput', 1024 ** 2),
+    'disk_write_mb_s': ('sysgauge_disk_write_bytes_per_second', 'gauge', None, 'Disk write throughput',
+                        1024 ** 2),
+}
+
+# Process figure -> (metric family, help); one series per process in the top lists
+PROCESS_FAMILIES = (
+    ('cpu_percent', 'sysgauge_process_cpu_percent', 'CPU usage of the process'),
+    ('rss', 'sysgauge_process_resident_memory_bytes', 'Resident memory of the process'),
+    ('num_threads', 'sysgauge_process_threads', 'Threads of the process'),
+    ('read_rate', 'sysgauge_process_read_bytes_per_second', 'Disk reads of the process'),
+    ('write_rate', 'sysgauge_process_write_bytes_per_second', 'Disk writes of the process'),
+)
+
+# Cgroup figure (in CGROUP_FIELDS order) -> (metric family, help); one series per cgroup
+CGROUP_FAMILIES = (
+    ('sysgauge_cgroup_cpu_usage_percent', 'CPU usage of the cgroup, 100 per busy core'),
+    ('sysgauge_cgroup_cpu_throttled_percent', 'Share of time the cgroup was throttled by its CPU limit'),
+    ('sysgauge_cgroup_memory_bytes', 'Memory charged to the cgroup'),
+    ('sysgauge_cgroup_read_bytes_per_second', 'Disk reads of the cgroup'),
+    ('sysgauge_cgroup_write_bytes_per_second', 'Disk writes of the cgroup'),
+    ('sysgauge_cgroup_cpu_pressure_percent', 'Share of the last 10 s some tasks of the cgroup waited for CPU'),
+    ('sysgauge_cgroup_memory_pressure_percent', 'Share of the last 10 s some tasks of the cgroup waited for memory'),
+    ('sysgauge_cgroup_io_pressure_percent', 'Share of the last 10 s some tasks of the cgroup waited for I/O'),
+)
+
+
+def parse_metrics_address(text):
+    host, _, port = text.rpartition(':')
+    try:
+        return host.strip('[]') or '127.0.0.1', int(port)
+    except ValueError:
+        raise ValueError(f"Invalid metrics address '{text}': expected HOST:PORT")
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# A sample value as OpenMetrics spells it: NaN and infinities are 'NaN', '+Inf'
+# and '-Inf' rather than Python's 'nan' and 'inf'
+def format_value(value):
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+def family(lines, name, metric_type, help_text, unit=None):
+    lines.append(f"# TYPE {name} {metric_type}")
+    if unit is not None:
+        lines.append(f"# UNIT {name} {unit}")
+    lines.append(f"# HELP {name} {help_text}")
+
+
+# The newest snapshot of a model (and process monitor) in the OpenMetrics text
+# format, for Prometheus and compatible scrapers
+def render_openmetrics(model, process_monitor=None):
+    lines = []
+    latest = model.get_latest()
+    for name, (metric, metric_type, unit, help_text, scale) in METRIC_FAMILIES.items():
+        if name not in latest:
+            continue
+        family(lines, metric, metric_type, help_text, unit)
+        suffix = '_total' if metric_type == 'counter' else ''
+        lines.append(f"{metric}{suffix} {format_value(float(latest[name]) * scale)}")
+
+    cores = model.get_latest_cores()
+    if cores:
+        family(lines, 'sysgauge_core_usage_percent', 'gauge', 'CPU usage of one core', 'percent')
+        lines.extend(f'sysgauge_core_usage_percent{{core="{core}"}} {format_value(percent)}'
+                     for core, percent in enumerate(cores))
+
+    for prefix, device_rates, fields in (('sysgauge_nic', model.get_nic_rates(), NET_COUNTER_FIELDS),
+                                         ('sysgauge_disk_device', model.get_disk_rates(), DISK_COUNTER_FIELDS)):
+        if not device_rates:
+            continue
+        for field in fields:
+            metric = f'{prefix}_{field}_per_second'
+            family(lines, metric, 'gauge', f"{field.replace('_', ' ').capitalize()} per second of one device")
+            lines.extend(f'{metric}{{device="{escape_label(device)}"}} {format_value(rates[field])}'
+                         for device, rates in device_rates.items())
+
+    if process_monitor is not None:
+        # Every process in either top list, busiest first
+        processes = {process.pid: process
+                     for process in process_monitor.get_top_cpu() + process_monitor.get_top_memory()}
+        if processes:
+            for attribute, metric, help_text in PROCESS_FAMILIES:
+                family(lines, metric, 'gauge', help_text)
+                lines.extend(f'{metric}{{pid="{pid}",name="{escape_label(process.name)}"}} '
+                             f'{format_value(getattr(process, attribute))}'
+                             for pid, process in processes.items())
+
+    cgroups = model.get_cgroups()
+    if cgroups:
+        labels = {path: escape_label(path) for path in cgroups}
+        for index, (metric, help_text) in enumerate(CGROUP_FAMILIES):
+            family(lines, metric, 'gauge', help_text)
+            lines.extend(f'{metric}{{cgroup="{labels[path]}"}} {format_value(values[index])}'
+                         for path, values in cgroups.items())
+
+    lines.append('# EOF\n')
+    return '\n'.join(lines).encode()
+
+
+# Serves /metrics over HTTP from a background thread. The body (and its gzip
+# copy) is rendered by refresh(), which the owner runs on its sampling thread
+# and which skips the work unless a sample came in since; scrapes only hand out
+# the latest bytes, so any number of scrapers never touch psutil or the model.
+class MetricsExporter:
+
+    def __init__(self, model, address=DEFAULT_METRICS_ADDRESS, process_monitor=None):
+        self.model = model
+        self.process_monitor = process_monitor
+        self.lock = threading.Lock()
+        self.key = None  # (sample count, process generation, cgroup generation) of the cached body
+        self.body = b''
+        self.gzipped = b''
+        self.renders = 0
+        self.scrapes = 0
+        self.server = ThreadingHTTPServer(parse_metrics_address(address), MetricsRequestHandler)
+        self.server.daemon_threads = True
+        self.server.exporter = self
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        self.refresh()
+        self.thread = threading.Thread(target=self.server.serve_forever, name='MetricsExporter', daemon=True)
+        self.thread.start()
+
+    # Render the body again if a sample, the process table or the cgroups changed
+    def refresh(self):
+        generation = self.process_monitor.generation if self.process_monitor is not None else 0
+        key = (self.model.get_sample_count(), generation, self.model.cgroup_generation)
+        if key == self.key:
+            return
+        body = render_openmetrics(self.model, self.process_monitor)
+        gzipped = gzip.compress(body, compresslevel=1)
+        with self.lock:
+            self.body = body
+            self.gzipped = gzipped
+            self.key = key
+            self.renders += 1
+
+    # The body as of the last refresh(), or its gzip copy
+    def snapshot(self, compressed=False):
+        with self.lock:
+            self.scrapes += 1
+            return self.gzipped if compressed else self.body
+
+    def close(self):
+        if self.thread is not None:
+            self.server.shutdown()
+            self.thread = None
+        self.server.server_close()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so frequent scrapers reuse their connection
+    # Headers and body go out as separate writes; with Nagle's algorithm the body
+    # would wait for the scraper's delayed ACK (~40 ms) on every kept-alive request
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        compressed = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = self.server.exporter.snapshot(compressed)
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
\ No newline at end of file
@@ -0,0 +1,280 @@
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.gridspec import GridSpec
+from matplotlib.patches import Polygon
+from matplotlib.ticker import MaxNLocator
+from charts import nice_limit
+
+# Chart engine drawing every chart on its own matplotlib canvas.
+# render_mode 'blit' redraws only the animated artists over a cached background;
+# 'redraw' clears and redraws the whole figure each frame (kept for comparison).
+class MplChartBackend:
+
+    name = 'matplotlib'
+
+    def __init__(self, render_mode='blit'):
+        self.render_mode = render_mode
+
+    # series: [(colour key, legend label)]. y_max=None autoscales the y axis.
+    def history_chart(self, title, series, history_length, y_max=100, area=False, size=(6, 2.5)):
+        return MplHistoryChart(self.render_mode, title, size, series, history_length, y_max, area)
+
+    # series: [(colour key, label)] of the filled part and the rest of the ring
+    def donut_chart(self, title, series, size=(3, 3.5)):
+        return MplDonutChart(self.render_mode, title, size, series)
+
+    def heatmap_chart(self, title, history_length, ylabel, color_key, size=(6, 4)):
+        return MplHeatmapChart(self.render_mode, title, size, history_length, ylabel, color_key)
+
+
+# Figure, theme and blitting plumbing shared by the charts. Subclasses build their
+# artists in create_artists() and move them to the latest data in update_artists().
+class MplChart:
+
+    def __init__(self, render_mode, title, size):
+        self.render_mode = render_mode
+        self.title = title
+        self.theme = None
+        self.fig = Figure(figsize=size)
+        self.create_axes()
+        self.canvas = FigureCanvas(self.fig)
+        self.widget = self.canvas
+        self.background = None
+        self.artists = []
+        if render_mode == 'blit':
+            self.canvas.mpl_connect('draw_event', self.on_draw)
+            self.canvas.mpl_connect('resize_event', self.on_resize)
+
+    def create_axes(self):
+        self.ax = self.fig.add_subplot(111)
+
+    # Charts never need more points than the axes are pixels wide
+    def plot_width(self):
+        return max(int(self.ax.bbox.width), 16)
+
+    def set_theme(self, theme):
+        self.theme = theme
+        self.fig.set_facecolor(theme['face'])
+        self.create_artists()
+        self.fig.tight_layout(pad=1.0)
+        self.background = None
+        self.canvas.draw_idle()
+
+    def style_axes(self, ax, grid=True):
+        ax.set_facecolor(self.theme['face'])
+        ax.set_title(self.title, color=self.theme['text'], pad=10, fontsize=12)
+        ax.tick_params(colors=self.theme['text'])
+        for spine in ax.spines.values():
+            spine.set_color(self.theme['text'])
+        if grid:
+            ax.grid(True, linestyle='--', alpha=0.3, color=self.theme['grid'])
+
+    # Artists drawn on every frame; in blit mode they are left out of the background
+    def set_artists(self, artists):
+        self.artists = artists
+        if self.render_mode == 'blit':
+            for artist in artists:
+                artist.set_animated(True)
+
+    def render(self):
+        if self.render_mode == 'redraw':
+            self.create_artists()
+            self.update_artists()
+            self.fig.tight_layout(pad=1.0)
+            self.canvas.draw()
+            return
+
+        self.update_artists()
+        if self.background is None:
+            # Full draw; on_draw captures the new background
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self.background)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+        self.canvas.blit(self.blit_region())
+
+    def blit_region(self):
+        return self.ax.bbox
+
+    # Capture the static background after every full draw, then paint the artists on top
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+
+    # Layout only changes with the window size, so tight_layout runs here instead of every frame
+    def on_resize(self, event):
+        self.fig.tight_layout(pad=1.0)
+        self.background = None
+
+
+# One or more series over the sample index, optionally filled down to zero
+class MplHistoryChart(MplChart):
+
+    def __init__(self, render_mode, title, size, series, history_length, y_max, area):
+        self.series = series
+        self.history_length = history_length
+        self.y_max = y_max
+        self.area = area
+        self.limit = y_max or nice_limit(0)
+        self.data = [None] * len(series)
+        super().__init__(render_mode, title, size)
+
+    def set_series(self, index, x, y):
+        if len(y):
+            self.data[index] = (x, y)
+
+    # Forget every series, e.g. before showing another host's data
+    def clear(self):
+        self.data = [None] * len(self.series)
+
+    def create_artists(self):
+        ax = self.ax
+        ax.clear()
+        self.style_axes(ax)
+        ax.set_xlim(0, max(self.history_length - 1, 1))
+        ax.set_ylim(0, self.limit)
+        colors = self.theme['colors']
+        self.lines = [ax.plot([], [], color=colors[key], linewidth=2 if self.area else 1.5, label=label)[0]
+                      for key, label in self.series]
+        self.fills = []
+        if self.area:
+            for key, _ in self.series:
+                fill = Polygon(np.zeros((1, 2)), closed=True, alpha=0.3, color=colors[key], linewidth=0)
+                ax.add_patch(fill)
+                self.fills.append(fill)
+        if len(self.series) > 1:
+            ax.legend(loc='upper left', fontsize=8, framealpha=0.3, labelcolor=self.theme['text'])
+        self.set_artists(self.fills + self.lines)
+
+    def update_artists(self):
+        for index, data in enumerate(self.data):
+            if data is None:
+                self.lines[index].set_data([], [])
+                if self.fills:
+                    self.fills[index].set_xy(np.zeros((1, 2)))
+                continue
+            x, y = data
+            self.lines[index].set_data(x, y)
+            if self.fills:
+                self.fills[index].set_xy(np.column_stack((np.r_[x[0], x, x[-1]], np.r_[0, y, 0])))
+
+        # A new y limit changes the tick labels, which live in the background
+        if self.y_max is None:
+            peak = max((y.max() for _, y in filter(None, self.data)), default=0)
+            limit = nice_limit(peak, self.limit)
+            if limit != self.limit:
+                self.limit = limit
+                self.ax.set_ylim(0, limit)
+                self.background = None
+
+
+# Ring split into the filled share of a percentage and the rest
+class MplDonutChart(MplChart):
+
+    def __init__(self, render_mode, title, size, series):
+        self.series = series
+        self.value = 0
+        super().__init__(render_mode, title, size)
+
+    def set_value(self, percent):
+        self.value = percent
+
+    def create_artists(self):
+        ax = self.ax
+        ax.clear()
+        self.style_axes(ax, grid=False)
+        colors = self.theme['colors']
+        self.wedges, self.labels = ax.pie(
+            [50, 50],
+            labels=['', ''],
+            colors=[colors[key] for key, _ in self.series],
+            wedgeprops={'width': 0.4},
+            textprops={'color': self.theme['text']})
+        self.centre_label = ax.text(0, 0, '', ha='center', va='center', color=self.theme['text'], fontsize=12)
+        self.set_artists(self.wedges + self.labels + [self.centre_label])
+
+    # Move the wedge boundary and re-place the labels the way Axes.pie lays them out
+    def update_artists(self):
+        values = (self.value, 100 - self.value)
+        first, second = self.wedges
+        first.set_theta2(3.6 * self.value)
+        second.set_theta1(3.6 * self.value)
+
+        for wedge, label, (_, name), value in zip(self.wedges, self.labels, self.series, values):
+            angle = np.deg2rad((wedge.theta1 + wedge.theta2) / 2)
+            x, y = np.cos(angle), np.sin(angle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            label.set_text(f'{name} ({value:.1f}%)')
+        self.centre_label.set_text(f'{self.value:.1f}%')
+
+    def blit_region(self):
+        return self.fig.bbox  # pie labels extend past the axes
+
+
+# (rows x time) heatmap drawn as a single image with its colour scale alongside,
+# so drawing cost does not grow with the number of rows. The pixel buffer is
+# allocated once and rewritten in place.
+class MplHeatmapChart(MplChart):
+
+    def __init__(self, render_mode, title, size, history_length, ylabel, color_key):
+        self.history_length = history_length
+        self.ylabel = ylabel
+        self.color_key = color_key
+        self.samples = 0
+        self.data = None
+        super().__init__(render_mode, title, size)
+
+    def create_axes(self):
+        grid = GridSpec(1, 2, figure=self.fig, width_ratios=(40, 1))
+        self.ax = self.fig.add_subplot(grid[0])
+        self.cbar_ax = self.fig.add_subplot(grid[1])
+
+    def plot_width(self):
+        return min(self.history_length, super().plot_width())
+
+    # samples: retained history length; data: (columns x rows), oldest column first
+    def set_data(self, samples, data):
+        if len(data):
+            self.samples, self.data = samples, data
+
+    def create_artists(self):
+        rows = self.data.shape[1] if self.data is not None else 1
+        ax = self.ax
+        ax.clear()
+        self.style_axes(ax, grid=False)
+        self.pixels = np.zeros((rows, self.plot_width()), dtype=np.float32)
+        cmap = LinearSegmentedColormap.from_list(self.color_key, self.theme['colors'][self.color_key])
+        self.image = ax.imshow(
+            self.pixels[:, :1], aspect='auto', origin='lower', interpolation='nearest',
+            cmap=cmap, vmin=0, vmax=100, extent=(-0.5, 0.5, -0.5, rows - 0.5))
+        ax.set_xlim(0, max(self.history_length - 1, 1))
+        ax.set_ylim(-0.5, rows - 0.5)
+        ax.set_ylabel(self.ylabel, color=self.theme['text'])
+        ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+
+        self.cbar_ax.clear()
+        colorbar = self.fig.colorbar(self.image, cax=self.cbar_ax)
+        colorbar.ax.tick_params(colors=self.theme['text'])
+        colorbar.outline.set_edgecolor(self.theme['text'])
+        self.set_artists([self.image])
+
+    def update_artists(self):
+        if self.data is None:
+            return
+        columns, rows = self.data.shape
+        if rows != self.pixels.shape[0]:
+            # New row count (first data or CPU hotplug): new image, limits and colour bar
+            self.create_artists()
+            self.background = None
+        if columns > self.pixels.shape[1]:
+            self.pixels = np.zeros((rows, columns), dtype=np.float32)
+
+        pixels = self.pixels[:, :columns]
+        pixels[...] = self.data.T
+        self.image.set_data(pixels)
+        self.image.set_extent((-0.5, self.samples - 0.5, -0.5, rows - 0.5))
\ No newline at end of file
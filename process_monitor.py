@@ -0,0 +1,121 @@
+import heapq
+import threading
+import time
+
+PROCESS_ATTRS = ['pid', 'name', 'create_time', 'cpu_times', 'memory_info', 'io_counters', 'num_threads']
+
+# Latest figures for one process, reused across ticks while the process lives
+class ProcessInfo:
+
+    __slots__ = ('pid', 'name', 'create_time', 'process', 'cpu_time', 'cpu_percent', 'rss',
+                 'read_bytes', 'write_bytes', 'read_rate', 'write_rate', 'num_threads')
+
+    def __init__(self, pid, name, create_time, process=None):
+        self.pid = pid
+        self.name = name
+        self.create_time = create_time
+        self.process = process
+        self.cpu_time = None
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.read_bytes = None
+        self.write_bytes = None
+        self.read_rate = 0.0
+        self.write_rate = 0.0
+        self.num_threads = 0
+
+
+# Collects CPU%, RSS, I/O and thread counts for every process and keeps the
+# top N by CPU and by memory. CPU% and I/O rates are deltas against the
+# previous tick, computed from cached ProcessInfo objects keyed by pid.
+class ProcessMonitor:
+
+    def __init__(self, top_n=15, source=None):
+        self.top_n = top_n
+        self.processes = {}
+        self.generation = 0  # Bumped after every completed update
+        self._source = source or iter_psutil_processes
+        self._last_update = None
+        self._top_cpu = []
+        self._top_memory = []
+        self._lock = threading.Lock()
+
+    def update(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = now - self._last_update if self._last_update is not None else None
+        self._last_update = now
+
+        previous = self.processes
+        current = {}
+        top_cpu = []
+        top_memory = []
+        for info in self._source():
+            pid = info['pid']
+            process = previous.get(pid)
+            # A reused pid shows up with a different create_time
+            if process is None or process.create_time != info['create_time']:
+                # The name is None when psutil was denied access to it
+                process = ProcessInfo(pid, info['name'] or '?', info['create_time'], info.get('process'))
+            self._update_process(process, info, elapsed)
+            current[pid] = process
+
+            # Bounded min-heaps: O(n log N) instead of sorting every process
+            self._push_top(top_cpu, process.cpu_percent, process)
+            self._push_top(top_memory, process.rss, process)
+
+        self.processes = current
+        with self._lock:
+            self._top_cpu = [entry[2] for entry in sorted(top_cpu, reverse=True)]
+            self._top_memory = [entry[2] for entry in sorted(top_memory, reverse=True)]
+            self.generation += 1
+
+    def _update_process(self, process, info, elapsed):
+        cpu_times = info['cpu_times']
+        if cpu_times is not None:
+            cpu_time = cpu_times[0] + cpu_times[1]  # user + system
+            if elapsed and process.cpu_time is not None:
+                process.cpu_percent = max(cpu_time - process.cpu_time, 0.0) / elapsed * 100
+            process.cpu_time = cpu_time
+
+        memory_info = info['memory_info']
+        process.rss = memory_info[0] if memory_info is not None else 0
+        process.num_threads = info['num_threads'] or 0
+
+        # io_counters needs extra privileges for other users' processes
+        io_counters = info['io_counters']
+        if io_counters is not None:
+            read_bytes, write_bytes = io_counters[2], io_counters[3]
+            if elapsed and process.read_bytes is not None:
+                process.read_rate = max(read_bytes - process.read_bytes, 0) / elapsed
+                process.write_rate = max(write_bytes - process.write_bytes, 0) / elapsed
+            process.read_bytes, process.write_bytes = read_bytes, write_bytes
+
+    def _push_top(self, heap, key, process):
+        entry = (key, process.pid, process)
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    # Getters for the latest top-N lists, highest first
+    def get_top_cpu(self):
+        with self._lock:
+            return list(self._top_cpu)
+
+    def get_top_memory(self):
+        with self._lock:
+            return list(self._top_memory)
+
+    def get_process_count(self):
+        return len(self.processes)
+
+
+# process_iter caches Process objects between calls and reads each process's
+# attributes inside oneshot(), so every /proc file is opened once per tick.
+# psutil is imported on first use, so the module loads without it.
+def iter_psutil_processes():
+    import psutil
+    for process in psutil.process_iter(PROCESS_ATTRS, ad_value=None):
+        info = process.info
+        info['process'] = process
+        yield info
\ No newline at end of file
@@ -0,0 +1,176 @@
+import json
+import threading
+import time
+
+# Buckets cover 1 µs to ~67 s; bucket i holds durations below 2**i µs
+HISTOGRAM_BUCKETS = 27
+
+# Log-spaced latency histogram: constant memory, O(1) adds, percentiles to within
+# a factor of two
+class LatencyHistogram:
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        bucket = min(int(seconds * 1e6).bit_length(), HISTOGRAM_BUCKETS - 1)
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    # Upper bound of the bucket holding the q-th quantile, in seconds
+    def percentile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(2 ** bucket / 1e6, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(0.5) * 1000,
+            'p90_ms': self.percentile(0.9) * 1000,
+            'p99_ms': self.percentile(0.99) * 1000,
+            'max_ms': self.max * 1000,
+            # {upper bound in µs: samples}, empty buckets left out
+            'buckets': {2 ** bucket: count for bucket, count in enumerate(self.counts) if count},
+        }
+
+
+# How far a periodic timer fires from its interval, and how many ticks it skipped
+class TimerStats:
+
+    __slots__ = ('ticks', 'dropped', 'interval', 'jitter')
+
+    def __init__(self):
+        self.ticks = 0
+        self.dropped = 0
+        self.interval = 0.0
+        self.jitter = LatencyHistogram()
+
+    def add(self, expected, actual):
+        self.ticks += 1
+        self.interval = expected
+        # A gap spanning several intervals means the ticks in between never ran
+        missed = round(actual / expected) - 1 if expected > 0 else 0
+        if missed > 0:
+            self.dropped += missed
+            actual -= missed * expected
+        self.jitter.add(abs(actual - expected))
+
+    def as_dict(self):
+        return {'ticks': self.ticks, 'dropped': self.dropped, 'interval_ms': self.interval * 1000,
+                'jitter': self.jitter.as_dict()}
+
+
+# Times a block into a stage histogram
+class _Stage:
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+# Stands in for _Stage while profiling is off, so a disabled stage costs one
+# attribute check and an empty with block
+class _NullStage:
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+
+# Self-profiling of SysGauge's own hot paths: per-stage latency histograms and
+# timer jitter, recorded from the GUI and sampler threads. Everything is a no-op
+# until enabled.
+class Profiler:
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {}
+        self.timers = {}
+        self.sources = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    # with profiler.stage('update_plot'): ...
+    def stage(self, name):
+        return _Stage(self, name) if self.enabled else NULL_STAGE
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = LatencyHistogram()
+            histogram.add(seconds)
+
+    # A periodic timer meant to fire every expected seconds fired actual seconds after its last tick
+    def record_tick(self, name, expected, actual):
+        if not self.enabled:
+            return
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = TimerStats()
+            timer.add(expected, actual)
+
+    # Extra stats included in every snapshot, e.g. the scheduler's per-collector costs
+    def add_source(self, name, get_stats):
+        self.sources[name] = get_stats
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+            self.timers.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self.lock:
+            snapshot = {
+                'enabled': self.enabled,
+                'started': self.started,
+                'taken': time.time(),
+                'stages': {name: histogram.as_dict() for name, histogram in sorted(self.stages.items())},
+                'timers': {name: timer.as_dict() for name, timer in sorted(self.timers.items())},
+            }
+        for name, get_stats in self.sources.items():
+            snapshot[name] = get_stats()
+        return snapshot
+
+    def dump(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.snapshot(), file, indent=2)
\ No newline at end of file
@@ -0,0 +1,337 @@
+import math
+import numpy as np
+from PyQt5 import sip
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QRectF, QPointF, QSize
+from PyQt5.QtGui import QPainter, QColor, QPen, QPolygonF, QImage, QFont
+from charts import nice_limit
+from profiler import Profiler
+
+# Chart sizes are given in inches like matplotlib figure sizes
+DPI = 100
+
+# Chart engine of plain QWidgets painting straight from the model's arrays with
+# QPainter. Nothing is rasterized off screen or copied between toolkits, and
+# matplotlib is never imported.
+class QtChartBackend:
+
+    name = 'qt'
+
+    # series: [(colour key, legend label)]. y_max=None autoscales the y axis.
+    def history_chart(self, title, series, history_length, y_max=100, area=False, size=(6, 2.5)):
+        return QtHistoryChart(title, size, series, history_length, y_max, area)
+
+    # series: [(colour key, label)] of the filled part and the rest of the ring
+    def donut_chart(self, title, series, size=(3, 3.5)):
+        return QtDonutChart(title, size, series)
+
+    def heatmap_chart(self, title, history_length, ylabel, color_key, size=(6, 4)):
+        return QtHeatmapChart(title, size, history_length, ylabel, color_key)
+
+
+# QPolygonF filled from coordinate arrays through its own buffer, without a
+# QPointF per point
+def polygon(x, y):
+    points = QPolygonF(len(x))
+    pointer = points.data()
+    pointer.setsize(len(x) * 2 * 8)
+    coordinates = np.frombuffer(pointer, dtype=np.float64).reshape(-1, 2)
+    coordinates[:, 0] = x
+    coordinates[:, 1] = y
+    return points
+
+
+# Tick spacing of 1, 2 or 5 x 10^k giving at most max_ticks intervals over span
+def tick_step(span, max_ticks):
+    rough = max(span, 1e-9) / max_ticks
+    magnitude = 10.0 ** math.floor(math.log10(rough))
+    return next(step * magnitude for step in (1, 2, 5, 10) if step * magnitude >= rough)
+
+
+# 256-entry colour table interpolated between evenly spaced colour stops
+def color_table(stops):
+    rgb = np.array([QColor(stop).getRgb()[:3] for stop in stops], dtype=np.float64)
+    positions = np.linspace(0, 1, len(stops))
+    levels = np.linspace(0, 1, 256)
+    red, green, blue = (np.interp(levels, positions, rgb[:, channel]).astype(int) for channel in range(3))
+    return [0xff000000 | r << 16 | g << 8 | b for r, g, b in zip(red.tolist(), green.tolist(), blue.tolist())]
+
+
+# Background, title, axes, grid and tick labels shared by the charts. Subclasses
+# paint their data inside plot_rect() in paint_data().
+class QtChart(QWidget):
+
+    # Margins around the plot area for the title and tick labels
+    margins = (45, 32, 12, 24)  # left, top, right, bottom
+
+    def __init__(self, title, size):
+        super().__init__()
+        self.title = title
+        self.theme = None
+        self.widget = self
+        # Painting happens after render() returns, so it is timed here as its own stage
+        self.profiler = Profiler()
+        self.paint_stage = 'paint ' + title
+        self.preferred_size = QSize(int(size[0] * DPI), int(size[1] * DPI))
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        # Every pixel is painted on each frame, so Qt need not clear the widget first
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.title_font = QFont(self.font())
+        self.title_font.setPointSize(11)
+        self.tick_font = QFont(self.font())
+        self.tick_font.setPointSize(8)
+
+    def sizeHint(self):
+        return self.preferred_size
+
+    def plot_rect(self):
+        left, top, right, bottom = self.margins
+        return QRectF(left, top, max(self.width() - left - right, 1), max(self.height() - top - bottom, 1))
+
+    # Charts never need more points than the plot area is pixels wide
+    def plot_width(self):
+        return max(int(self.plot_rect().width()), 16)
+
+    def set_theme(self, theme):
+        self.theme = theme
+        self.face = QColor(theme['face'])
+        self.text = QColor(theme['text'])
+        self.grid = QColor(theme['grid'])
+        self.colors = {key: QColor(value) for key, value in theme['colors'].items() if isinstance(value, str)}
+        self.update()
+
+    # Painting happens on Qt's next paint event; repeated calls before it coalesce
+    def render(self):
+        self.update()
+
+    def paintEvent(self, event):
+        if self.theme is None:
+            return
+        with self.profiler.stage(self.paint_stage):
+            painter = QPainter(self)
+            painter.fillRect(self.rect(), self.face)
+            painter.setPen(self.text)
+            painter.setFont(self.title_font)
+            painter.drawText(QRectF(0, 6, self.width(), 22), Qt.AlignHCenter | Qt.AlignVCenter, self.title)
+            self.paint_data(painter, self.plot_rect())
+            painter.end()
+
+    # Frame, dashed grid lines and tick labels of a plot area spanning x_range and y_range
+    # min_y_step=1 keeps row-index axes on whole numbers
+    def paint_axes(self, painter, rect, x_range, y_range, grid=True, min_y_step=0):
+        painter.setFont(self.tick_font)
+        grid_pen = QPen(self.grid if grid else Qt.transparent, 1, Qt.DashLine)
+        (x0, x1), (y0, y1) = x_range, y_range
+
+        step = max(tick_step(y1 - y0, 4 if rect.height() > 120 else 2), min_y_step)
+        value = math.ceil(y0 / step) * step
+        while value <= y1 + step * 1e-6:
+            y = rect.bottom() - (value - y0) / (y1 - y0) * rect.height()
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
+            painter.setPen(self.text)
+            painter.drawText(QRectF(0, y - 8, rect.left() - 5, 16), Qt.AlignRight | Qt.AlignVCenter, f'{value:g}')
+            value += step
+
+        step = tick_step(x1 - x0, max(int(rect.width() / 60), 1))
+        value = math.ceil(x0 / step) * step
+        while value <= x1 + step * 1e-6:
+            x = rect.left() + (value - x0) / (x1 - x0) * rect.width()
+            painter.setPen(grid_pen)
+            painter.drawLine(QPointF(x, rect.top()), QPointF(x, rect.bottom()))
+            painter.setPen(self.text)
+            painter.drawText(QRectF(x - 30, rect.bottom() + 3, 60, 16), Qt.AlignHCenter | Qt.AlignTop, f'{value:g}')
+            value += step
+
+        painter.setPen(self.text)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRect(rect)
+
+
+# One or more series over the sample index, optionally filled down to zero
+class QtHistoryChart(QtChart):
+
+    def __init__(self, title, size, series, history_length, y_max, area):
+        super().__init__(title, size)
+        self.series = series
+        self.history_length = history_length
+        self.y_max = y_max
+        self.area = area
+        self.limit = y_max or nice_limit(0)
+        self.data = [None] * len(series)
+
+    def set_series(self, index, x, y):
+        if len(y):
+            self.data[index] = (x, y)
+
+    # Forget every series, e.g. before showing another host's data
+    def clear(self):
+        self.data = [None] * len(self.series)
+
+    def render(self):
+        if self.y_max is None:
+            peak = max((y.max() for _, y in filter(None, self.data)), default=0)
+            self.limit = nice_limit(peak, self.limit)
+        self.update()
+
+    def paint_data(self, painter, rect):
+        x_max = max(self.history_length - 1, 1)
+        self.paint_axes(painter, rect, (0, x_max), (0, self.limit))
+
+        painter.save()
+        painter.setClipRect(rect)
+        painter.setRenderHint(QPainter.Antialiasing)
+        x_scale = rect.width() / x_max
+        y_scale = rect.height() / self.limit
+        for (key, _), data in zip(self.series, self.data):
+            if data is None:
+                continue
+            x, y = data
+            x = rect.left() + x * x_scale
+            y = rect.bottom() - y * y_scale
+            color = self.colors[key]
+            if self.area:
+                fill = polygon(x, y)
+                fill.append(QPointF(x[-1], rect.bottom()))
+                fill.append(QPointF(x[0], rect.bottom()))
+                fill_color = QColor(color)
+                fill_color.setAlphaF(0.3)
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(fill_color)
+                painter.drawPolygon(fill)
+            painter.setPen(QPen(color, 2 if self.area else 1.5))
+            painter.setBrush(Qt.NoBrush)
+            # A wide antialiased polyline is stroked as one outline, which is very slow
+            # for jagged data; the same points as separate segments are ~20x cheaper
+            painter.drawLines(polygon(np.repeat(x, 2)[1:-1], np.repeat(y, 2)[1:-1]))
+        painter.restore()
+
+        if len(self.series) > 1:
+            self.paint_legend(painter, rect)
+
+    def paint_legend(self, painter, rect):
+        painter.setFont(self.tick_font)
+        y = rect.top() + 10
+        for key, label in self.series:
+            painter.setPen(QPen(self.colors[key], 2))
+            painter.drawLine(QPointF(rect.left() + 8, y), QPointF(rect.left() + 24, y))
+            painter.setPen(self.text)
+            painter.drawText(QRectF(rect.left() + 28, y - 8, 100, 16), Qt.AlignLeft | Qt.AlignVCenter, label)
+            y += 15
+
+
+# Ring split into the filled share of a percentage and the rest
+class QtDonutChart(QtChart):
+
+    def __init__(self, title, size, series):
+        super().__init__(title, size)
+        self.series = series
+        self.value = 0
+
+    def set_value(self, percent):
+        self.value = percent
+
+    def paint_data(self, painter, rect):
+        # Square ring centred in the widget, leaving room for the legend below
+        legend_height = 20
+        side = max(min(self.width() - 20, self.height() - rect.top() - legend_height - 8), 10)
+        thickness = side * 0.2
+        ring = QRectF((self.width() - side) / 2 + thickness / 2, rect.top() + thickness / 2,
+                      side - thickness, side - thickness)
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        values = (self.value, 100 - self.value)
+        start = 0
+        for (key, _), value in zip(self.series, values):
+            span = int(round(value * 3.6 * 16))  # Qt angles are 1/16 degree, counter-clockwise from 3 o'clock
+            painter.setPen(QPen(self.colors[key], thickness, Qt.SolidLine, Qt.FlatCap))
+            painter.drawArc(ring, start, span)
+            start += span
+
+        painter.setPen(self.text)
+        painter.setFont(self.title_font)
+        painter.drawText(ring, Qt.AlignCenter, f'{self.value:.1f}%')
+
+        painter.setFont(self.tick_font)
+        x = 10
+        y = ring.bottom() + thickness / 2 + 6
+        for (key, label), value in zip(self.series, values):
+            painter.fillRect(QRectF(x, y + 3, 10, 10), self.colors[key])
+            painter.setPen(self.text)
+            painter.drawText(QRectF(x + 14, y, 120, 16), Qt.AlignLeft | Qt.AlignVCenter, f'{label} ({value:.1f}%)')
+            x += self.width() / 2
+
+
+# (rows x time) heatmap painted from one indexed 8-bit QImage whose pixel
+# buffer is allocated once and rewritten in place, so cost does not grow with
+# the number of rows
+class QtHeatmapChart(QtChart):
+
+    margins = (45, 32, 60, 24)  # room for the colour bar on the right
+
+    def __init__(self, title, size, history_length, ylabel, color_key):
+        super().__init__(title, size)
+        self.history_length = history_length
+        self.ylabel = ylabel
+        self.color_key = color_key
+        self.samples = 0
+        self.columns = 0
+        self.indices = None
+        self.image = None
+
+    def plot_width(self):
+        return min(self.history_length, super().plot_width())
+
+    def set_theme(self, theme):
+        super().set_theme(theme)
+        self.colors_table = color_table(theme['colors'][self.color_key])
+        if self.image is not None:
+            self.image.setColorTable(self.colors_table)
+        # Colour bar: one column of all 256 levels, 100% at the top (scanlines are 4-byte aligned)
+        self.bar_indices = np.repeat(np.arange(255, -1, -1, dtype=np.uint8)[:, None], 4, axis=1)
+        self.bar_image = QImage(sip.voidptr(self.bar_indices.ctypes.data), 1, 256, 4, QImage.Format_Indexed8)
+        self.bar_image.setColorTable(self.colors_table)
+
+    # samples: retained history length; data: (columns x rows), oldest column first
+    def set_data(self, samples, data):
+        columns, rows = data.shape
+        if columns == 0:
+            return
+        if self.indices is None or self.indices.shape[0] != rows or self.indices.shape[1] < columns:
+            stride = (max(columns, self.plot_width()) + 3) // 4 * 4
+            self.indices = np.zeros((rows, stride), dtype=np.uint8)
+            self.image = QImage(sip.voidptr(self.indices.ctypes.data), stride, rows, stride, QImage.Format_Indexed8)
+            self.image.setColorTable(self.colors_table)
+        # Highest row on top, percentages scaled to colour table indices
+        pixels = self.indices[::-1, :columns]
+        np.multiply(data.T, 2.55, out=pixels, casting='unsafe')
+        self.samples = samples
+        self.columns = columns
+
+    def paint_data(self, painter, rect):
+        rows = self.indices.shape[0] if self.indices is not None else 1
+        x_max = max(self.history_length - 1, 1)
+        painter.fillRect(rect, self.face)
+        if self.image is not None:
+            painter.save()
+            painter.setClipRect(rect)
+            x_scale = rect.width() / x_max
+            target = QRectF(rect.left() - 0.5 * x_scale, rect.top(), self.samples * x_scale, rect.height())
+            painter.drawImage(target, self.image, QRectF(0, 0, self.columns, rows))
+            painter.restore()
+        self.paint_axes(painter, rect, (0, x_max), (-0.5, rows - 0.5), grid=False, min_y_step=1)
+
+        painter.save()
+        painter.translate(12, rect.center().y())
+        painter.rotate(-90)
+        painter.setPen(self.text)
+        painter.drawText(QRectF(-50, -8, 100, 16), Qt.AlignCenter, self.ylabel)
+        painter.restore()
+
+        bar = QRectF(rect.right() + 14, rect.top(), 12, rect.height())
+        painter.drawImage(bar, self.bar_image)
+        painter.setPen(self.text)
+        painter.drawRect(bar)
+        for value in (0, 50, 100):
+            y = bar.bottom() - value / 100 * bar.height()
+            painter.drawText(QRectF(bar.right() + 4, y - 8, 40, 16), Qt.AlignLeft | Qt.AlignVCenter, str(value))
\ No newline at end of file
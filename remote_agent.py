@@ -0,0 +1,210 @@
+import json
+import os
+import platform
+import socket
+import struct
+import sys
+import threading
+from metric_sampler import MetricScheduler
+from session_recorder import LAYOUT_HEADER, SAMPLE_HEADER
+
+# Port used when an agent address gives none
+DEFAULT_AGENT_PORT = 9150
+
+# Agent stream: magic, a hello frame, then session recording frames (see
+# session_recorder.py), sent in batches:
+#   b'H' u16 0, u32 length, JSON    {"host", "system", "release", "machine",
+#                                    "processor", "names", "interval"}
+#   b'L' / b'S'                     layouts and samples; layouts are declared
+#                                   afresh on every connection
+AGENT_MAGIC = b'SYSGAUGEAGT1\n'
+
+# Once this much is waiting for an aggregator that can't keep up, new samples
+# for it are dropped instead of queued
+MAX_PENDING_BYTES = 1 << 20
+
+
+# 'host:port', 'host' or '[v6 address]:port' for TCP; 'unix:PATH' or an absolute
+# path for a Unix socket. Returns (socket family, address).
+def parse_address(text):
+    if text.startswith('unix:'):
+        return socket.AF_UNIX, text[len('unix:'):]
+    if text.startswith('/'):
+        return socket.AF_UNIX, text
+    host, separator, port = text.rpartition(':')
+    if not separator or host.endswith(':'):
+        host, port = text, DEFAULT_AGENT_PORT  # A bare host name or v6 address
+    try:
+        port = int(port)
+    except ValueError:
+        raise ValueError(f"Invalid agent address '{text}': expected HOST:PORT or unix:PATH")
+    host = host.strip('[]') or '127.0.0.1'
+    return (socket.AF_INET6 if ':' in host else socket.AF_INET), (host, port)
+
+
+class _AgentClient:
+
+    __slots__ = ('sock', 'layouts', 'pending', 'dropped')
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.layouts = {}  # layout key -> (id, struct of the values)
+        self.pending = bytearray()  # Frames not yet accepted by the socket
+        self.dropped = 0
+
+
+# Serves the samples of a SystemMetrics model to any number of aggregators
+# (dashboards started with --hosts) over TCP or a Unix socket. It is a model
+# sink: every sample is encoded once per connection as it is recorded, and
+# everything queued is sent once per batch_interval. Sockets are non-blocking
+# and everything runs on the sampler thread, so an aggregator that can't keep
+# up only has its own queue fill up (see MAX_PENDING_BYTES); sampling never waits.
+# Standard library only, like headless mode.
+class RemoteAgent:
+
+    def __init__(self, model, address, interval=0.25, batch_interval=1.0, max_pending=MAX_PENDING_BYTES):
+        self.model = model
+        self.interval = interval
+        self.batch_interval = batch_interval
+        self.max_pending = max_pending
+        self.family, self.address = parse_address(address)
+        self.listener = self.listen()
+        self.clients = []
+        self.hello = json.dumps({
+            'host': socket.gethostname(),
+            'system': platform.system(),
+            'release': platform.release(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'names': list(model.metric_names),
+            'interval': interval,
+        }).encode()
+        self.bytes_sent = 0
+        self.stopped = threading.Event()
+        model.add_sink(self)
+
+    def listen(self):
+        listener = socket.socket(self.family, socket.SOCK_STREAM)
+        try:
+            if self.family == socket.AF_UNIX:
+                self.remove_stale_socket()
+            else:
+                listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind(self.address)
+            listener.listen(16)
+        except (OSError, ValueError):
+            listener.close()
+            raise
+        listener.setblocking(False)
+        return listener
+
+    # A socket file left behind by an agent that died is replaced; a live one is an error
+    def remove_stale_socket(self):
+        if not os.path.exists(self.address):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.address)
+        except OSError:
+            os.unlink(self.address)
+        else:
+            raise ValueError(f"Another agent already listens on {self.address}")
+        finally:
+            probe.close()
+
+    # The agent keeps no history, so per-core usage is read here rather than by the model
+    def collect(self):
+        timestamp, _ = self.model.update_data()
+        if not self.model.per_core:
+            self.append_cores(timestamp, self.model.backend.cpu_percent_per_core())
+
+    def append_sample(self, timestamp, sample):
+        for client in self.clients:
+            self.encode(client, tuple(sample), {'names': list(sample)}, 'd', timestamp, list(sample.values()))
+
+    def append_cores(self, timestamp, percents):
+        for client in self.clients:
+            self.encode(client, ('cores', len(percents)), {'cores': len(percents)}, 'f', timestamp, percents)
+
+    def encode(self, client, key, description, code, timestamp, values):
+        if len(client.pending) >= self.max_pending:
+            client.dropped += 1
+            return
+        layout = client.layouts.get(key)
+        if layout is None:
+            layout_id = len(client.layouts)
+            header = json.dumps(description).encode()
+            client.pending += LAYOUT_HEADER.pack(b'L', layout_id, len(header)) + header
+            layout = client.layouts[key] = (layout_id, struct.Struct(f'<{len(values)}{code}'))
+        layout_id, values_struct = layout
+        client.pending += SAMPLE_HEADER.pack(b'S', layout_id, timestamp) + values_struct.pack(*values)
+
+    def accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            client = _AgentClient(sock)
+            client.pending += AGENT_MAGIC + LAYOUT_HEADER.pack(b'H', 0, len(self.hello)) + self.hello
+            self.clients.append(client)
+
+    # Take new aggregators, then hand each one whatever its socket accepts of its queue
+    def send(self):
+        self.accept()
+        for client in list(self.clients):
+            if not client.pending:
+                continue
+            try:
+                sent = client.sock.send(client.pending)
+            except (BlockingIOError, InterruptedError):
+                continue  # Its socket buffer is full: the aggregator is behind
+            except OSError:
+                self.disconnect(client)
+                continue
+            del client.pending[:sent]
+            self.bytes_sent += sent
+
+    def disconnect(self, client):
+        self.clients.remove(client)
+        client.sock.close()
+
+    # Samples dropped for aggregators that couldn't keep up, over the connected ones
+    def get_dropped(self):
+        return sum(client.dropped for client in self.clients)
+
+    def run(self):
+        scheduler = MetricScheduler()
+        scheduler.add_collector('sample', self.collect, self.interval)
+        scheduler.add_collector('send', self.send, self.batch_interval)
+        scheduler.start()
+        try:
+            while not self.stopped.wait(0.5):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scheduler.stop()
+
+    def close(self):
+        for client in list(self.clients):
+            self.disconnect(client)
+        self.listener.close()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+
+
+def run_agent(args):
+    from system_metrics import SystemMetrics
+
+    # No in-memory history, so NumPy is never imported (see SystemMetrics)
+    model = SystemMetrics(history_length=0, backend=args.backend, stat_windows=())
+    agent = RemoteAgent(model, args.agent, args.interval, args.batch_interval)
+    print(f"SysGauge agent serving {args.agent}", file=sys.stderr)
+    try:
+        agent.run()
+    finally:
+        agent.close()
+        model.backend.close()
+    return 0
\ No newline at end of file
@@ -0,0 +1,89 @@
+import numpy as np
+
+# Fixed-capacity history of (timestamp, value) samples in preallocated arrays.
+# Each sample is written twice, at slot i and i + capacity, so the newest n
+# samples always form one contiguous slice that can be handed out as a view.
+# With a shape, every value is a row (e.g. one entry per CPU core) and views
+# are (samples x shape) arrays.
+class RingBuffer:
+
+    def __init__(self, capacity, fields=('value',), dtype=np.float64, shape=()):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self.shape = tuple(shape)
+        self._columns = {field: np.zeros((2 * capacity,) + self.shape, dtype=dtype) for field in self.fields}
+        self._index = 0  # Next slot to write, in [0, capacity)
+        self._length = 0
+        self.generation = 0  # Bumped on every change, so readers can skip unchanged data
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def nbytes(self):
+        return self._timestamps.nbytes + sum(column.nbytes for column in self._columns.values())
+
+    # O(1): two scalar stores per column, no allocation
+    def append(self, timestamp, *values):
+        i = self._index
+        j = i + self.capacity
+        self._timestamps[i] = self._timestamps[j] = timestamp
+        for field, value in zip(self.fields, values):
+            column = self._columns[field]
+            column[i] = column[j] = value
+
+        self._index = i + 1 if i + 1 < self.capacity else 0
+        if self._length < self.capacity:
+            self._length += 1
+        self.generation += 1
+
+    def clear(self):
+        self._index = 0
+        self._length = 0
+        self.generation += 1
+
+    #
+    # -- Views --
+    # Returned arrays are read-only views into the buffer, not copies. They stay
+    # contiguous but are only stable until the buffer wraps over them; copy them
+    # if they need to outlive later appends.
+    #
+
+    def timestamps(self, n=None):
+        return self._view(self._timestamps, self._slice(n))
+
+    def values(self, n=None, field=None):
+        return self._view(self._columns[field or self.fields[0]], self._slice(n))
+
+    # Samples with start <= timestamp < end, found by binary search on the timestamps
+    def window(self, start, end=None, field=None):
+        timestamps = self.timestamps()
+        first = np.searchsorted(timestamps, start, side='left')
+        last = len(timestamps) if end is None else np.searchsorted(timestamps, end, side='left')
+        values = self.values(field=field)
+        return timestamps[first:last], values[first:last]
+
+    def last(self, field=None):
+        if self._length == 0:
+            raise IndexError("last() on an empty RingBuffer")
+        return self._columns[field or self.fields[0]][self._index + self.capacity - 1]
+
+    def last_timestamp(self):
+        if self._length == 0:
+            raise IndexError("last_timestamp() on an empty RingBuffer")
+        return self._timestamps[self._index + self.capacity - 1]
+
+    def _slice(self, n):
+        if n is None or n > self._length:
+            n = self._length
+        end = self._index + self.capacity
+        return slice(end - n, end)
+
+    @staticmethod
+    def _view(array, window):
+        view = array[window]
+        view.flags.writeable = False
+        return view
\ No newline at end of file
@@ -0,0 +1,67 @@
+import json
+import struct
+import threading
+import time
+
+# Session file layout: magic, then a stream of frames.
+#   b'L' u16 id, u32 length, JSON    declares a layout: {"names": [...]} for a
+#                                    (partial) sample, {"cores": n} for per-core usage
+#   b'S' u16 id, f64 timestamp, values   one sample in a declared layout; float64
+#                                        values for samples, float32 for cores
+# Every collector writes its own partial sample, so a handful of layouts cover a
+# whole session and each sample costs 11 bytes plus its values.
+SESSION_MAGIC = b'SYSGAUGEREC1\n'
+LAYOUT_HEADER = struct.Struct('<cHI')
+SAMPLE_HEADER = struct.Struct('<cHd')
+
+# Records the timestamped sample stream of a SystemMetrics model to a session
+# file, as a model sink. Standard library only, so it also runs in headless mode.
+class SessionRecorder:
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.file = open(path, 'wb')
+        self.file.write(SESSION_MAGIC)
+        self.layouts = {}  # layout key -> (id, struct of the values)
+        self.samples = 0
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()  # Collectors append from the sampler thread
+
+    def append_sample(self, timestamp, sample):
+        names = tuple(sample)
+        with self.lock:
+            layout = self.layouts.get(names)
+            if layout is None:
+                layout = self.declare(names, {'names': list(names)}, 'd', len(names))
+            self.write(layout, timestamp, sample.values())
+
+    def append_cores(self, timestamp, percents):
+        key = ('cores', len(percents))
+        with self.lock:
+            layout = self.layouts.get(key)
+            if layout is None:
+                layout = self.declare(key, {'cores': len(percents)}, 'f', len(percents))
+            self.write(layout, timestamp, percents)
+
+    def declare(self, key, description, code, count):
+        layout_id = len(self.layouts)
+        header = json.dumps(description).encode()
+        self.file.write(LAYOUT_HEADER.pack(b'L', layout_id, len(header)) + header)
+        layout = self.layouts[key] = (layout_id, struct.Struct(f'<{count}{code}'))
+        return layout
+
+    def write(self, layout, timestamp, values):
+        layout_id, values_struct = layout
+        self.file.write(SAMPLE_HEADER.pack(b'S', layout_id, timestamp) + values_struct.pack(*values))
+        self.samples += 1
+        # Buffered writes; flushed about once a second so a crash loses little
+        now = time.monotonic()
+        if now - self.last_flush >= self.flush_interval:
+            self.file.flush()
+            self.last_flush = now
+
+    def close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
\ No newline at end of file
@@ -0,0 +1,209 @@
+import json
+import threading
+import time
+import numpy as np
+from session_recorder import SESSION_MAGIC, LAYOUT_HEADER, SAMPLE_HEADER
+from system_metrics import add_stats
+
+# A recorded session loaded into per-layout arrays, plus one time-ordered event
+# index over all of them for seeking
+class SessionReader:
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            data = file.read()
+        if not data.startswith(SESSION_MAGIC):
+            raise ValueError(f"{path} is not a SysGauge session recording")
+
+        self.layouts = []  # {'names': [...]} or {'cores': n}
+        formats = []
+        rows = []
+        event_layouts = []
+        event_times = []
+        offset = len(SESSION_MAGIC)
+        size = len(data)
+        while offset < size:
+            kind = data[offset:offset + 1]
+            if kind == b'L':
+                # Layouts can be declared mid-session, so one may be cut off as well
+                if offset + LAYOUT_HEADER.size > size:
+                    break
+                _, layout_id, length = LAYOUT_HEADER.unpack_from(data, offset)
+                offset += LAYOUT_HEADER.size
+                if offset + length > size:
+                    break
+                layout = json.loads(data[offset:offset + length])
+                offset += length
+                count = len(layout['names']) if 'names' in layout else layout['cores']
+                dtype = np.dtype('<f8' if 'names' in layout else '<f4')
+                self.layouts.append(layout)
+                formats.append((dtype, count * dtype.itemsize))
+                rows.append([])
+            elif kind == b'S':
+                if offset + SAMPLE_HEADER.size > size:
+                    break
+                _, layout_id, timestamp = SAMPLE_HEADER.unpack_from(data, offset)
+                offset += SAMPLE_HEADER.size
+                dtype, length = formats[layout_id]
+                if offset + length > size:
+                    break  # Truncated by a crash mid-write
+                rows[layout_id].append(data[offset:offset + length])
+                event_layouts.append(layout_id)
+                event_times.append(timestamp)
+                offset += length
+            else:
+                raise ValueError(f"Corrupt session recording at byte {offset}")
+
+        # Values of each layout as one (samples x values) array
+        self.values = [np.frombuffer(b''.join(chunks), dtype=dtype).reshape(len(chunks), length // dtype.itemsize)
+                       for (dtype, length), chunks in zip(formats, rows)]
+
+        # Event i is row event_rows[i] of layout event_layouts[i]
+        self.event_times = np.array(event_times, dtype=np.float64)
+        self.event_layouts = np.array(event_layouts, dtype=np.uint16)
+        self.event_rows = np.zeros(len(event_layouts), dtype=np.int64)
+        for layout_id in range(len(self.layouts)):
+            mask = self.event_layouts == layout_id
+            self.event_rows[mask] = np.arange(np.count_nonzero(mask))
+
+        self.start = float(self.event_times[0]) if len(self.event_times) else 0.0
+        self.end = float(self.event_times[-1]) if len(self.event_times) else 0.0
+
+    def __len__(self):
+        return len(self.event_times)
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    # Index of the first event at or after timestamp
+    def index_at(self, timestamp):
+        return int(np.searchsorted(self.event_times, timestamp, side='left'))
+
+
+# Feeds a recorded session into a SystemMetrics model through record() and
+# record_cores(), in place of live collectors, at speed x real time. advance()
+# is called periodically (from the scheduler) and catches the model up to the
+# replay clock. A batch never records more samples per layout than the model
+# keeps, so high speedups cost at most one history's worth of appends per tick;
+# the older samples of a batch still reach the running statistics, which then
+# match those of the live run. They reach nothing else: the model has no sinks
+# while replaying (the controller refuses a store, recorder or publisher next
+# to a replay), so no old timestamps are ever written anywhere.
+class ReplayPlayer:
+
+    def __init__(self, model, reader, speed=1.0, start=0.0):
+        self.model = model
+        self.reader = reader
+        self.speed = speed
+        self.paused = False
+        self.lock = threading.Lock()
+        # A recording may lack some metrics (a headless one has no rates); the
+        # dashboard is ready once the recorded ones have arrived
+        recorded = {name for layout in reader.layouts for name in layout.get('names', ())}
+        model.metric_names = tuple(name for name in model.metric_names if name in recorded)
+        self.position = reader.start  # Session timestamp the model has been fed up to
+        self.cursor = 0  # Next event to feed
+        self.wall = time.monotonic()
+        self.seeking = False  # A seek is waiting for the next advance()
+        self.seek(start)
+        with self.lock:
+            self.refill()
+
+    # Session timestamp currently shown; used as "now" by the alert engine
+    def now(self):
+        return self.position
+
+    # Seconds since the start of the recording
+    def offset(self):
+        return self.position - self.reader.start
+
+    def finished(self):
+        return self.cursor >= len(self.reader)
+
+    def set_speed(self, speed):
+        with self.lock:
+            self.catch_up_clock()
+            self.speed = speed
+
+    def set_paused(self, paused):
+        with self.lock:
+            self.catch_up_clock()
+            self.paused = paused
+
+    # Jump to offset seconds into the recording. Only the target is set here, as
+    # this is called from the GUI thread; the next advance() refills the model.
+    def seek(self, offset):
+        with self.lock:
+            reader = self.reader
+            self.position = min(max(reader.start + offset, reader.start), reader.end)
+            self.wall = time.monotonic()
+            self.seeking = True
+
+    # Clear the model and refill it with the history and statistics it would hold
+    # at the current position
+    def refill(self):
+        self.cursor = self.reader.index_at(self.position)
+        self.feed(0, self.cursor, refill=True)
+        self.wall = time.monotonic()  # Time spent refilling doesn't move the replay clock
+        self.seeking = False
+
+    def advance(self):
+        with self.lock:
+            if self.seeking:
+                self.refill()
+                return
+            self.catch_up_clock()
+            end = len(self.reader) if self.position >= self.reader.end else self.reader.index_at(self.position)
+            if end > self.cursor:
+                self.feed(self.cursor, end)
+                self.cursor = end
+
+    # Move the replay clock by the wall time since it was last moved
+    def catch_up_clock(self):
+        now = time.monotonic()
+        if not self.paused:
+            self.position = min(self.position + (now - self.wall) * self.speed, self.reader.end)
+        self.wall = now
+
+    # Record events [first, last) into the model, layout by layout. With refill the
+    # model is cleared first; the statistics of the samples older than the history
+    # keeps are then built on fresh objects, off the model's lock, and swapped in
+    # with the clear, so a seek through a long recording never blocks readers.
+    def feed(self, first, last, refill=False):
+        reader, model = self.reader, self.model
+        stats = model.create_stats() if refill else None
+        layouts = reader.event_layouts[first:last]
+        times = reader.event_times[first:last]
+        rows = reader.event_rows[first:last]
+        keep = model.history_length if model.history_length > 0 else None
+        batches = []
+        for layout_id in np.unique(layouts).tolist():
+            layout = reader.layouts[layout_id]
+            mask = layouts == layout_id
+            layout_times = times[mask]
+            layout_rows = rows[mask]
+            skipped = len(layout_rows) - keep if keep is not None else 0
+            if skipped > 0:
+                # Older samples would only be overwritten within this batch
+                if 'names' in layout:
+                    columns = (layout_times[:skipped].tolist(), layout['names'],
+                               reader.values[layout_id][layout_rows[:skipped]].T.tolist())
+                    if stats is not None:
+                        add_stats(stats, *columns)
+                    else:
+                        model.record_stats(*columns)
+                layout_times = layout_times[skipped:]
+                layout_rows = layout_rows[skipped:]
+            batches.append((layout, layout_times, reader.values[layout_id][layout_rows]))
+
+        if refill:
+            model.clear_history(stats)
+        for layout, layout_times, values in batches:
+            if 'names' in layout:
+                names = layout['names']
+                for timestamp, row in zip(layout_times.tolist(), values.tolist()):
+                    model.record(timestamp, dict(zip(names, row)))
+            elif model.per_core:
+                for timestamp, row in zip(layout_times.tolist(), values):
+                    model.record_cores(timestamp, row)
\ No newline at end of file
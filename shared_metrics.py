@@ -0,0 +1,259 @@
+import json
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+# Segment name used when --publish/--attach are given without one
+DEFAULT_SEGMENT = 'sysgauge'
+
+# Segment layout:
+#   header     magic, seqlock sequence, records written, core rows written,
+#              ring capacities, core counts, names length, closed flag, publisher pid
+#   names      JSON list of metric names; a record's metric is an index into it
+#   records    ring of (timestamp f8, metric u4, value f8), one per metric of a sample
+#   cores      ring of (timestamp f8, max_cores x f4) per-core usage rows
+SEGMENT_MAGIC = b'SYSGSHM1'
+HEADER = struct.Struct('<8sQQQIIIIIII')
+SEQUENCE = struct.Struct('<Q')
+SEQUENCE_OFFSET = 8
+WRITTEN_OFFSET = 16
+CORES_WRITTEN_OFFSET = 24
+CORES_OFFSET = 44
+CLOSED_OFFSET = 52
+NAMES_OFFSET = 64
+NAMES_SIZE = 4096
+RECORD = struct.Struct('<dId')
+COUNT = struct.Struct('<Q')
+FIELD = struct.Struct('<I')
+
+# Give up a read after this many attempts collided with a write
+MAX_READ_ATTEMPTS = 100
+
+
+def records_offset():
+    return NAMES_OFFSET + NAMES_SIZE
+
+
+def cores_offset(capacity):
+    return records_offset() + capacity * RECORD.size
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+# Attach to an existing segment without letting this process's resource tracker
+# unlink it on exit (which it does for every segment before Python 3.13)
+def attach_segment(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+
+# Publishes every sample a SystemMetrics model records into a shared memory
+# segment, as a model sink, so other SysGauge processes can show them without
+# sampling anything themselves. Readers never take a lock: every write is
+# bracketed by a seqlock sequence number, odd while the write is in progress,
+# and readers retry if it changed under them. The publisher never waits for
+# readers, so its cost does not depend on how many are attached.
+# Standard library only, so it also runs in headless mode.
+class SharedMetricsPublisher:
+
+    def __init__(self, name, metric_names, capacity, max_cores=None):
+        self.names = list(metric_names)
+        self.ids = {metric: index for index, metric in enumerate(self.names)}
+        names = json.dumps(self.names).encode()
+        if len(names) > NAMES_SIZE:
+            raise ValueError("Too many metric names for a shared memory segment")
+        # Enough records for a full history of every metric
+        self.capacity = max(capacity, 1) * len(self.names)
+        self.core_capacity = max(capacity, 1)
+        self.max_cores = max_cores or os.cpu_count() or 1
+        self.core_row = struct.Struct(f'<d{self.max_cores}f')
+        self.cores_start = cores_offset(self.capacity)
+        size = self.cores_start + self.core_capacity * self.core_row.size
+
+        self.segment = self.create(name, size)
+        self.buffer = self.segment.buf
+        HEADER.pack_into(self.buffer, 0, SEGMENT_MAGIC, 0, 0, 0, self.capacity, self.core_capacity,
+                         self.max_cores, 0, len(names), 0, os.getpid())
+        self.buffer[NAMES_OFFSET:NAMES_OFFSET + len(names)] = names
+        self.sequence = 0
+        self.written = 0
+        self.cores_written = 0
+        self.cores = 0
+
+    # A segment left behind by a publisher that died is replaced; a live one is an error
+    @staticmethod
+    def create(name, size):
+        try:
+            return shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            stale = shared_memory.SharedMemory(name=name)
+            header = HEADER.unpack_from(stale.buf, 0) if stale.size >= HEADER.size else None
+            stale.close()
+            if header is not None and header[0] == SEGMENT_MAGIC and not header[9] and pid_alive(header[10]):
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(stale._name, 'shared_memory')
+                raise ValueError(f"Another SysGauge process (pid {header[10]}) already publishes '{name}'")
+            stale.unlink()
+            return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+    # Seqlock: odd while a write is in progress
+    def begin(self):
+        self.sequence += 1
+        SEQUENCE.pack_into(self.buffer, SEQUENCE_OFFSET, self.sequence)
+
+    def end(self):
+        self.sequence += 1
+        SEQUENCE.pack_into(self.buffer, SEQUENCE_OFFSET, self.sequence)
+
+    # Model sinks are called from the sampler thread only, so writes never interleave
+    def append_sample(self, timestamp, sample):
+        self.begin()
+        start = records_offset()
+        for name, value in sample.items():
+            metric = self.ids.get(name)
+            if metric is None:
+                continue
+            RECORD.pack_into(self.buffer, start + (self.written % self.capacity) * RECORD.size,
+                             timestamp, metric, value)
+            self.written += 1
+        COUNT.pack_into(self.buffer, WRITTEN_OFFSET, self.written)
+        self.end()
+
+    def append_cores(self, timestamp, percents):
+        cores = min(len(percents), self.max_cores)
+        row = list(percents[:cores]) + [0.0] * (self.max_cores - cores)
+        self.begin()
+        if cores != self.cores:
+            self.cores = cores
+            FIELD.pack_into(self.buffer, CORES_OFFSET, cores)
+        self.core_row.pack_into(self.buffer, self.cores_start + (self.cores_written % self.core_capacity)
+                                * self.core_row.size, timestamp, *row)
+        self.cores_written += 1
+        COUNT.pack_into(self.buffer, CORES_WRITTEN_OFFSET, self.cores_written)
+        self.end()
+
+    def close(self):
+        if self.buffer is None:
+            return
+        self.begin()
+        FIELD.pack_into(self.buffer, CLOSED_OFFSET, 1)
+        self.end()
+        self.buffer = None
+        self.segment.close()
+        self.segment.unlink()
+
+
+# Attaches read-only to a published segment and feeds the samples written since
+# the last poll into a local SystemMetrics model through record() and
+# record_cores(), in place of its collectors. Only new samples are copied, so a
+# viewer costs the publisher nothing; on attach the whole ring is read to fill
+# the history.
+# Viewers copy into a model of their own rather than charting straight from the
+# segment: the dashboard draws from each history's min/max pyramid and shows the
+# model's running statistics, and both are built per model as samples are
+# recorded. The segment only holds raw samples, so the copy (a few appends per
+# poll) is what lets a viewer draw and alert exactly like the publisher.
+class SharedMetricsSubscriber:
+
+    def __init__(self, name, model):
+        self.model = model
+        self.segment = attach_segment(name)
+        buffer = self.segment.buf
+        header = HEADER.unpack_from(buffer, 0)
+        if header[0] != SEGMENT_MAGIC:
+            self.segment.close()
+            raise ValueError(f"'{name}' is not a SysGauge shared memory segment")
+        _, _, _, _, self.capacity, self.core_capacity, self.max_cores, _, names_length, _, self.pid = header
+        self.names = json.loads(bytes(buffer[NAMES_OFFSET:NAMES_OFFSET + names_length]))
+        self.core_row = struct.Struct(f'<d{self.max_cores}f')
+        self.cores_start = cores_offset(self.capacity)
+        self.cursor = 0  # Records read so far
+        self.cores_cursor = 0
+        self.closed = False
+        self.polls = 0
+        self.retries = 0  # Reads repeated because a write overlapped them
+
+        # The model is ready once the published metrics have arrived
+        published = set(self.names)
+        model.metric_names = tuple(name for name in model.metric_names if name in published)
+
+    # Bytes of ring slots [first, last), which may wrap around the end
+    def ring_bytes(self, start, capacity, size, first, last):
+        buffer = self.segment.buf
+        if last <= first:
+            return b''
+        head = first % capacity
+        tail = head + (last - first)
+        if tail <= capacity:
+            return bytes(buffer[start + head * size:start + tail * size])
+        return (bytes(buffer[start + head * size:start + capacity * size])
+                + bytes(buffer[start:start + (tail - capacity) * size]))
+
+    # Copy out everything written since the last poll under the seqlock
+    def read(self):
+        buffer = self.segment.buf
+        for _ in range(MAX_READ_ATTEMPTS):
+            sequence = SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0]
+            if sequence % 2:
+                self.retries += 1
+                time.sleep(0)
+                continue
+            written = COUNT.unpack_from(buffer, WRITTEN_OFFSET)[0]
+            cores_written = COUNT.unpack_from(buffer, CORES_WRITTEN_OFFSET)[0]
+            cores = FIELD.unpack_from(buffer, CORES_OFFSET)[0]
+            closed = FIELD.unpack_from(buffer, CLOSED_OFFSET)[0]
+            # Readers that fell more than a ring behind skip what was overwritten
+            first = max(self.cursor, written - self.capacity)
+            records = self.ring_bytes(records_offset(), self.capacity, RECORD.size, first, written)
+            first = max(self.cores_cursor, cores_written - self.core_capacity)
+            rows = self.ring_bytes(self.cores_start, self.core_capacity, self.core_row.size, first, cores_written)
+            if SEQUENCE.unpack_from(buffer, SEQUENCE_OFFSET)[0] == sequence:
+                self.cursor = written
+                self.cores_cursor = cores_written
+                self.closed = bool(closed)
+                return records, rows, cores
+            self.retries += 1
+        return b'', b'', 0
+
+    # Feed new samples into the model; returns the newest timestamp, or None if
+    # nothing arrived. Called periodically from the scheduler.
+    def poll(self):
+        self.polls += 1
+        records, rows, cores = self.read()
+        newest = None
+        names = self.names
+        timestamp, sample = None, {}
+        # The records of one published sample share its timestamp
+        for record_time, metric, value in RECORD.iter_unpack(records):
+            if record_time != timestamp and sample:
+                self.model.record(timestamp, sample)
+                sample = {}
+            timestamp = record_time
+            sample[names[metric]] = value
+        if sample:
+            self.model.record(timestamp, sample)
+            newest = timestamp
+        if rows and self.model.per_core:
+            for row in self.core_row.iter_unpack(rows):
+                self.model.record_cores(row[0], row[1:cores + 1])
+        return newest
+
+    def publisher_closed(self):
+        return self.closed
+
+    def close(self):
+        self.segment.close()
\ No newline at end of file
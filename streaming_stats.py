@@ -0,0 +1,207 @@
+import math
+from collections import deque
+
+# Seconds for the EWMA to move ~63% of the way to a new steady value
+EWMA_TIME_CONSTANT = 10.0
+
+# Rolling windows in seconds kept for every metric, unless configured otherwise
+DEFAULT_STAT_WINDOWS = (60.0, 300.0)
+
+# Quantiles estimated over the whole stream
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Exponentially weighted moving average over time rather than samples, so
+# collectors on different intervals smooth over the same number of seconds
+class EWMA:
+
+    __slots__ = ('time_constant', 'value', 'timestamp')
+
+    def __init__(self, time_constant=EWMA_TIME_CONSTANT):
+        self.time_constant = time_constant
+        self.value = None
+        self.timestamp = None
+
+    def add(self, timestamp, value):
+        if self.value is None:
+            self.value = value
+        else:
+            elapsed = max(timestamp - self.timestamp, 0.0)
+            self.value += (1.0 - math.exp(-elapsed / self.time_constant)) * (value - self.value)
+        self.timestamp = timestamp
+
+
+# Mean, min and max of the samples in the last `seconds` before the newest one.
+# Amortised O(1) per sample: a running sum, plus monotonic deques whose fronts
+# are the window's min and max.
+class RollingWindow:
+
+    __slots__ = ('seconds', 'samples', 'total', 'minima', 'maxima')
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.samples = deque()  # (timestamp, value)
+        self.total = 0.0
+        self.minima = deque()  # (timestamp, value), values increasing
+        self.maxima = deque()  # (timestamp, value), values decreasing
+
+    def add(self, timestamp, value):
+        self.samples.append((timestamp, value))
+        self.total += value
+        while self.minima and self.minima[-1][1] >= value:
+            self.minima.pop()
+        self.minima.append((timestamp, value))
+        while self.maxima and self.maxima[-1][1] <= value:
+            self.maxima.pop()
+        self.maxima.append((timestamp, value))
+
+        start = timestamp - self.seconds
+        samples = self.samples
+        while samples[0][0] < start:
+            self.total -= samples.popleft()[1]
+        while self.minima[0][0] < start:
+            self.minima.popleft()
+        while self.maxima[0][0] < start:
+            self.maxima.popleft()
+        if len(samples) == 1:
+            self.total = value  # Drop any rounding error carried by the running sum
+
+    def __len__(self):
+        return len(self.samples)
+
+    def mean(self):
+        return self.total / len(self.samples) if self.samples else None
+
+    def min(self):
+        return self.minima[0][1] if self.minima else None
+
+    def max(self):
+        return self.maxima[0][1] if self.maxima else None
+
+
+# P² quantile estimator (Jain & Chlamtac, 1985): five markers track the minimum,
+# the quantile, the maximum and two points between, adjusted by piecewise-parabolic
+# interpolation as samples arrive. Constant memory and O(1) per sample.
+class P2Quantile:
+
+    __slots__ = ('quantile', 'heights', 'positions', 'desired', 'increments')
+
+    def __init__(self, quantile):
+        self.quantile = quantile
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value):
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+
+        positions = self.positions
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        for marker in range(cell + 1, 5):
+            positions[marker] += 1
+        desired = self.desired
+        for marker in range(5):
+            desired[marker] += self.increments[marker]
+
+        # Move each middle marker at most one position towards where it should be
+        for marker in (1, 2, 3):
+            offset = desired[marker] - positions[marker]
+            if ((offset >= 1 and positions[marker + 1] - positions[marker] > 1)
+                    or (offset <= -1 and positions[marker - 1] - positions[marker] < -1)):
+                step = 1 if offset > 0 else -1
+                height = self.parabolic(marker, step)
+                if not heights[marker - 1] < height < heights[marker + 1]:
+                    height = self.linear(marker, step)
+                heights[marker] = height
+                positions[marker] += step
+
+    def parabolic(self, marker, step):
+        heights, positions = self.heights, self.positions
+        below = positions[marker] - positions[marker - 1]
+        above = positions[marker + 1] - positions[marker]
+        return heights[marker] + step / (positions[marker + 1] - positions[marker - 1]) * (
+            (below + step) * (heights[marker + 1] - heights[marker]) / above
+            + (above - step) * (heights[marker] - heights[marker - 1]) / below)
+
+    def linear(self, marker, step):
+        heights, positions = self.heights, self.positions
+        return heights[marker] + step * (heights[marker + step] - heights[marker]) / (
+            positions[marker + step] - positions[marker])
+
+    def value(self):
+        heights = self.heights
+        if not heights:
+            return None
+        if len(heights) < 5:
+            # Too few samples for the markers; nearest rank of what there is
+            return heights[min(int(self.quantile * len(heights)), len(heights) - 1)]
+        return heights[2]
+
+
+# Incremental aggregates of one metric, updated with every sample: the EWMA,
+# rolling mean/min/max per window and stream quantiles. Standard library only,
+# so headless mode keeps them too.
+class MetricStats:
+
+    def __init__(self, windows=DEFAULT_STAT_WINDOWS, time_constant=EWMA_TIME_CONSTANT, quantiles=QUANTILES):
+        self.count = 0
+        self.last = None
+        self.ewma = EWMA(time_constant)
+        self.windows = {seconds: RollingWindow(seconds) for seconds in windows}
+        self.quantiles = {quantile_name(quantile): P2Quantile(quantile) for quantile in quantiles}
+
+    def add(self, timestamp, value):
+        self.count += 1
+        self.last = value
+        self.ewma.add(timestamp, value)
+        for window in self.windows.values():
+            window.add(timestamp, value)
+        for quantile in self.quantiles.values():
+            quantile.add(value)
+
+    # One aggregate ('last', 'ewma', 'p95', ...), or 'mean'/'min'/'max' over a
+    # tracked window; None if it is not tracked or nothing has been seen yet
+    def get(self, aggregate, window=None):
+        if aggregate == 'last':
+            return self.last
+        if aggregate == 'ewma':
+            return self.ewma.value
+        if aggregate in self.quantiles:
+            return self.quantiles[aggregate].value()
+        rolling = self.windows.get(window)
+        if rolling is None or aggregate not in ('mean', 'min', 'max'):
+            return None
+        return getattr(rolling, aggregate)()
+
+    # Flat dict for display and export, e.g. {'ewma': .., 'p95': .., 'mean_60s': ..}
+    def as_dict(self):
+        stats = {'count': self.count, 'last': self.last, 'ewma': self.ewma.value}
+        for name, quantile in self.quantiles.items():
+            stats[name] = quantile.value()
+        for seconds, rolling in self.windows.items():
+            suffix = window_name(seconds)
+            stats[f'mean_{suffix}'] = rolling.mean()
+            stats[f'min_{suffix}'] = rolling.min()
+            stats[f'max_{suffix}'] = rolling.max()
+        return stats
+
+
+def quantile_name(quantile):
+    return f"p{quantile * 100:g}"
+
+
+def window_name(seconds):
+    return f"{seconds:g}s"
\ No newline at end of file
@@ -1,34 +1,424 @@
-import psutil
-from collections import deque
+import threading
+import time
+from collector_backends import make_backend, NET_COUNTER_FIELDS, DISK_COUNTER_FIELDS
+from streaming_stats import MetricStats, DEFAULT_STAT_WINDOWS
+
+# Every value produced by read_sample()
+METRIC_NAMES = ('cpu', 'memory', 'disk', 'net_sent_mb', 'net_recv_mb')
+
+# Throughput in MB/s, added to the sample when I/O rates are tracked
+RATE_METRIC_NAMES = ('net_sent_mb_s', 'net_recv_mb_s', 'disk_read_mb_s', 'disk_write_mb_s')
+
+# Metrics produced by each of the collectors()
+COLLECTOR_METRICS = {
+    'cpu': ('cpu',),
+    'memory': ('memory',),
+    'disk': ('disk',),
+    'network': ('net_sent_mb', 'net_recv_mb', 'net_sent_mb_s', 'net_recv_mb_s'),
+    'disk_io': ('disk_read_mb_s', 'disk_write_mb_s'),
+}
 
 # Class to store system metrics
 class SystemMetrics:
 
-    def __init__(self, history_length=10):
+    def __init__(self, history_length=10, store=None, backend='psutil', stat_windows=DEFAULT_STAT_WINDOWS,
+                 compress_history=False):
+
+        # Preallocated (timestamp, value) histories; memory is fixed by history_length.
+        # With history_length=0 nothing is kept in memory and NumPy is never imported,
+        # which keeps headless collection light. compress_history keeps all but the
+        # newest block of each metric's history Gorilla-compressed, for long histories
+        # on small hosts; the per-core and cgroup histories below stay raw.
+        self.history_length = history_length
+        self.compress_history = compress_history and history_length > 0
+        if history_length > 0:
+            if compress_history:
+                from compressed_history import CompressedHistory as MetricHistory
+            else:
+                from metric_history import MetricHistory
+            self.cpu_history = MetricHistory(history_length)
+            self.mem_history = MetricHistory(history_length)
+        else:
+            self.cpu_history = None
+            self.mem_history = None
+        self.histories = {'cpu': self.cpu_history, 'memory': self.mem_history}
 
-        # Lists & Variables to hold data
-        self.cpu_history = deque(maxlen=history_length)
-        self.mem_history = deque(maxlen=history_length)
+        # Per-NIC and per-disk rates. The rate engines need NumPy, so they are only
+        # set up alongside the in-memory histories; headless mode reports totals.
+        self.io_rates = history_length > 0
+        if self.io_rates:
+            from io_rates import RateEngine
+            self.net_rates = RateEngine(NET_COUNTER_FIELDS)
+            self.disk_rates = RateEngine(DISK_COUNTER_FIELDS)
+            for name in RATE_METRIC_NAMES:
+                self.histories[name] = MetricHistory(history_length)
+        else:
+            self.net_rates = None
+            self.disk_rates = None
+        self.metric_names = METRIC_NAMES + (RATE_METRIC_NAMES if self.io_rates else ())
+
+        # Running aggregates of every metric (EWMA, rolling windows, quantiles),
+        # updated per sample so reading them never scans a history
+        self.stat_windows = tuple(stat_windows)
+        self.stats = self.create_stats()
+
+        # Per-core CPU usage, one float32 row per sample. Created on the first
+        # reading, once the number of cores is known.
+        self.per_core = history_length > 0
+        self.core_history = None
+        self.latest = {}
         self.disk_usage = 0
         self.net_io = (0, 0)
+        self.sample_count = 0
+
+        # Latest figures of every cgroup ({path: values}, see CgroupMonitor) and, with
+        # a history, one float32 multi-field series per group still present
+        self.cgroups = {}
+        self.cgroup_histories = {}
+        self.cgroup_generation = 0
+
+        # Sinks receive every recorded sample via append_sample(timestamp, sample), and
+        # per-core readings too if they have append_cores(timestamp, percents).
+        # The optional MetricStore that persists every sample is one of them.
+        self.store = store
+        self.sinks = []
+        self.core_sinks = []
+        if store is not None:
+            self.add_sink(store)
+
+        # Where readings come from: a backend name ('psutil', 'proc', 'auto') or an instance
+        self.backend = make_backend(backend) if isinstance(backend, str) else backend
+
+        # Samples are written by the sampler thread and read by the GUI thread
+        self.lock = threading.Lock()
+
+    # Read the current value of every metric
+    def read_sample(self):
+        sample = {**self.read_cpu(), **self.read_memory(), **self.read_disk(), **self.read_network()}
+        if self.io_rates:
+            sample.update(self.read_disk_io())
+        return sample
+
+    def read_cpu(self):
+        return {'cpu': self.backend.cpu_percent()}
+
+    def read_memory(self):
+        return {'memory': self.backend.memory_percent()}
+
+    def read_disk(self):
+        return {'disk': self.backend.disk_percent('/')}
+
+    def read_network(self):
+        if not self.io_rates:
+            bytes_sent, bytes_recv = self.backend.net_io()
+            return {
+                'net_sent_mb': bytes_sent / (1024.0 **2),
+                'net_recv_mb': bytes_recv / (1024.0 **2),
+            }
 
-    # Update the data stored in the data structures
+        # One per-NIC read gives both the totals and the rates
+        rates = self.net_rates.update(self.backend.net_io_per_nic()).sum(axis=0)
+        totals = self.net_rates.total_counters()
+        return {
+            'net_sent_mb': float(totals[0]) / (1024.0 **2),
+            'net_recv_mb': float(totals[1]) / (1024.0 **2),
+            'net_sent_mb_s': float(rates[0]) / (1024.0 **2),
+            'net_recv_mb_s': float(rates[1]) / (1024.0 **2),
+        }
+
+    def read_disk_io(self):
+        rates = self.disk_rates.update(self.backend.disk_io_per_disk()).sum(axis=0)
+        return {
+            'disk_read_mb_s': float(rates[0]) / (1024.0 **2),
+            'disk_write_mb_s': float(rates[1]) / (1024.0 **2),
+        }
+
+    # Update the data stored in the data structures and return the new sample
     def update_data(self):
-        self.cpu_history.append(psutil.cpu_percent())
-        self.mem_history.append(psutil.virtual_memory().percent)
-        self.disk_usage = psutil.disk_usage('/').percent
-        io_counters = psutil.net_io_counters()
-        self.net_io = (io_counters.bytes_sent / (1024.0 **2), io_counters.bytes_recv / (1024.0 **2))
+        # Read the backend outside the lock so readers never wait on a slow syscall
+        timestamp = time.time()
+        sample = self.read_sample()
+        self.record(timestamp, sample)
+        if self.per_core:
+            self.record_cores(timestamp, self.backend.cpu_percent_per_core())
+        return timestamp, sample
+
+    # Per-metric updates, so each one can be scheduled on its own interval
+    def update_cpu(self):
+        timestamp = time.time()
+        self.record(timestamp, self.read_cpu())
+        if self.per_core:
+            self.record_cores(timestamp, self.backend.cpu_percent_per_core())
+
+    def update_memory(self):
+        self.record(time.time(), self.read_memory())
+
+    def update_disk(self):
+        self.record(time.time(), self.read_disk())
+
+    def update_network(self):
+        self.record(time.time(), self.read_network())
+
+    def update_disk_io(self):
+        self.record(time.time(), self.read_disk_io())
+
+    def collectors(self):
+        return {
+            'cpu': self.update_cpu,
+            'memory': self.update_memory,
+            'disk': self.update_disk,
+            'network': self.update_network,
+            **({'disk_io': self.update_disk_io} if self.io_rates else {}),
+        }
+
+    # Record a full or partial sample taken at timestamp. Compressed blocks that
+    # filled up are encoded after the lock is released.
+    def record(self, timestamp, sample):
+        pending = None
+        with self.lock:
+            if self.history_length > 0:
+                for name, history in self.histories.items():
+                    if name in sample:
+                        history.append(timestamp, sample[name])
+                        if self.compress_history and history.pending:
+                            pending = (pending or []) + history.take_pending()
+            self.latest.update(sample)
+            for name, value in sample.items():
+                stats = self.stats.get(name)
+                if stats is not None:
+                    stats.add(timestamp, value)
+            self.disk_usage = self.latest.get('disk', 0)
+            self.net_io = (self.latest.get('net_sent_mb', 0), self.latest.get('net_recv_mb', 0))
+            self.sample_count += 1
+
+        if pending:
+            from compressed_history import encode_pending
+            encode_pending(pending, self.lock)
+        for sink in self.sinks:
+            sink.append_sample(timestamp, sample)
+
+    # Update only the running statistics, metric by metric: columns holds one
+    # list of values per name, all taken at timestamps. For replayed samples that
+    # would be overwritten in the history straight away.
+    def record_stats(self, timestamps, names, columns):
+        with self.lock:
+            add_stats(self.stats, timestamps, names, columns)
+
+    # Per-core readings are kept apart from the sample: they are only plotted and
+    # recorded, never stored or alerted on
+    def record_cores(self, timestamp, percents):
+        with self.lock:
+            if self.core_history is None or self.core_history.shape != (len(percents),):
+                from ring_buffer import RingBuffer
+                self.core_history = RingBuffer(self.history_length, dtype='float32', shape=(len(percents),))
+            self.core_history.append(timestamp, percents)
+
+        for sink in self.core_sinks:
+            sink.append_cores(timestamp, percents)
+
+    # Cgroups come and go, so the table is replaced as a whole and the series of
+    # groups missing from rows are dropped with it
+    def record_cgroups(self, timestamp, rows):
+        with self.lock:
+            if self.history_length > 0:
+                from cgroup_monitor import CGROUP_FIELDS
+                from ring_buffer import RingBuffer
+                histories = {}
+                for path, values in rows.items():
+                    history = self.cgroup_histories.get(path)
+                    if history is None:
+                        history = RingBuffer(self.history_length, fields=CGROUP_FIELDS, dtype='float32')
+                    history.append(timestamp, *values)
+                    histories[path] = history
+                self.cgroup_histories = histories
+            self.cgroups = rows
+            self.cgroup_generation += 1
+
+    def create_stats(self):
+        return {name: MetricStats(self.stat_windows) for name in self.metric_names}
 
-    # Getters for the data stored in the data structures
-    def get_cpu_history(self):
-        return list(self.cpu_history)
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        if hasattr(sink, 'append_cores'):
+            self.core_sinks.append(sink)
 
-    def get_mem_history(self):
-        return list(self.mem_history)
+    def remove_sink(self, sink):
+        self.sinks.remove(sink)
+        if sink in self.core_sinks:
+            self.core_sinks.remove(sink)
+
+    # Forget all in-memory history, e.g. before a replay jumps to another point.
+    # stats (from create_stats) replaces the running statistics, so a replay can
+    # rebuild them without holding the lock; by default they start over.
+    def clear_history(self, stats=None):
+        with self.lock:
+            for history in self.histories.values():
+                if history is not None:
+                    history.clear()
+            if self.core_history is not None:
+                self.core_history.clear()
+            self.latest.clear()
+            self.cgroups = {}
+            self.cgroup_histories = {}
+            self.cgroup_generation += 1
+            self.stats = stats if stats is not None else self.create_stats()
+            self.disk_usage = 0
+            self.net_io = (0, 0)
+            self.sample_count += 1
+
+    # Getters for the data stored in the data structures.
+    # Histories come out as copies taken under the lock: views into the ring
+    # buffers would change under the reader as the sampler keeps appending.
+    # Pass n to get only the newest n samples.
+    def get_cpu_history(self, n=None):
+        with self.lock:
+            return self.cpu_history.values(n).copy()
+
+    def get_mem_history(self, n=None):
+        with self.lock:
+            return self.mem_history.values(n).copy()
+
+    def get_time_history(self, n=None):
+        with self.lock:
+            return self.cpu_history.timestamps(n).copy()
+
+    # (timestamps, values) for samples in [start, end)
+    def get_cpu_window(self, start, end=None):
+        with self.lock:
+            return copy_arrays(self.cpu_history.window(start, end))
+
+    def get_mem_window(self, start, end=None):
+        with self.lock:
+            return copy_arrays(self.mem_history.window(start, end))
+
+    # Values of any metric sampled at or after start. A start of None, metrics
+    # without a history and models without one give just the latest value.
+    def get_metric_window(self, name, start=None):
+        with self.lock:
+            history = self.histories.get(name)
+            if history is not None and start is not None:
+                return history.window(start)[1].copy()
+            return [self.latest[name]] if name in self.latest else []
+
+    # (x, y) points for a chart max_points pixels wide; x is the sample index
+    def get_cpu_plot_data(self, max_points):
+        with self.lock:
+            return copy_arrays(self.cpu_history.plot_points(max_points))
+
+    def get_mem_plot_data(self, max_points):
+        with self.lock:
+            return copy_arrays(self.mem_history.plot_points(max_points))
+
+    # (retained samples, (columns x cores) usage) for a heatmap at most max_columns
+    # wide. Longer histories keep the busiest reading of each bucket, so a core
+    # that saturates briefly still shows up.
+    def get_core_plot_data(self, max_columns):
+        with self.lock:
+            if self.core_history is None:
+                return 0, None
+            from history_decimation import bucket_max
+            return len(self.core_history), bucket_max(self.core_history.values(), max_columns).copy()
+
+    def get_core_count(self):
+        return self.core_history.shape[0] if self.core_history is not None else 0
+
+    # Usage of every core in the newest per-core reading, as a list
+    def get_latest_cores(self):
+        with self.lock:
+            if self.core_history is None or len(self.core_history) == 0:
+                return []
+            return self.core_history.last().tolist()
+
+    # {path: values in CGROUP_FIELDS order} from the newest cgroup reading
+    def get_cgroups(self):
+        with self.lock:
+            return dict(self.cgroups)
+
+    # (timestamps, values) of one field of one cgroup, e.g. ('system.slice', 'cpu_percent')
+    def get_cgroup_history(self, path, field, n=None):
+        with self.lock:
+            history = self.cgroup_histories.get(path)
+            if history is None:
+                return (), ()
+            return history.timestamps(n).copy(), history.values(n, field).copy()
+
+    # Changes whenever a history is appended to ('cores' for the per-core history),
+    # so the view can skip charts whose data is unchanged
+    def get_generation(self, name):
+        if name == 'cores':
+            history = self.core_history
+            return (history.shape, history.generation) if history is not None else None
+        return self.histories[name].generation
+
+    def get_plot_data(self, name, max_points):
+        with self.lock:
+            return copy_arrays(self.histories[name].plot_points(max_points))
+
+    # Most recent value of every metric, keyed by name
+    def get_latest(self):
+        with self.lock:
+            return dict(self.latest)
+
+    # {aggregate: value} of one metric, e.g. {'ewma': .., 'p95': .., 'mean_60s': ..}
+    def get_stats(self, name):
+        with self.lock:
+            return self.stats[name].as_dict()
+
+    def get_all_stats(self):
+        with self.lock:
+            return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    # One aggregate of a metric without reading its history: 'last', 'ewma' or a
+    # quantile ('p50', 'p95', 'p99'), or 'mean'/'min'/'max' over a tracked window
+    # (a window of 0 means the latest value). None if that aggregate isn't tracked.
+    def get_stat(self, name, aggregate, window=0.0):
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                return None
+            if not window and aggregate in ('mean', 'min', 'max'):
+                aggregate = 'last'
+            return stats.get(aggregate, window)
+
+    # True once every metric has been sampled at least once
+    def is_ready(self):
+        return all(name in self.latest for name in self.metric_names)
 
     def get_disk_usage(self):
         return self.disk_usage
 
     def get_network_io(self):
-        return self.net_io
\ No newline at end of file
+        return self.net_io
+
+    # Latest (sent, received) and (read, write) throughput in MB/s
+    def get_network_rates(self):
+        return self.latest.get('net_sent_mb_s', 0), self.latest.get('net_recv_mb_s', 0)
+
+    def get_disk_io_rates(self):
+        return self.latest.get('disk_read_mb_s', 0), self.latest.get('disk_write_mb_s', 0)
+
+    # {device: {field: rate per second}} for every NIC or disk seen in the last sample
+    def get_nic_rates(self):
+        return self.net_rates.device_rates() if self.io_rates else {}
+
+    def get_disk_rates(self):
+        return self.disk_rates.device_rates() if self.io_rates else {}
+
+    def get_sample_count(self):
+        return self.sample_count
+
+
+# Add columns of values (one list per name, taken at timestamps) to a
+# {name: MetricStats} dict; names without statistics are skipped
+def add_stats(stats, timestamps, names, columns):
+    for name, values in zip(names, columns):
+        metric_stats = stats.get(name)
+        if metric_stats is not None:
+            for timestamp, value in zip(timestamps, values):
+                metric_stats.add(timestamp, value)
+
+
+# Copies of the arrays in a (timestamps, values) or (x, y) pair, taken while the
+# caller holds the model's lock
+def copy_arrays(arrays):
+    return tuple(array.copy() for array in arrays)
\ No newline at end of file
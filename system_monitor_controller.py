@@ -1,45 +1,309 @@
 import sys
+import time
 from system_monitor_view import SystemMonitorView
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QTimer
-from system_metrics import SystemMetrics
+from PyQt5.QtCore import QTimer, QObject, pyqtSignal
+from system_metrics import SystemMetrics, COLLECTOR_METRICS
+from metric_sampler import MetricScheduler
+from process_monitor import ProcessMonitor
+from alert_rules import AlertEngine, default_rules, rule_warnings
+from profiler import Profiler
+from streaming_stats import DEFAULT_STAT_WINDOWS
+
+# Seconds between samples of each collector
+DEFAULT_INTERVALS = {
+    'cpu': 0.25,
+    'memory': 0.25,
+    'network': 0.25,
+    'disk': 5.0,  # Changes slowly and costs a statvfs call
+    'disk_io': 1.0,
+    'processes': 1.0,  # Walks the whole process table
+    'cgroups': 1.0,
+    'alerts': 1.0,
+    'exporter': 0.25,  # Renders the /metrics body, if anything changed
+}
+
+# Seconds between checks for the window coming back while nothing is on screen
+PAUSED_POLL_INTERVAL = 1.0
+
+# Seconds between replay steps; each step feeds everything the replay clock passed
+REPLAY_INTERVAL = 0.05
+
+# Seconds between reads of an attached shared memory segment
+SHARED_POLL_INTERVAL = 0.1
+
+# Carries alert events from the scheduler thread to the GUI thread
+class AlertNotifier(QObject):
+    alert = pyqtSignal(object)
+
+# Picks the frame interval from measured render cost. When an average frame
+# takes longer than the budget the interval doubles (up to max_interval); once
+# frames are cheap again it halves back towards the requested interval.
+class FramePacer:
+
+    def __init__(self, interval, budget=0.05, max_interval=2.0, smoothing=0.2):
+        self.base_interval = interval
+        self.interval = interval
+        self.budget = budget
+        self.max_interval = max(max_interval, interval)
+        self.smoothing = smoothing
+        self.render_time = 0.0  # Smoothed seconds per frame that drew something
+
+    # Record one frame's render time; returns True if the interval changed
+    def record(self, seconds):
+        self.render_time += self.smoothing * (seconds - self.render_time)
+        interval = self.interval
+        if self.render_time > self.budget:
+            interval = min(interval * 2, self.max_interval)
+        elif self.render_time < self.budget / 4:
+            interval = max(interval / 2, self.base_interval)
+        changed = interval != self.interval
+        self.interval = interval
+        return changed
 
 # Controller class that connects the model and view
 class SystemMonitorController:
 
-    def __init__(self):
-        self.app = QApplication(sys.argv)
-        self.model = SystemMetrics()
-        self.view = SystemMonitorView(self.model)
+    def __init__(self, render_interval=0.25, history_length=10, store=None, intervals=None, alert_rules=None,
+                 backend='psutil', chart_backend='matplotlib', render_budget=0.05, profile=False,
+                 profile_output=None, record=None, replay=None, replay_speed=1.0, replay_start=0.0,
+                 stat_windows=DEFAULT_STAT_WINDOWS, compress_history=False, publish=None, attach=None,
+                 hosts=None, metrics=None, cgroups=None):
+        if history_length < 1:
+            raise ValueError("the dashboard needs a history_length of at least 1")
+        self.app = QApplication.instance() or QApplication(sys.argv)
+        self.model = SystemMetrics(history_length, store=store, backend=backend, stat_windows=stat_windows,
+                                   compress_history=compress_history)
+
+        # record: session file that receives every sample. replay: session file that
+        # drives the dashboard instead of the live collectors (and processes); the
+        # model then has no sinks, which would only receive old samples.
+        if replay is not None and (store is not None or record is not None or publish is not None):
+            raise ValueError("a replay cannot be stored, recorded or published")
+        self.recorder = None
+        if record is not None:
+            from session_recorder import SessionRecorder
+            self.recorder = SessionRecorder(record)
+            self.model.add_sink(self.recorder)
+        self.player = None
+        self.clock = time.time
+        if replay is not None:
+            from session_replay import SessionReader, ReplayPlayer
+            self.player = ReplayPlayer(self.model, SessionReader(replay), replay_speed, replay_start)
+            self.clock = self.player.now
+
+        # publish: shared memory segment that receives every sample, for other
+        # instances to attach to. attach: segment whose samples are shown instead of
+        # sampling this host (and its processes) again.
+        self.publisher = None
+        if publish is not None:
+            from shared_metrics import SharedMetricsPublisher
+            self.publisher = SharedMetricsPublisher(publish, self.model.metric_names, history_length)
+            self.model.add_sink(self.publisher)
+        self.subscriber = None
+        if attach is not None:
+            from shared_metrics import SharedMetricsSubscriber
+            self.subscriber = SharedMetricsSubscriber(attach, self.model)
+        sampling = self.player is None and self.subscriber is None
+        self.process_monitor = ProcessMonitor() if sampling else None
+
+        # cgroups: root of a cgroup v2 hierarchy whose groups are sampled into the
+        # model; only this host's, so not while replaying or attached
+        self.cgroup_monitor = None
+        if cgroups is not None and sampling:
+            from cgroup_monitor import CgroupMonitor
+            self.cgroup_monitor = CgroupMonitor(cgroups)
+
+        # hosts: addresses of remote agents (app.py --agent), each shown from a model
+        # of its own next to this host's
+        self.aggregator = None
+        if hosts:
+            from host_aggregator import HostAggregator
+            self.aggregator = HostAggregator(hosts, lambda: SystemMetrics(
+                history_length, backend=self.model.backend, stat_windows=stat_windows,
+                compress_history=compress_history))
+
+        # metrics: HOST:PORT to serve the newest sample on for Prometheus-style scrapers
+        self.exporter = None
+        if metrics is not None:
+            from metrics_exporter import MetricsExporter
+            self.exporter = MetricsExporter(self.model, metrics, self.process_monitor)
+
+        # Records stage latencies and timer jitter once enabled (--profile or View → Diagnostics);
+        # profile_output receives a JSON dump on exit
+        self.profiler = Profiler(enabled=profile or profile_output is not None)
+        self.profile_output = profile_output
+        self.view = SystemMonitorView(self.model, process_monitor=self.process_monitor,
+                                      chart_backend=chart_backend, profiler=self.profiler, replay=self.player,
+                                      hosts=self.aggregator, cgroups=self.cgroup_monitor is not None)
+        self.rendered_sample = None  # (model, sample count) last shown
+        self.rendered_processes = 0
+        self.rendered_cgroups = 0
+        self.rendered_hosts = None
+
+        # Sample in a background thread so slow psutil calls never stall the UI;
+        # every collector runs on its own interval
+        unknown = set(intervals or {}) - set(DEFAULT_INTERVALS)
+        if unknown:
+            raise ValueError(f"Unknown collectors: {', '.join(sorted(unknown))}")
+        intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.scheduler = MetricScheduler()
+        self.scheduler.profiler = self.profiler
+        self.profiler.add_source('collectors', self.scheduler.get_stats)
+        if self.player is not None:
+            self.scheduler.add_collector('replay', self.player.advance, REPLAY_INTERVAL)
+        elif self.subscriber is not None:
+            self.scheduler.add_collector('shared', self.subscriber.poll, SHARED_POLL_INTERVAL)
+        else:
+            for name, collect in self.model.collectors().items():
+                self.scheduler.add_collector(name, collect, intervals[name])
+            self.scheduler.add_collector('processes', self.process_monitor.update, intervals['processes'])
+            if self.cgroup_monitor is not None:
+                self.scheduler.add_collector('cgroups', self.update_cgroups, intervals['cgroups'])
+        if self.exporter is not None:
+            self.scheduler.add_collector('exporter', self.exporter.refresh, intervals['exporter'])
 
-        # Create a timer to update the model and view
+        # Alert rules are evaluated as a batch on their own schedule, off the GUI thread
+        self.alert_notifier = AlertNotifier()
+        self.alert_notifier.alert.connect(self.on_alert)
+        self.alert_engine = AlertEngine(self.model, alert_rules or default_rules(), self.alert_notifier.alert.emit)
+        metric_intervals = {metric: intervals[collector]
+                            for collector, metrics in COLLECTOR_METRICS.items() for metric in metrics}
+        for warning in rule_warnings(self.alert_engine.rules, self.model, metric_intervals):
+            print(warning, file=sys.stderr)
+        self.scheduler.add_collector('alerts', self.check_thresholds, intervals['alerts'])
+        self.scheduler.start()
+        if self.aggregator is not None:
+            self.aggregator.start()
+        if self.exporter is not None:
+            self.exporter.start()
+        self.app.aboutToQuit.connect(self.shutdown)
+
+        # Create a timer that only draws the latest data. Rendering pauses while the
+        # window is off screen (sampling carries on) and slows down when frames
+        # cost more than render_budget seconds.
+        self.pacer = FramePacer(render_interval, render_budget)
+        self.paused = False
+        self.last_tick = None
+        self.tick_interval = render_interval
         self.timer = QTimer()
-        self.timer.timeout.connect(self.update_model_and_view)
-        self.timer.start(250)  # Update every 250ms
+        self.timer.timeout.connect(self.update_view)
+        self.timer.start(int(render_interval * 1000))  # Render every 250ms
+
+    # Stop sampling and write out anything still queued for disk
+    def shutdown(self):
+        self.scheduler.stop()
+        if self.aggregator is not None:
+            self.aggregator.stop()
+        if self.cgroup_monitor is not None:
+            self.cgroup_monitor.close()
+        if self.exporter is not None:
+            self.exporter.close()
+        self.model.backend.close()
+        if self.model.store is not None:
+            self.model.store.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.publisher is not None:
+            self.publisher.close()
+        if self.subscriber is not None:
+            self.subscriber.close()
+        if self.profile_output is not None:
+            self.profiler.dump(self.profile_output)
 
-    # Check if any of the metrics exceed a threshold
+    def update_cgroups(self):
+        self.model.record_cgroups(*self.cgroup_monitor.update())
+
+    # Called from the scheduler thread; the signal hands the event to the GUI thread
     def check_thresholds(self):
-        cpu = self.model.get_cpu_history()[-1]
-        memory = self.model.get_mem_history()[-1]
-        disk = self.model.get_disk_usage()
-
-        # Example thresholds
-        if cpu > 90:
-            self.view.show_alert_popup(f"High CPU Usage: {cpu}%")
-            self.view.update_alert_label(f"⚠️ High CPU Usage: {cpu}%")
-        elif memory > 85:
-            self.view.show_alert_popup(f"High Memory Usage: {memory}%")
-            self.view.update_alert_label(f"⚠️ High Memory Usage: {memory}%")
-        elif disk > 80:
-            self.view.show_alert_popup(f"High Disk Usage: {disk}%")
-            self.view.update_alert_label(f"⚠️ High Disk Usage: {disk}%")
-        else:
-            # Clear alert label if no issues
-            self.view.update_alert_label("")
+        self.alert_engine.evaluate(self.clock())
 
-    def update_model_and_view(self):
-        self.model.update_data()
-        self.view.update_metrics()
-        self.view.update_plot()
-        self.check_thresholds()
+    def on_alert(self, event):
+        if event.firing:
+            self.view.show_alert_popup(event.message)
+        self.update_alert_label()
+
+    def update_alert_label(self):
+        messages = self.alert_engine.active_messages()
+        self.view.update_alert_label("  ".join(f"⚠️ {message}" for message in messages))
+
+    # Redraw only what is on screen and has changed since the last frame
+    def update_view(self):
+        self.record_tick()
+        if not self.view.is_on_screen():
+            self.set_paused(True)
+            return
+        self.set_paused(False)
+
+        if self.player is not None:
+            self.view.update_replay()
+        elif self.subscriber is not None and self.subscriber.publisher_closed():
+            self.view.update_alert_label("⚠️ The publishing SysGauge has stopped; showing its last samples")
+        elif (self.process_monitor is not None
+                and self.process_monitor.generation != self.rendered_processes
+                and self.view.process_table.isVisible()):
+            self.rendered_processes = self.process_monitor.generation
+            with self.profiler.stage('update_processes'):
+                self.view.update_processes()
+        if (self.cgroup_monitor is not None
+                and self.model.cgroup_generation != self.rendered_cgroups
+                and self.view.cgroup_table.isVisible()):
+            self.rendered_cgroups = self.model.cgroup_generation
+            with self.profiler.stage('update_cgroups'):
+                self.view.update_cgroups()
 
+        if self.aggregator is not None and self.aggregator.generation != self.rendered_hosts:
+            self.rendered_hosts = self.aggregator.generation
+            self.view.update_hosts()
+
+        # The host picked in the view, this one unless remote hosts are followed
+        model = self.view.model
+        if not model.is_ready():
+            return
+        sample = (model, model.get_sample_count())
+        if sample != self.rendered_sample:
+            self.rendered_sample = sample
+            with self.profiler.stage('update_metrics'):
+                self.view.update_metrics()
+                self.update_alert_label()
+
+        # Charts check their own data, so one on a newly shown tab catches up here
+        start = time.perf_counter()
+        drawn = self.view.update_plot()
+        elapsed = time.perf_counter() - start
+        if drawn:
+            self.profiler.record('update_plot', elapsed)
+            if self.pacer.record(elapsed):
+                self.set_timer_interval(self.pacer.interval)
+
+    # Jitter and dropped ticks of the render timer, against the interval it was set to
+    def record_tick(self):
+        if not self.profiler.enabled:
+            self.last_tick = None
+            return
+        now = time.monotonic()
+        if self.last_tick is not None:
+            self.profiler.record_tick('render timer', self.tick_interval, now - self.last_tick)
+        self.last_tick = now
+
+    # setInterval restarts the timer, so the next tick is measured from here
+    def set_timer_interval(self, seconds):
+        self.timer.setInterval(int(seconds * 1000))
+        self.tick_interval = seconds
+        if self.last_tick is not None:
+            self.last_tick = time.monotonic()
+
+    # While nothing is visible the timer only polls for the window coming back
+    def set_paused(self, paused):
+        if paused == self.paused:
+            return
+        self.paused = paused
+        self.set_timer_interval(PAUSED_POLL_INTERVAL if paused else self.pacer.interval)
+
+    # Sample and render synchronously in one step
+    def update_model_and_view(self):
+        with self.profiler.stage('update_data'):
+            self.model.update_data()
+        with self.profiler.stage('check_thresholds'):
+            self.check_thresholds()
+        self.update_view()
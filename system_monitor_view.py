@@ -1,13 +1,18 @@
 from system_metrics import SystemMetrics
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-                            QLabel, QMessageBox, QProgressBar, QFrame, QSizePolicy, QAction, QMenuBar)
+                            QLabel, QMessageBox, QProgressBar, QFrame, QSizePolicy, QAction, QMenuBar,
+                            QApplication, QFileDialog, QTabWidget, QTableWidget, QTableWidgetItem,
+                            QAbstractItemView, QComboBox, QHeaderView, QPushButton, QSlider)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPalette, QColor
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.gridspec import GridSpec
+from charts import make_chart_backend, CHART_THEMES
+from profiler import Profiler
+from streaming_stats import window_name
 import platform
-import numpy as np
+import time
+
+# Playback speeds offered while replaying a recorded session
+REPLAY_SPEEDS = (1, 10, 100, 1000)
 
 class SystemMonitorView(QMainWindow):
     
@@ -15,9 +20,23 @@ class SystemMonitorView(QMainWindow):
     # -- Initialization and Setup -- 
     #
 
-    def __init__(self, model: SystemMetrics):
+    def __init__(self, model: SystemMetrics, render_mode='blit', process_monitor=None, chart_backend='matplotlib',
+                 profiler=None, replay=None, hosts=None, cgroups=False):
         super().__init__()
-        self.model = model
+        self.model = model  # The model on screen: this host's, or a remote one picked in the host bar
+        self.local_model = model
+        self.hosts = hosts  # HostAggregator while remote agents are followed
+        self.process_monitor = process_monitor
+        self.cgroups = cgroups  # True while this host's cgroups are sampled into the model
+        self.cgroup_sort = (1, True)  # (column, descending) of the cgroup table; busiest CPU first
+        self.replay = replay  # ReplayPlayer while a recorded session is shown
+        self.profiler = profiler or Profiler()  # disabled unless one is passed in
+        self.diagnostics_dialog = None
+        self.alert_popup = None
+        self.render_mode = render_mode  # 'blit' or 'redraw'; matplotlib charts only
+        self.chart_backend = make_chart_backend(chart_backend, render_mode)
+        self.charts = []
+        self.rendered = {}  # chart -> (data generation, width) it was last drawn with
         self.create_menu_bar()
         self.initUI()
         self.apply_dark_theme()
@@ -25,7 +44,20 @@ class SystemMonitorView(QMainWindow):
     def initUI(self):
         self.setup_main_window()
         self.create_system_info()
+        if self.hosts is not None:
+            self.create_host_bar()
+        if self.replay is not None:
+            self.create_replay_bar()
+
+        # Overview and detail pages share the space below the system info
+        self.tabs = QTabWidget()
+        self.main_layout.addWidget(self.tabs, stretch=1)
         self.create_metrics_layout()
+        self.create_core_heatmap()
+        if self.process_monitor is not None:
+            self.create_process_table()
+        if self.cgroups:
+            self.create_cgroup_table()
         
         # Alert Label with improved styling
         self.alert_label = QLabel("")
@@ -54,6 +86,14 @@ class SystemMonitorView(QMainWindow):
 
     def create_menu_bar(self):
         menubar = self.menuBar()
+        file_menu = menubar.addMenu('File')
+
+        # Export is only possible when samples are being persisted
+        self.export_action = QAction('Export Data...', self)
+        self.export_action.setEnabled(self.local_model.store is not None)
+        self.export_action.triggered.connect(self.export_data)
+        file_menu.addAction(self.export_action)
+
         view_menu = menubar.addMenu('View')
         
         # Theme switcher action
@@ -61,6 +101,11 @@ class SystemMonitorView(QMainWindow):
         self.theme_action.triggered.connect(self.toggle_theme)
         view_menu.addAction(self.theme_action)
 
+        # Self-profiling of the monitor's own hot paths
+        self.diagnostics_action = QAction('Diagnostics...', self)
+        self.diagnostics_action.triggered.connect(self.show_diagnostics)
+        view_menu.addAction(self.diagnostics_action)
+
 
     
     #
@@ -84,19 +129,25 @@ class SystemMonitorView(QMainWindow):
         info_layout = QHBoxLayout()
         
         # System information
-        system_info = f"""
-            <b>System:</b> {platform.system()} {platform.release()}<br>
-            <b>Processor:</b> {platform.processor()}<br>
-            <b>Architecture:</b> {platform.machine()}
-        """
-        
-        info_label = QLabel(system_info)
-        info_label.setTextFormat(Qt.RichText)
-        info_layout.addWidget(info_label)
+        self.info_label = QLabel(self.system_info())
+        self.info_label.setTextFormat(Qt.RichText)
+        info_layout.addWidget(self.info_label)
         
         info_frame.setLayout(info_layout)
         self.main_layout.addWidget(info_frame)
 
+    # This host's platform, or what a remote agent reported in its hello
+    def system_info(self, host=None):
+        info = host.info if host is not None else {
+            'system': platform.system(), 'release': platform.release(),
+            'processor': platform.processor(), 'machine': platform.machine()}
+        name = f"<b>Host:</b> {host.label()}<br>" if host is not None else ""
+        return f"""
+            {name}<b>System:</b> {info.get('system', '')} {info.get('release', '')}<br>
+            <b>Processor:</b> {info.get('processor', '')}<br>
+            <b>Architecture:</b> {info.get('machine', '')}
+        """
+
     def create_metrics_layout(self):
         metrics_frame = QFrame()
         metrics_frame.setFrameStyle(QFrame.StyledPanel | QFrame.Raised)
@@ -131,14 +182,12 @@ class SystemMonitorView(QMainWindow):
         cpu_metrics.addWidget(self.cpu_progress['frame'])
         
         # CPU Graph
-        self.cpu_fig = Figure(figsize=(6, 2.5), facecolor='#353535')
-        self.cpu_ax = self.cpu_fig.add_subplot(111)
-        self.style_plot(self.cpu_ax, 'CPU History')
-        self.cpu_canvas = FigureCanvas(self.cpu_fig)
-        self.cpu_fig.subplots_adjust(bottom=0.2)
+        history_length = self.model.history_length
+        self.cpu_chart = self.add_chart(self.chart_backend.history_chart(
+            'CPU History', [('cpu', 'CPU')], history_length, area=True))
         
         cpu_section.addLayout(cpu_metrics, stretch=1)
-        cpu_section.addWidget(self.cpu_canvas, stretch=2)
+        cpu_section.addWidget(self.cpu_chart.widget, stretch=2)
         metrics_layout.addLayout(cpu_section)
         
         # Memory Section
@@ -148,14 +197,11 @@ class SystemMonitorView(QMainWindow):
         mem_metrics.addWidget(self.mem_progress['frame'])
         
         # Memory Graph
-        self.mem_fig = Figure(figsize=(6, 2.5), facecolor='#353535')
-        self.mem_ax = self.mem_fig.add_subplot(111)
-        self.style_plot(self.mem_ax, 'Memory History')
-        self.mem_canvas = FigureCanvas(self.mem_fig)
-        self.mem_fig.subplots_adjust(bottom=0.2)
+        self.mem_chart = self.add_chart(self.chart_backend.history_chart(
+            'Memory History', [('memory', 'Memory')], history_length, area=True))
         
         mem_section.addLayout(mem_metrics, stretch=1)
-        mem_section.addWidget(self.mem_canvas, stretch=2)
+        mem_section.addWidget(self.mem_chart.widget, stretch=2)
         metrics_layout.addLayout(mem_section)
         
         # Disk Section
@@ -163,35 +209,45 @@ class SystemMonitorView(QMainWindow):
         disk_metrics = QVBoxLayout()
         self.disk_progress = self.create_metric_widget("Disk Usage")
         disk_metrics.addWidget(self.disk_progress['frame'])
+        self.disk_io_label = QLabel("Disk I/O (read/write): ")
+        disk_metrics.addWidget(self.disk_io_label)
         
-        # Disk Pie Chart
-        self.disk_fig = Figure(figsize=(3, 3.5), facecolor='#353535')
-        self.disk_ax = self.disk_fig.add_subplot(111)
-        self.style_plot(self.disk_ax, 'Disk Usage')
-        self.disk_canvas = FigureCanvas(self.disk_fig)
-        self.disk_fig.subplots_adjust(bottom=0.1)
+        # Disk Donut Chart
+        self.disk_chart = self.add_chart(self.chart_backend.donut_chart(
+            'Disk Usage', [('disk_used', 'Used'), ('disk_free', 'Free')]))
         
         disk_section.addLayout(disk_metrics, stretch=1)
-        disk_section.addWidget(self.disk_canvas, stretch=1)
+        disk_section.addWidget(self.disk_chart.widget, stretch=1)
         metrics_layout.addLayout(disk_section)
         
         # Network Section
         net_section = QHBoxLayout()
         self.net_label = QLabel("Network (sent/received): ")
-        net_section.addWidget(self.net_label)
-        
-        # Network Graph
-        self.net_fig = Figure(figsize=(6, 2.5), facecolor='#353535')
-        self.net_ax = self.net_fig.add_subplot(111)
-        self.style_plot(self.net_ax, 'Network I/O')
-        self.net_canvas = FigureCanvas(self.net_fig)
-        self.net_fig.subplots_adjust(bottom=0.2)
-        
-        net_section.addWidget(self.net_canvas, stretch=2)
+        # Width comes from the stretch alone, so changing numbers never resize the charts
+        self.net_label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Preferred)
+        net_section.addWidget(self.net_label, stretch=1)
+        
+        # Network and Disk Throughput Graphs, autoscaled, with the metric behind each series
+        self.throughput_charts = []
+        for title, series in [
+                ('Network Throughput', [('net_sent_mb_s', 'network_up', 'Upload'),
+                                        ('net_recv_mb_s', 'network_down', 'Download')]),
+                ('Disk Throughput', [('disk_read_mb_s', 'disk_read', 'Read'),
+                                     ('disk_write_mb_s', 'disk_write', 'Write')])]:
+            chart = self.add_chart(self.chart_backend.history_chart(
+                title, [(color, label) for _, color, label in series], history_length, y_max=None, size=(3, 2.5)))
+            chart.widget.setMinimumHeight(160)  # keep the title, legend and axes readable
+            self.throughput_charts.append((chart, [name for name, _, _ in series]))
+            net_section.addWidget(chart.widget, stretch=1)
         metrics_layout.addLayout(net_section)
         
         metrics_frame.setLayout(metrics_layout)
-        self.main_layout.addWidget(metrics_frame)
+        self.tabs.addTab(metrics_frame, 'Overview')
+
+    def add_chart(self, chart):
+        chart.profiler = self.profiler
+        self.charts.append(chart)
+        return chart
 
     def create_metric_widget(self, title):
         frame = QFrame()
@@ -201,12 +257,86 @@ class SystemMonitorView(QMainWindow):
         progress = QProgressBar()
         progress.setMaximum(100)
         progress.setTextVisible(True)
+        stats = QLabel()
+        stats.setStyleSheet("font-size: 12px;")
+        # Changing numbers must not resize the charts beside it
+        stats.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Preferred)
         
         layout.addWidget(label)
         layout.addWidget(progress)
+        layout.addWidget(stats)
         frame.setLayout(layout)
         
-        return {'frame': frame, 'label': label, 'progress': progress}
+        return {'frame': frame, 'label': label, 'progress': progress, 'stats': stats}
+
+    def create_core_heatmap(self):
+        core_frame = QFrame()
+        core_layout = QVBoxLayout()
+        self.core_label = QLabel("Cores: 0")
+        core_layout.addWidget(self.core_label)
+
+        # Core x time heatmap with its colour scale alongside
+        self.core_chart = self.add_chart(self.chart_backend.heatmap_chart(
+            'Per-Core CPU', self.model.history_length, 'Core', 'cores'))
+        core_layout.addWidget(self.core_chart.widget, stretch=1)
+
+        core_frame.setLayout(core_layout)
+        self.tabs.addTab(core_frame, 'CPU Cores')
+
+    def create_process_table(self):
+        process_frame = QFrame()
+        process_layout = QVBoxLayout()
+
+        sort_layout = QHBoxLayout()
+        self.process_count_label = QLabel("Processes: 0")
+        self.process_sort = QComboBox()
+        self.process_sort.addItems(['Top by CPU', 'Top by Memory'])
+        self.process_sort.currentIndexChanged.connect(self.update_processes)
+        sort_layout.addWidget(self.process_count_label)
+        sort_layout.addStretch()
+        sort_layout.addWidget(self.process_sort)
+        process_layout.addLayout(sort_layout)
+
+        columns = ['PID', 'Name', 'CPU %', 'Memory (MB)', 'Threads', 'Read (KB/s)', 'Write (KB/s)']
+        self.process_table = QTableWidget(0, len(columns))
+        self.process_table.setHorizontalHeaderLabels(columns)
+        self.process_table.verticalHeader().setVisible(False)
+        self.process_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.process_table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.process_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        process_layout.addWidget(self.process_table)
+
+        process_frame.setLayout(process_layout)
+        self.process_tab = self.tabs.addTab(process_frame, 'Processes')
+
+    def create_cgroup_table(self):
+        cgroup_frame = QFrame()
+        cgroup_layout = QVBoxLayout()
+        self.cgroup_count_label = QLabel("Cgroups: 0")
+        cgroup_layout.addWidget(self.cgroup_count_label)
+
+        # PSI: share of the last 10 s in which some tasks of the group stalled on the resource
+        columns = ['Cgroup', 'CPU %', 'Throttled %', 'Mem (MB)', 'Read (KB/s)', 'Write (KB/s)',
+                   'PSI CPU', 'PSI Mem', 'PSI IO']
+        self.cgroup_table = QTableWidget(0, len(columns))
+        self.cgroup_table.setHorizontalHeaderLabels(columns)
+        self.cgroup_table.verticalHeader().setVisible(False)
+        self.cgroup_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.cgroup_table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.cgroup_table.setTextElideMode(Qt.ElideMiddle)  # Keep the group's own name visible
+        # Figures are sized once to fit their header (not their thousands of cells);
+        # the path takes the rest
+        header = self.cgroup_table.horizontalHeader()
+        header.resizeSections(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        # Sorted here rather than by the table, so the cells can be reused every tick
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(self.cgroup_sort[0], Qt.DescendingOrder)
+        header.sectionClicked.connect(self.sort_cgroups)
+        cgroup_layout.addWidget(self.cgroup_table)
+
+        cgroup_frame.setLayout(cgroup_layout)
+        self.cgroup_tab = self.tabs.addTab(cgroup_frame, 'Cgroups')
 
 
     #
@@ -215,12 +345,12 @@ class SystemMonitorView(QMainWindow):
 
     def update_metrics(self):
         # Update CPU
-        cpu_value = self.model.get_cpu_history()[-1]
+        cpu_value = self.model.get_cpu_history(1)[-1]
         self.cpu_progress['progress'].setValue(int(cpu_value))
         self.cpu_progress['label'].setText(f"CPU Usage: {cpu_value:.1f}%")
         
         # Update Memory
-        mem_value = self.model.get_mem_history()[-1]
+        mem_value = self.model.get_mem_history(1)[-1]
         self.mem_progress['progress'].setValue(int(mem_value))
         self.mem_progress['label'].setText(f"Memory Usage: {mem_value:.1f}%")
         
@@ -228,77 +358,176 @@ class SystemMonitorView(QMainWindow):
         disk_value = self.model.get_disk_usage()
         self.disk_progress['progress'].setValue(int(disk_value))
         self.disk_progress['label'].setText(f"Disk Usage: {disk_value:.1f}%")
+
+        # Running statistics under each bar
+        for widget, name in ((self.cpu_progress, 'cpu'), (self.mem_progress, 'memory'),
+                             (self.disk_progress, 'disk')):
+            widget['stats'].setText(self.format_stats(name))
         
         # Update Network
         sent, received = self.model.get_network_io()
+        sent_rate, received_rate = self.model.get_network_rates()
         self.net_label.setText(
-            f"Network I/O: ↑ {sent:.2f} MB | ↓ {received:.2f} MB"
+            f"Network I/O: ↑ {sent_rate:.2f} MB/s | ↓ {received_rate:.2f} MB/s\n"
+            f"Total: ↑ {sent:.2f} MB | ↓ {received:.2f} MB"
         )
 
+        # Update Disk I/O
+        read_rate, write_rate = self.model.get_disk_io_rates()
+        self.disk_io_label.setText(f"Disk I/O: read {read_rate:.2f} MB/s | write {write_rate:.2f} MB/s")
+
+    # Two lines, e.g. "60s avg 23.4% · max 71.0%" and "p95 56.0% · EWMA 22.1%"
+    def format_stats(self, name):
+        stats = self.model.get_stats(name)
+        lines = []
+        if self.model.stat_windows:
+            suffix = window_name(self.model.stat_windows[0])
+            if stats[f'mean_{suffix}'] is not None:
+                lines.append(f"{suffix} avg {stats[f'mean_{suffix}']:.1f}% · max {stats[f'max_{suffix}']:.1f}%")
+        if stats['ewma'] is not None:
+            lines.append(f"p95 {stats['p95']:.1f}% · EWMA {stats['ewma']:.1f}%")
+        return "\n".join(lines)
+
+    def update_processes(self):
+        if self.process_monitor is None:
+            return
+        if self.process_sort.currentIndex() == 0:
+            processes = self.process_monitor.get_top_cpu()
+        else:
+            processes = self.process_monitor.get_top_memory()
+        self.process_count_label.setText(f"Processes: {self.process_monitor.get_process_count()}")
+
+        # Reuse the cells; only their text changes between ticks
+        self.process_table.setRowCount(len(processes))
+        for row, process in enumerate(processes):
+            values = (
+                str(process.pid),
+                process.name,
+                f"{process.cpu_percent:.1f}",
+                f"{process.rss / 1024 ** 2:.1f}",
+                str(process.num_threads),
+                f"{process.read_rate / 1024:.1f}",
+                f"{process.write_rate / 1024:.1f}",
+            )
+            for column, value in enumerate(values):
+                item = self.process_table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.process_table.setItem(row, column, item)
+                item.setText(value)
+
+    # A click on a column sorts by it, busiest first (names A-Z); clicking it again reverses
+    def sort_cgroups(self, column):
+        current, descending = self.cgroup_sort
+        descending = not descending if column == current else column != 0
+        self.cgroup_sort = (column, descending)
+        self.cgroup_table.horizontalHeader().setSortIndicator(
+            column, Qt.DescendingOrder if descending else Qt.AscendingOrder)
+        self.update_cgroups()
+
+    def update_cgroups(self):
+        rows = self.local_model.get_cgroups()
+        self.cgroup_count_label.setText(f"Cgroups: {len(rows)}")
+        column, descending = self.cgroup_sort
+        if column == 0:
+            paths = sorted(rows, reverse=descending)
+        else:
+            paths = sorted(rows, key=lambda path: rows[path][column - 1], reverse=descending)
+
+        self.cgroup_table.setRowCount(len(paths))
+        for row, path in enumerate(paths):
+            cpu, throttled, memory, read_rate, write_rate, cpu_psi, memory_psi, io_psi = rows[path]
+            values = (
+                path,
+                f"{cpu:.1f}",
+                f"{throttled:.1f}",
+                f"{memory / 1024 ** 2:.1f}",
+                f"{read_rate / 1024:.1f}",
+                f"{write_rate / 1024:.1f}",
+                f"{cpu_psi:.2f}",
+                f"{memory_psi:.2f}",
+                f"{io_psi:.2f}",
+            )
+            for column, value in enumerate(values):
+                item = self.cgroup_table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.cgroup_table.setItem(row, column, item)
+                item.setText(value)
+
+    # Hand the newest data to the charts that are on screen and out of date, then
+    # draw only those. Returns the number of charts drawn.
     def update_plot(self):
-        # Update CPU plot
-        self.cpu_ax.clear()
-        self.style_plot(self.cpu_ax, 'CPU History')
-        cpu_data = self.model.get_cpu_history()
-        x = range(len(cpu_data))
-        self.cpu_ax.plot(x, cpu_data, color=self.plot_colors['cpu'], linewidth=2)
-        self.cpu_ax.fill_between(x, cpu_data, alpha=0.3, color=self.plot_colors['cpu'])
-        self.cpu_fig.tight_layout(pad=1.0)
-        self.cpu_canvas.draw()
-
-        # Update Memory plot
-        self.mem_ax.clear()
-        self.style_plot(self.mem_ax, 'Memory History')
-        mem_data = self.model.get_mem_history()
-        self.mem_ax.plot(x, mem_data, color=self.plot_colors['memory'], linewidth=2)
-        self.mem_ax.fill_between(x, mem_data, alpha=0.3, color=self.plot_colors['memory'])
-        self.mem_fig.tight_layout(pad=1.0)
-        self.mem_canvas.draw()
-
-        # Update Network I/O plot
-        self.net_ax.clear()
-        self.style_plot(self.net_ax, 'Network I/O')
-        sent, received = self.model.get_network_io()
-        self.net_ax.bar(['Upload', 'Download'], [sent, received], 
-                       color=[self.plot_colors['network_up'], self.plot_colors['network_down']])
-        self.net_fig.tight_layout(pad=1.0)
-        self.net_canvas.draw()
-
-        # Update Disk Usage pie chart
-        self.disk_ax.clear()
-        self.style_plot(self.disk_ax, 'Disk Usage')
-        disk_used = self.model.get_disk_usage()
-        disk_free = 100 - disk_used
-        colors = [self.plot_colors['disk_used'], self.plot_colors['disk_free']]
-        self.disk_ax.pie([disk_used, disk_free], 
-                         labels=[f'Used\n({disk_used:.1f}%)', f'Free\n({disk_free:.1f}%)'],
-                         colors=colors,
-                         autopct='%1.1f%%',
-                         textprops={'color': 'white' if self.theme_action.text() == 'Switch to Light Theme' else 'black'})
-        self.disk_fig.tight_layout(pad=1.0)
-        self.disk_canvas.draw()
-    
-
-    def style_plot(self, ax, title):
-        ax.set_facecolor('#252525')
-        ax.set_title(title, color='white', pad=10, fontsize=12)
-        if title != 'Disk Usage':  # Don't set ylim for pie chart
-            ax.set_ylim(0, 100)
-        ax.grid(True, linestyle='--', alpha=0.3)
-        ax.tick_params(colors='white')
-        for spine in ax.spines.values():
-            spine.set_color('white')
+        stale = []
+        if self.is_stale(self.cpu_chart, self.model.get_generation('cpu')):
+            self.cpu_chart.set_series(0, *self.model.get_cpu_plot_data(self.cpu_chart.plot_width()))
+            stale.append(self.cpu_chart)
+        if self.is_stale(self.mem_chart, self.model.get_generation('memory')):
+            self.mem_chart.set_series(0, *self.model.get_mem_plot_data(self.mem_chart.plot_width()))
+            stale.append(self.mem_chart)
+        for chart, names in self.throughput_charts:
+            if self.is_stale(chart, tuple(self.model.get_generation(name) for name in names)):
+                for index, name in enumerate(names):
+                    chart.set_series(index, *self.model.get_plot_data(name, chart.plot_width()))
+                stale.append(chart)
+        # Disk usage is resampled every few seconds and rarely moves
+        if self.is_stale(self.disk_chart, round(self.model.get_disk_usage(), 1)):
+            self.disk_chart.set_value(self.model.get_disk_usage())
+            stale.append(self.disk_chart)
+        if self.is_stale(self.core_chart, self.model.get_generation('cores')):
+            self.update_core_heatmap()
+            stale.append(self.core_chart)
+
+        for chart in stale:
+            with self.profiler.stage('render ' + chart.title):
+                chart.render()
+        return len(stale)
+
+    # True if the chart is on screen and its data or width changed since it was last
+    # drawn. Charts on another tab or in a minimized window are skipped and catch up
+    # once they are shown again.
+    def is_stale(self, chart, generation):
+        widget = chart.widget
+        if not widget.isVisible() or widget.visibleRegion().isEmpty():
+            return False
+        key = (generation, chart.plot_width())
+        if self.rendered.get(chart) == key:
+            return False
+        self.rendered[chart] = key
+        return True
+
+    # True while any part of the window can be seen: not hidden, minimized or fully covered
+    def is_on_screen(self):
+        window = self.windowHandle()
+        return (self.isVisible() and not self.isMinimized()
+                and window is not None and window.isExposed())
+
+    def update_core_heatmap(self):
+        samples, data = self.model.get_core_plot_data(self.core_chart.plot_width())
+        if data is None or len(data) == 0:
+            return
+        self.core_chart.set_data(samples, data)
+
+        latest = data[-1]
+        busiest = int(latest.argmax())
+        self.core_label.setText(
+            f"Cores: {data.shape[1]} | Busiest: core {busiest} at {latest[busiest]:.1f}% | "
+            f"Mean: {latest.mean():.1f}%")
 
 
     #
     # -- Alerts -- 
     #
 
+    # One non-modal popup is reused, so alerts never block the event loop or stack up
     def show_alert_popup(self, message):
-        alert = QMessageBox(self)
-        alert.setIcon(QMessageBox.Warning)
+        if self.alert_popup is None:
+            self.alert_popup = QMessageBox(self)
+            self.alert_popup.setIcon(QMessageBox.Warning)
+            self.alert_popup.setWindowTitle("System Alert")
+            self.alert_popup.setWindowModality(Qt.NonModal)
+        alert = self.alert_popup
         alert.setText(message)
-        alert.setWindowTitle("System Alert")
         
         # Get current theme
         is_dark = self.theme_action.text() == 'Switch to Light Theme'
@@ -343,11 +572,170 @@ class SystemMonitorView(QMainWindow):
             """
         
         alert.setStyleSheet(style)
-        alert.exec_()
+        alert.show()
+        alert.raise_()
 
     def update_alert_label(self, message):
         self.alert_label.setText(message)
 
+
+    #
+    # -- Remote Hosts --
+    #
+
+    # Host picker, shown while remote agents are followed. A host can be picked
+    # once its first samples have arrived.
+    def create_host_bar(self):
+        host_frame = QFrame()
+        host_layout = QHBoxLayout()
+
+        host_layout.addWidget(QLabel('Host:'))
+        self.host_selector = QComboBox()
+        self.host_selector.addItem('This host', None)
+        for index, host in enumerate(self.hosts.hosts):
+            self.host_selector.addItem(host.label(), index)
+        self.host_selector.currentIndexChanged.connect(self.select_host)
+        host_layout.addWidget(self.host_selector, stretch=1)
+
+        self.host_status = QLabel()
+        host_layout.addWidget(self.host_status, stretch=2)
+
+        host_frame.setLayout(host_layout)
+        self.main_layout.addWidget(host_frame)
+        self.update_hosts()
+
+    def selected_host(self):
+        index = self.host_selector.currentData()
+        return self.hosts.hosts[index] if index is not None else None
+
+    def select_host(self):
+        host = self.selected_host()
+        self.set_model(host.model if host is not None else self.local_model)
+        self.info_label.setText(self.system_info(host))
+        self.update_hosts()
+
+    # Show another host's model; every chart is redrawn from it on the next frame
+    def set_model(self, model):
+        self.model = model
+        self.rendered.clear()
+        # Series the new model has no data for must not keep showing the old one's
+        for chart in [self.cpu_chart, self.mem_chart] + [chart for chart, _ in self.throughput_charts]:
+            chart.clear()
+        # Processes and cgroups are only listed for this host
+        local = model is self.local_model
+        local_tabs = []
+        if self.process_monitor is not None:
+            local_tabs.append(self.process_tab)
+        if self.cgroups:
+            local_tabs.append(self.cgroup_tab)
+        for tab in local_tabs:
+            if not local and self.tabs.currentIndex() == tab:
+                self.tabs.setCurrentIndex(0)
+            self.tabs.setTabEnabled(tab, local)
+        if model.is_ready():
+            self.update_metrics()
+
+    # Host names and connection states, after any of them changed
+    def update_hosts(self):
+        items = self.host_selector.model()
+        for index, host in enumerate(self.hosts.hosts, start=1):
+            state = '' if host.state == 'connected' else f" — {host.state}"
+            self.host_selector.setItemText(index, host.label() + state)
+            items.item(index).setEnabled(host.ready)
+
+        status = f"{self.hosts.connected_count()} of {len(self.hosts.hosts)} agents connected"
+        host = self.selected_host()
+        if host is not None and host.state != 'connected':
+            status += f" · {host.name} {host.state}" + (f": {host.error}" if host.error else "")
+        self.host_status.setText(status)
+
+
+    #
+    # -- Replay --
+    #
+
+    # Playback controls, shown while a recorded session drives the dashboard
+    def create_replay_bar(self):
+        replay_frame = QFrame()
+        replay_layout = QHBoxLayout()
+
+        self.replay_button = QPushButton('Pause')
+        self.replay_button.clicked.connect(self.toggle_replay)
+        replay_layout.addWidget(self.replay_button)
+
+        self.replay_speed = QComboBox()
+        speeds = sorted(set(REPLAY_SPEEDS) | {self.replay.speed})
+        for speed in speeds:
+            self.replay_speed.addItem(f"{speed:g}×", speed)
+        self.replay_speed.setCurrentIndex(speeds.index(self.replay.speed))
+        self.replay_speed.currentIndexChanged.connect(
+            lambda index: self.replay.set_speed(self.replay_speed.itemData(index)))
+        replay_layout.addWidget(self.replay_speed)
+
+        # Whole seconds into the recording; seeks when the handle is let go
+        self.replay_slider = QSlider(Qt.Horizontal)
+        self.replay_slider.setRange(0, max(int(self.replay.reader.duration), 1))
+        self.replay_slider.sliderReleased.connect(lambda: self.replay.seek(self.replay_slider.value()))
+        replay_layout.addWidget(self.replay_slider, stretch=1)
+
+        self.replay_label = QLabel()
+        replay_layout.addWidget(self.replay_label)
+
+        replay_frame.setLayout(replay_layout)
+        self.main_layout.addWidget(replay_frame)
+
+    def toggle_replay(self):
+        paused = not self.replay.paused
+        self.replay.set_paused(paused)
+        self.replay_button.setText('Play' if paused else 'Pause')
+
+    def update_replay(self):
+        offset = self.replay.offset()
+        if not self.replay_slider.isSliderDown():
+            self.replay_slider.setValue(int(offset))
+        shown = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.replay.now()))
+        state = ' (end)' if self.replay.finished() else ''
+        self.replay_label.setText(f"Replay {shown}  {offset:.0f} / {self.replay.reader.duration:.0f} s{state}")
+
+
+    #
+    # -- Diagnostics --
+    #
+
+    # Created on first use; it stays alive so reopening keeps its position
+    def show_diagnostics(self):
+        if self.diagnostics_dialog is None:
+            from diagnostics_dialog import DiagnosticsDialog
+            self.diagnostics_dialog = DiagnosticsDialog(self.profiler, self)
+        self.diagnostics_dialog.show()
+        self.diagnostics_dialog.raise_()
+
+
+    #
+    # -- Data Export --
+    #
+
+    def export_data(self):
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, 'Export Data', 'sysgauge-export.csv', 'CSV (*.csv);;JSON Lines (*.jsonl)')
+        if not path:
+            return
+
+        # The store only ever holds this host's samples, whichever host is shown
+        store = self.local_model.store
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            store.flush()
+            with open(path, 'w', newline='') as file:
+                if selected_filter.startswith('JSON') or path.endswith('.jsonl'):
+                    store.export_jsonl(file)
+                else:
+                    store.export_csv(file)
+        except OSError as error:
+            self.update_alert_label(f"⚠️ Export failed: {error}")
+        finally:
+            QApplication.restoreOverrideCursor()
+
     
     #
     # -- Theming and Styles -- 
@@ -465,43 +853,47 @@ class SystemMonitorView(QMainWindow):
                 }
             """)
 
-        for frame in self.findChildren(QFrame):
-            frame.setStyleSheet(style)
-
-    def update_graph_styles(self, theme):
+        # Tables get a flat style of their own; the panel padding would squeeze their cells
         if theme == "light":
-            facecolor = '#ffffff'
-            textcolor = 'black'
-            gridcolor = '#cccccc'
-            plot_colors = {
-                'cpu': '#0078d4',
-                'memory': '#d83b01',
-                'network_up': '#107c10',
-                'network_down': '#5c2d91',
-                'disk_used': '#008272',
-                'disk_free': '#e6e6e6'
-            }
+            table_style = """
+                QFrame {
+                    padding: 0px;
+                    border-radius: 0px;
+                    background-color: #ffffff;
+                    color: black;
+                }
+                QHeaderView::section {
+                    background-color: #e6e6e6;
+                    color: black;
+                    padding: 4px;
+                    border: none;
+                }
+            """
         else:
-            facecolor = '#353535'
-            textcolor = 'white'
-            gridcolor = '#555555'
-            plot_colors = {
-                'cpu': '#3daee9',
-                'memory': '#ff5555',
-                'network_up': '#50fa7b',
-                'network_down': '#bd93f9',
-                'disk_used': '#ff79c6',
-                'disk_free': '#44475a'
-            }
+            table_style = """
+                QFrame {
+                    padding: 0px;
+                    border-radius: 0px;
+                    background-color: #2b2b2b;
+                    color: white;
+                }
+                QHeaderView::section {
+                    background-color: #44475a;
+                    color: white;
+                    padding: 4px;
+                    border: none;
+                }
+            """
 
-        self.plot_colors = plot_colors
-        
-        for fig in [self.cpu_fig, self.mem_fig, self.disk_fig, self.net_fig]:
-            fig.set_facecolor(facecolor)
-            for ax in fig.get_axes():
-                ax.set_facecolor(facecolor)
-                ax.tick_params(colors=textcolor)
-                ax.title.set_color(textcolor)
-                for spine in ax.spines.values():
-                    spine.set_color(textcolor)
-                ax.grid(True, linestyle='--', alpha=0.3, color=gridcolor)
\ No newline at end of file
+        for frame in self.findChildren(QFrame):
+            if not isinstance(frame, QAbstractItemView):
+                frame.setStyleSheet(style)
+        # The header computes its margins when polished, so it is restyled explicitly too
+        for table in self.findChildren(QTableWidget):
+            table.setStyleSheet(table_style)
+            table.horizontalHeader().setStyleSheet(table_style)
+
+    def update_graph_styles(self, theme):
+        for chart in self.charts:
+            chart.set_theme(CHART_THEMES[theme])
+        self.rendered.clear()  # restyled charts need their data again
\ No newline at end of file